@@ -0,0 +1,147 @@
+"""Response caching shared by the read endpoints.
+
+:func:`cached` wraps an endpoint so that its response body is serialized
+once, stored in :mod:`app.core.cache` under a key built from the request
+parameters, and returned as is on later hits without being parsed or
+encoded again.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import typing
+import urllib.parse
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Awaitable, Callable, Mapping, Sequence
+from uuid import UUID
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from app.core import cache
+
+try:  # pragma: no cover - optional dependency
+    import orjson  # type: ignore[import]
+except Exception:  # pragma: no cover - fallback
+    orjson = None  # type: ignore
+
+Endpoint = Callable[..., Awaitable[Any]]
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize ``value`` to JSON bytes, with datetimes and Decimals."""
+    if orjson is not None:
+        return orjson.dumps(
+            value,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+    return json.dumps(value, default=_default, separators=(",", ":")).encode()
+
+
+def _canonical(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return str(value.value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return ",".join(_canonical(v) for v in value)
+    return str(value)
+
+
+def _flatten(params: Mapping[str, Any]) -> dict[str, str]:
+    flat: dict[str, Any] = {}
+    for name, value in params.items():
+        if isinstance(value, BaseModel):
+            flat.update(value.model_dump())
+        else:
+            flat[name] = value
+    return {name: _canonical(value) for name, value in flat.items()}
+
+
+def cache_key(prefix: str, params: Mapping[str, Any], tags: Sequence[str] = ()) -> str:
+    """Return ``prefix:`` followed by the sorted, url-encoded parameters.
+
+    Model parameters such as :class:`~app.api.schemas.common.Page` are
+    flattened into their fields. ``tags`` are :meth:`str.format` templates
+    filled from the parameters, e.g. ``"metrics_ts:metric={metric}"``; their
+    current versions are appended after ``@``.
+    """
+    flat = _flatten(params)
+    query = urllib.parse.urlencode(sorted(flat.items()))
+    if not tags:
+        return f"{prefix}:{query}"
+    versions = cache.tag_versions(t.format(**flat) for t in tags)
+    return f"{prefix}:{query}@{versions}"
+
+
+def cached(
+    prefix: str,
+    ttl: int = 30,
+    stale: int | None = None,
+    tags: Sequence[str] = (),
+    fallback_ttl: int | None = None,
+) -> Callable[[Endpoint], Endpoint]:
+    """Cache the JSON body of an endpoint under ``prefix`` for ``ttl`` seconds.
+
+    The wrapped endpoint returns plain data; the decorated one returns a
+    :class:`fastapi.Response` with the serialized body. Misses are computed
+    through :func:`app.core.cache.cache_get_or_set`, so concurrent misses
+    share one call and ``stale`` sets the stale-while-revalidate window.
+    ``tags`` name the tables the response is read from (see
+    :func:`cache_key`); an ingestion write to one of them retires the entry
+    before its TTL. A ``ttl`` that is only safe because of that can set
+    ``fallback_ttl``, used instead while the invalidation feed is down.
+    """
+
+    def decorator(func: Endpoint) -> Endpoint:
+        # FastAPI resolves string annotations in the wrapper's module, so
+        # hand it the endpoint's signature with the annotations resolved.
+        # The return annotation stays as the response model for OpenAPI;
+        # FastAPI does not validate a returned Response against it.
+        hints = typing.get_type_hints(func)
+        signature = inspect.signature(func)
+        signature = signature.replace(
+            parameters=[
+                p.replace(annotation=hints.get(p.name, p.annotation))
+                for p in signature.parameters.values()
+            ],
+            return_annotation=hints.get("return", signature.return_annotation),
+        )
+
+        @functools.wraps(func)
+        async def endpoint(**params: Any) -> Response:
+            async def load() -> bytes:
+                return dumps(await func(**params))
+
+            key = cache_key(prefix, params, tags)
+            expires = ttl
+            if fallback_ttl is not None and not cache.invalidation_live():
+                expires = fallback_ttl
+            body = await cache.cache_get_or_set(key, load, expires, stale)
+            return Response(body, media_type="application/json")
+
+        endpoint.__signature__ = signature  # type: ignore[attr-defined]
+        return endpoint
+
+    return decorator
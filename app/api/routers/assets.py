@@ -1,31 +1,25 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, Query
 from fastapi.concurrency import run_in_threadpool
 
+from app.api.caching import cached
 from app.api.schemas.common import Page
-from app.core import cache, db
+from app.core import db
 
 router = APIRouter(tags=["assets"])
 
 
 @router.get("/assets/prices")
+@cached("asset_prices", tags=["prices_eod"])
 async def get_asset_prices(
     symbol: str = Query(..., example="AAPL"),
     start: datetime | None = None,
     end: datetime | None = None,
     page: Page = Depends(),
 ):
-    key = f"asset_prices:{symbol}:{start}:{end}:{page.limit}:{page.offset}"
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
-
     sql = (
         "SELECT symbol, ts, open, high, low, close, volume FROM prices_eod "
         "WHERE symbol = %(symbol)s "
@@ -48,23 +42,17 @@ async def get_asset_prices(
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, params)
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp), ttl=30)
     return resp
 
 
 @router.get("/assets/indices")
+@cached("index_prices", tags=["indices_eod"])
 async def get_index_prices(
     index_symbol: str = Query(..., example="SPX"),
     start: datetime | None = None,
     end: datetime | None = None,
     page: Page = Depends(),
 ):
-    key = f"index_prices:{index_symbol}:{start}:{end}:{page.limit}:{page.offset}"
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
     sql = (
         "SELECT index_symbol, ts, value FROM indices_eod "
         "WHERE index_symbol = %(index_symbol)s "
@@ -88,11 +76,11 @@ async def get_index_prices(
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, params)
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp), ttl=30)
     return resp
 
 
 @router.get("/assets/fundamentals")
+@cached("fundamentals", tags=["fundamentals_xbrl"])
 async def get_fundamentals(
     cik: str = Query(..., example="0000320193"),
     fact: str = Query(..., example="Assets"),
@@ -100,12 +88,6 @@ async def get_fundamentals(
     end: datetime | None = None,
     page: Page = Depends(),
 ):
-    key = f"fundamentals:{cik}:{fact}:{start}:{end}:{page.limit}:{page.offset}"
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
     sql = (
         "SELECT cik, fact, ts, value, unit FROM fundamentals_xbrl "
         "WHERE cik = %(cik)s AND fact = %(fact)s "
@@ -130,11 +112,11 @@ async def get_fundamentals(
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, params)
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp), ttl=30)
     return resp
 
 
 @router.get("/assets/earnings")
+@cached("earnings", tags=["earnings_events"])
 async def get_earnings_events(
     cik: str | None = Query(None, example="0000320193"),
     ticker: str | None = Query(None, example="AAPL"),
@@ -143,12 +125,6 @@ async def get_earnings_events(
     end: datetime | None = None,
     page: Page = Depends(),
 ):
-    key = f"earnings:{cik}:{ticker}:{q}:{start}:{end}:{page.limit}:{page.offset}"
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
     sql = (
         "SELECT cik, ticker, ts, headline, url FROM earnings_events "
         "WHERE (%(cik)s IS NULL OR cik = %(cik)s) "
@@ -179,5 +155,4 @@ async def get_earnings_events(
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, params)
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp), ttl=30)
     return resp
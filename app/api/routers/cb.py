@@ -1,14 +1,14 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime
 from enum import Enum
 
 from fastapi import APIRouter, Depends, Query
 from fastapi.concurrency import run_in_threadpool
 
+from app.api.caching import cached
 from app.api.schemas.common import Page
-from app.core import cache, db
+from app.core import db
 
 
 class CBBank(str, Enum):
@@ -29,6 +29,7 @@ router = APIRouter(tags=["central_bank"])
 
 
 @router.get("/cb")
+@cached("cb", ttl=60, tags=["cb_statements"])
 async def get_cb_statements(
     bank: CBBank = Query(...),
     type: CBType = CBType.any,
@@ -36,13 +37,6 @@ async def get_cb_statements(
     end: datetime | None = None,
     page: Page = Depends(),
 ):
-    key = f"cb:{bank.value}:{type.value}:{start}:{end}:{page.limit}:{page.offset}"
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
-
     sql = (
         "SELECT statement_id, central_bank, type, published_at, title, url, "
         "hawkish_dovish_score "
@@ -71,5 +65,4 @@ async def get_cb_statements(
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, params)
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp), ttl=60)
     return resp
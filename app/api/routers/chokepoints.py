@@ -1,14 +1,14 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime
 from enum import Enum
 
 from fastapi import APIRouter, Depends
 from fastapi.concurrency import run_in_threadpool
 
+from app.api.caching import cached
 from app.api.schemas.common import Page
-from app.core import cache, db
+from app.core import db
 
 
 class VesselClass(str, Enum):
@@ -22,6 +22,7 @@ router = APIRouter(tags=["logistics"])
 
 
 @router.get("/logistics/chokepoints/series")
+@cached("chokepoint_series", tags=["chokepoint_delay_ts"])
 async def get_chokepoint_series(
     chokepoint_id: str,
     vessel_class: VesselClass = VesselClass.all,
@@ -29,16 +30,6 @@ async def get_chokepoint_series(
     end: datetime | None = None,
     page: Page = Depends(),
 ):
-    key = (
-        f"chokepoint_series:{chokepoint_id}:{vessel_class.value}:"
-        f"{start}:{end}:{page.limit}:{page.offset}"
-    )
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
-
     sql = (
         "SELECT chokepoint_id, vessel_class, ts, delay_hours "
         "FROM chokepoint_delay_ts "
@@ -66,21 +57,14 @@ async def get_chokepoint_series(
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, params)
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp), ttl=30)
     return resp
 
 
 @router.get("/logistics/chokepoints/snapshot")
+@cached("chokepoint_snapshot", ttl=15, tags=["chokepoint_delay_ts"])
 async def get_chokepoint_snapshot(
     chokepoint_id: str, vessel_class: VesselClass = VesselClass.all
 ):
-    key = f"chokepoint_snapshot:{chokepoint_id}:{vessel_class.value}"
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
-
     if vessel_class == VesselClass.all:
         sql = (
             "SELECT DISTINCT ON (vessel_class) chokepoint_id, vessel_class, ts, "
@@ -96,10 +80,12 @@ async def get_chokepoint_snapshot(
             "AND vessel_class = %(vessel_class)s "
             "ORDER BY ts DESC LIMIT 1"
         )
-        params = {"chokepoint_id": chokepoint_id, "vessel_class": vessel_class.value}
+        params = {
+            "chokepoint_id": chokepoint_id,
+            "vessel_class": vessel_class.value,
+        }
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     resp = {"data": rows}
-    await cache.cache_set(key, json.dumps(resp), ttl=15)
     return resp
 
 
@@ -1,14 +1,14 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime
 from enum import Enum
 
 from fastapi import APIRouter, Depends, Query
 from fastapi.concurrency import run_in_threadpool
 
+from app.api.caching import cached
 from app.api.schemas.common import Page
-from app.core import cache, db
+from app.core import db
 
 
 class CommodityCode(str, Enum):
@@ -31,19 +31,13 @@ router = APIRouter()
 
 
 @router.get("/commodities", tags=["commodities"])
+@cached("commodities", tags=["commodities_ts"])
 async def get_commodity_prices(
     code: CommodityCode = Query(...),
     start: datetime | None = None,
     end: datetime | None = None,
     page: Page = Depends(),
 ):
-    key = f"commodities:{code.value}:{start}:{end}:{page.limit}:{page.offset}"
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
-
     sql = (
         "SELECT commodity_code, ts, price, unit, source "
         "FROM commodities_ts "
@@ -68,23 +62,16 @@ async def get_commodity_prices(
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, params)
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp))
     return resp
 
 
 @router.get("/freight/bdi", tags=["freight"])
+@cached("bdi", tags=["freight_indices"])
 async def get_bdi_index(
     start: datetime | None = None,
     end: datetime | None = None,
     page: Page = Depends(),
 ):
-    key = f"bdi:{start}:{end}:{page.limit}:{page.offset}"
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
-
     sql = (
         "SELECT index_code, ts, value, source "
         "FROM freight_indices "
@@ -108,5 +95,4 @@ async def get_bdi_index(
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, params)
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp))
     return resp
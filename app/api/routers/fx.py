@@ -1,14 +1,14 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime
 from enum import Enum
 
 from fastapi import APIRouter, Depends
 from fastapi.concurrency import run_in_threadpool
 
+from app.api.caching import cached
 from app.api.schemas.common import Page
-from app.core import cache, db
+from app.core import db
 
 
 class FXPair(str, Enum):
@@ -26,6 +26,7 @@ router = APIRouter(tags=["fx"])
 
 
 @router.get("/fx")
+@cached("fx", ttl=3600, fallback_ttl=30, tags=["metrics_ts:metric={pair}"])
 async def get_fx_series(
     pair: FXPair,
     start: datetime | None = None,
@@ -33,13 +34,6 @@ async def get_fx_series(
     page: Page = Depends(),
 ):
     metric = pair.value
-    key = f"fx:{metric}:{start}:{end}:{page.limit}:{page.offset}"
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
-
     sql = (
         "SELECT series_id, entity_id, metric, ts, value, unit, source "
         "FROM metrics_ts "
@@ -64,5 +58,4 @@ async def get_fx_series(
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, params)
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp))
     return resp
@@ -1,14 +1,14 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime
 from enum import Enum
 
 from fastapi import APIRouter, Depends, Query
 from fastapi.concurrency import run_in_threadpool
 
+from app.api.caching import cached
 from app.api.schemas.common import Page
-from app.core import cache, db
+from app.core import db
 
 
 class GeoSource(str, Enum):
@@ -21,6 +21,7 @@ router = APIRouter(tags=["geo"])
 
 
 @router.get("/geo/events")
+@cached("geo_events", ttl=15, tags=["geo_events"])
 async def get_geo_events(
     source: GeoSource = GeoSource.any,
     country: str | None = Query(None, min_length=2, max_length=2),
@@ -31,18 +32,9 @@ async def get_geo_events(
     end: datetime | None = None,
     page: Page = Depends(),
 ):
-    key = (
-        f"geo_events:{source.value}:{country}:{event_type}:{goldstein_min}:{goldstein_max}:"
-        f"{start}:{end}:{page.limit}:{page.offset}"
-    )
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
-
     sql = (
-        "SELECT source, source_id, ts, event_type, country, lat, lon, actor1, actor2, "
+        "SELECT source, source_id, ts, event_type, country, lat, lon, "
+        "actor1, actor2, "
         "actor_roles, goldstein, people_impacted, importance, url "
         "FROM geo_events "
         "WHERE (%(source)s = 'any' OR source = %(source)s) "
@@ -78,11 +70,11 @@ async def get_geo_events(
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, params)
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp), ttl=15)
     return resp
 
 
 @router.get("/geo/mentions")
+@cached("geo_mentions", tags=["geo_mentions"])
 async def get_geo_mentions(
     event_source_id: str | None = None,
     lang: str | None = Query(None, min_length=2, max_length=2),
@@ -91,20 +83,11 @@ async def get_geo_mentions(
     end: datetime | None = None,
     page: Page = Depends(),
 ):
-    key = (
-        f"geo_mentions:{event_source_id}:{lang}:{source_country}:{start}:{end}:"
-        f"{page.limit}:{page.offset}"
-    )
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
-
     sql = (
         "SELECT event_source_id, ts, lang, source_country, snippet, url "
         "FROM geo_mentions "
-        "WHERE (%(event_source_id)s IS NULL OR event_source_id = %(event_source_id)s) "
+        "WHERE (%(event_source_id)s IS NULL "
+        "OR event_source_id = %(event_source_id)s) "
         "AND (%(lang)s IS NULL OR lang = %(lang)s) "
         "AND (%(source_country)s IS NULL OR source_country = %(source_country)s) "
         "AND (%(start)s IS NULL OR ts >= %(start)s) "
@@ -113,7 +96,8 @@ async def get_geo_mentions(
     )
     count_sql = (
         "SELECT COUNT(*) as count FROM geo_mentions "
-        "WHERE (%(event_source_id)s IS NULL OR event_source_id = %(event_source_id)s) "
+        "WHERE (%(event_source_id)s IS NULL "
+        "OR event_source_id = %(event_source_id)s) "
         "AND (%(lang)s IS NULL OR lang = %(lang)s) "
         "AND (%(source_country)s IS NULL OR source_country = %(source_country)s) "
         "AND (%(start)s IS NULL OR ts >= %(start)s) "
@@ -131,5 +115,4 @@ async def get_geo_mentions(
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, params)
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp), ttl=30)
     return resp
@@ -1,14 +1,14 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime
 from enum import Enum
 
 from fastapi import APIRouter, Depends, Query
 from fastapi.concurrency import run_in_threadpool
 
+from app.api.caching import cached
 from app.api.schemas.common import Page
-from app.core import cache, db
+from app.core import db
 
 
 class MacroMetric(str, Enum):
@@ -27,6 +27,7 @@ router = APIRouter(tags=["macro"])
 
 
 @router.get("/macro")
+@cached("macro", ttl=6 * 3600, fallback_ttl=30, tags=["metrics_ts:metric={metric}"])
 async def get_macro_series(
     country: str = Query(..., min_length=3, max_length=3),
     metric: MacroMetric = Query(...),
@@ -34,13 +35,6 @@ async def get_macro_series(
     end: datetime | None = None,
     page: Page = Depends(),
 ):
-    key = f"macro:{country}:{metric.value}:{start}:{end}:{page.limit}:{page.offset}"
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
-
     sql = (
         "SELECT series_id, entity_id, metric, ts, value, unit, source "
         "FROM metrics_ts "
@@ -66,5 +60,4 @@ async def get_macro_series(
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, params)
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp))
     return resp
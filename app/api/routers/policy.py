@@ -1,14 +1,14 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime
 from enum import Enum
 
 from fastapi import APIRouter, Depends, Query
 from fastapi.concurrency import run_in_threadpool
 
+from app.api.caching import cached
 from app.api.schemas.common import Page
-from app.core import cache, db
+from app.core import db
 
 
 class Jurisdiction(str, Enum):
@@ -32,6 +32,7 @@ router = APIRouter(tags=["policy"])
 
 
 @router.get("/policy")
+@cached("policy", ttl=60, tags=["policy_events"])
 async def get_policy_events(
     jurisdiction: Jurisdiction = Query(...),
     source: PolicySource | None = None,
@@ -40,17 +41,6 @@ async def get_policy_events(
     end: datetime | None = None,
     page: Page = Depends(),
 ):
-    key = (
-        f"policy:{jurisdiction.value}:"
-        f"{source.value if source else None}:"
-        f"{q}:{start}:{end}:{page.limit}:{page.offset}"
-    )
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
-
     sql = (
         "SELECT event_id, jurisdiction, source, published_at, title, summary, url, "
         "topics "
@@ -83,5 +73,4 @@ async def get_policy_events(
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, params)
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp), ttl=60)
     return resp
@@ -1,14 +1,14 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime
 from enum import Enum
 
 from fastapi import APIRouter, Depends
 from fastapi.concurrency import run_in_threadpool
 
+from app.api.caching import cached
 from app.api.schemas.common import Page
-from app.core import cache, db
+from app.core import db
 
 
 class VesselClass(str, Enum):
@@ -22,6 +22,7 @@ router = APIRouter(tags=["logistics"])
 
 
 @router.get("/logistics/ports/series")
+@cached("port_series", tags=["port_congestion_ts"])
 async def get_port_series(
     port_id: str,
     vessel_class: VesselClass = VesselClass.all,
@@ -29,16 +30,6 @@ async def get_port_series(
     end: datetime | None = None,
     page: Page = Depends(),
 ):
-    key = (
-        f"port_series:{port_id}:{vessel_class.value}:{start}:{end}:"
-        f"{page.limit}:{page.offset}"
-    )
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
-
     sql = (
         "SELECT port_id, vessel_class, ts, congestion, waiting_time, "
         "arrivals, departures "
@@ -67,19 +58,12 @@ async def get_port_series(
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, params)
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp), ttl=30)
     return resp
 
 
 @router.get("/logistics/ports/snapshot")
+@cached("port_snapshot", ttl=15, tags=["port_congestion_ts"])
 async def get_port_snapshot(port_id: str, vessel_class: VesselClass = VesselClass.all):
-    key = f"port_snapshot:{port_id}:{vessel_class.value}"
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
-
     if vessel_class == VesselClass.all:
         sql = (
             "SELECT DISTINCT ON (vessel_class) port_id, vessel_class, ts, "
@@ -99,7 +83,6 @@ async def get_port_snapshot(port_id: str, vessel_class: VesselClass = VesselClas
         params = {"port_id": port_id, "vessel_class": vessel_class.value}
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     resp = {"data": rows}
-    await cache.cache_set(key, json.dumps(resp), ttl=15)
     return resp
 
 
@@ -1,17 +1,28 @@
 from __future__ import annotations
 
-import json
 from time import perf_counter
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends, Query
 from fastapi.concurrency import run_in_threadpool
 
+from app.api.caching import cached
+from app.api.errors import problem
 from app.api.schemas.common import Page
-from app.core import cache, db
+from app.api.schemas.risk import SimulateShockBatchRequest
+from app.core import compute, db
 from app.core.config import settings
 from app.core.telemetry import RISK_COMPUTE_COUNT, RISK_COMPUTE_LATENCY
-from risk_engine.cascade import propagate_shock
+from app.services import graph_service, influence_service
+from risk_engine.attribution import dominant_paths, upstream_contributions
+from risk_engine.cascade import (
+    propagate_shock,
+    propagate_shock_by_day,
+    propagate_shocks,
+    pruning_error_bound,
+)
+from risk_engine.graph import CompiledGraph
+from risk_engine.montecarlo import simulate_shock_distribution
 
 router = APIRouter(tags=["risk"])
 
@@ -19,6 +30,7 @@ _DEFAULT_METRICS = ["macro", "market", "commodity", "geo", "logistics"]
 
 
 @router.get("/risk")
+@cached("risk")
 async def get_risk_score(
     country: str = Query(..., min_length=3, max_length=3),
 ) -> Dict[str, Any]:
@@ -28,13 +40,6 @@ async def get_risk_score(
     weighted average. If a metric is missing it is treated as ``0``.
     """
     start = perf_counter()
-    key = f"risk:{country.upper()}"
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
-
     sql = (
         "SELECT metric, value FROM risk_metrics "
         "WHERE entity_id = %(country)s AND metric = ANY(%(metrics)s)"
@@ -51,7 +56,6 @@ async def get_risk_score(
 
     risk = sum(scores.values()) / len(scores) if scores else 0.0
     resp = {"country": country.upper(), "scores": scores, "risk": risk}
-    await cache.cache_set(key, json.dumps(resp))
     elapsed = perf_counter() - start
     RISK_COMPUTE_COUNT.inc()
     RISK_COMPUTE_LATENCY.observe(elapsed)
@@ -59,13 +63,8 @@ async def get_risk_score(
 
 
 @router.get("/factors")
+@cached("factors")
 async def list_factors(page: Page = Depends()) -> Dict[str, Any]:
-    key = f"factors:{page.limit}:{page.offset}"
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
     sql = (
         "SELECT factor_id, name, series_id, note, evidence_density FROM factors "
         "ORDER BY factor_id LIMIT %(limit)s OFFSET %(offset)s"
@@ -75,35 +74,23 @@ async def list_factors(page: Page = Depends()) -> Dict[str, Any]:
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, {})
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp))
     return resp
 
 
 @router.get("/factors/{factor_id}")
+@cached("factor")
 async def get_factor(factor_id: int) -> Dict[str, Any] | None:
-    key = f"factor:{factor_id}"
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
     sql = (
         "SELECT factor_id, name, series_id, note, evidence_density FROM factors "
         "WHERE factor_id = %(fid)s"
     )
     row = await run_in_threadpool(db.fetch_one, sql, {"fid": factor_id})
-    await cache.cache_set(key, json.dumps(row))
     return row
 
 
 @router.get("/edges")
+@cached("edges")
 async def list_edges(page: Page = Depends()) -> Dict[str, Any]:
-    key = f"edges:{page.limit}:{page.offset}"
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
     sql = (
         "SELECT edge_id, src_factor, dst_factor, sign, lag_days, beta, p_value, "
         "transfer_entropy, method, regime, confidence, sample_start, sample_end, "
@@ -115,18 +102,12 @@ async def list_edges(page: Page = Depends()) -> Dict[str, Any]:
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, {})
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp))
     return resp
 
 
 @router.get("/risk_snapshots")
+@cached("risk_snaps")
 async def list_risk_snapshots(page: Page = Depends()) -> Dict[str, Any]:
-    key = f"risk_snaps:{page.limit}:{page.offset}"
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
     sql = (
         "SELECT factor_id, ts, node_vol, node_shock_sigma, impact_pct, "
         "systemic_contrib FROM risk_snapshots ORDER BY ts DESC "
@@ -137,17 +118,162 @@ async def list_risk_snapshots(page: Page = Depends()) -> Dict[str, Any]:
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, {})
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp))
     return resp
 
 
+async def _regime_graph(regime: str | None, pruned: bool = False) -> CompiledGraph:
+    try:
+        return await graph_service.get_graph(regime, pruned)
+    except KeyError:
+        raise problem(404, "Not Found", f"unknown regime: {regime}") from None
+
+
 @router.get("/simulate_shock")
 async def simulate_shock(
     factor_id: int,
     shock_size: float = settings.default_shock_sigma,
-    horizon: int = 3,
+    horizon: int = Query(3, ge=0, le=50),
+    days: int | None = Query(None, ge=0, le=3650),
+    draws: int | None = Query(None, ge=10, le=100_000),
+    seed: int | None = None,
+    regime: str | None = None,
+    pruned: bool = False,
+    explain: List[int] | None = Query(None),
+    paths: int = Query(3, ge=1, le=50),
 ) -> Dict[str, Any]:
-    sql = "SELECT src_factor, dst_factor, beta, lag_days, confidence FROM factor_edges"
-    edges = await run_in_threadpool(db.fetch_all, sql, {})
-    impacts = propagate_shock(edges, factor_id, shock_size, horizon)
-    return {"factor_id": factor_id, "impacts": impacts}
+    """Propagate a shock from ``factor_id`` through the factor graph.
+
+    When ``days`` is given the simulation is time-stepped using each edge's
+    ``lag_days`` and the per-day impact path of every reached factor is
+    returned alongside the impacts landing within the window. When ``draws``
+    is given, edge betas are resampled from their confidence and p5/p50/p95
+    impact bands are returned as ``bands``. Plain impacts for the default
+    horizon are read from the precomputed influence matrix when it matches
+    the current graph version.
+
+    ``regime`` selects the regime-specific graph; by default the graph of
+    the current regime label is used. The regime used is echoed back.
+
+    ``pruned`` runs on the sparsified copy of the graph, which keeps only
+    the strongest outgoing edges of every factor, and adds ``error_bound``:
+    an upper bound on the summed absolute deviation of ``impacts`` from the
+    exact graph's.
+
+    ``explain`` lists target factors for which the ``paths`` walks carrying
+    the largest contributions are returned under ``paths``, keyed by target.
+    """
+    if days is not None and draws is not None:
+        raise problem(400, "Bad Request", "days and draws cannot be combined")
+    if days is not None and explain:
+        raise problem(400, "Bad Request", "days and explain cannot be combined")
+    graph = await _regime_graph(regime, pruned)
+    if (
+        draws is not None
+        and draws * graph.n_edges > settings.monte_carlo_max_edge_draws
+    ):
+        raise problem(
+            400,
+            "Bad Request",
+            f"draws x edges exceeds {settings.monte_carlo_max_edge_draws}",
+        )
+    base: Dict[str, Any] = {"factor_id": factor_id, "regime": graph.regime}
+    if pruned:
+        base["pruned"] = True
+        base["error_bound"] = await run_in_threadpool(
+            pruning_error_bound, graph, factor_id, shock_size, horizon
+        )
+    if explain:
+        found = await run_in_threadpool(
+            dominant_paths, graph, factor_id, shock_size, explain, paths, horizon
+        )
+        base["paths"] = {
+            target: [{"path": p, "contribution": v} for p, v in walks]
+            for target, walks in found.items()
+        }
+    if days is not None:
+        by_day = await run_in_threadpool(
+            propagate_shock_by_day, graph, factor_id, shock_size, days, horizon
+        )
+        return {
+            **base,
+            "days": days,
+            "impacts": {k: sum(v) for k, v in by_day.items()},
+            "impacts_by_day": by_day,
+        }
+    matrix = None if pruned else await influence_service.get_matrix(graph, horizon)
+    if matrix is not None:
+        impacts = matrix.impacts(factor_id, shock_size)
+    else:
+        impacts = await run_in_threadpool(
+            propagate_shock, graph, factor_id, shock_size, horizon
+        )
+    if draws is None:
+        return {**base, "impacts": impacts}
+    bands = await run_in_threadpool(
+        simulate_shock_distribution,
+        graph,
+        factor_id,
+        shock_size,
+        draws,
+        horizon,
+        chunk_size=settings.monte_carlo_chunk_size,
+        seed=seed,
+        executor=compute.get_process_pool(),
+    )
+    return {**base, "draws": draws, "impacts": impacts, "bands": bands}
+
+
+@router.get("/factors/{factor_id}/upstream")
+async def upstream_factors(
+    factor_id: int,
+    horizon: int = Query(3, ge=0, le=50),
+    top: int = Query(10, ge=1, le=1000),
+    regime: str | None = None,
+) -> Dict[str, Any]:
+    """Return the upstream factors with the largest impact on ``factor_id``.
+
+    Each driver's ``impact`` is what a unit shock at that factor would add to
+    ``factor_id`` in ``/simulate_shock`` with the same ``horizon``; all
+    drivers come from one backward propagation over the graph.
+    """
+    graph = await _regime_graph(regime)
+    drivers = await run_in_threadpool(
+        upstream_contributions, graph, factor_id, horizon, top=top
+    )
+    return {
+        "factor_id": factor_id,
+        "regime": graph.regime,
+        "horizon": horizon,
+        "drivers": [{"factor_id": f, "impact": v} for f, v in drivers],
+    }
+
+
+@router.post("/simulate_shock/batch")
+async def simulate_shock_batch(req: SimulateShockBatchRequest) -> Dict[str, Any]:
+    """Simulate many shocks against the shared compiled factor graph.
+
+    Scenarios are evaluated together as one matrix propagation. With
+    ``composite`` set, all shocks are applied at once and a single impact
+    mapping is returned. ``regime`` selects the graph as for
+    ``/simulate_shock``.
+    """
+    graph = await _regime_graph(req.regime)
+    scenarios = [(s.factor_id, s.shock_size) for s in req.scenarios]
+    results = await run_in_threadpool(
+        propagate_shocks, graph, scenarios, req.horizon, composite=req.composite
+    )
+    if req.composite:
+        return {
+            "composite": True,
+            "regime": graph.regime,
+            "scenarios": [s.model_dump() for s in req.scenarios],
+            "impacts": results[0],
+        }
+    return {
+        "composite": False,
+        "regime": graph.regime,
+        "results": [
+            {"factor_id": s.factor_id, "shock_size": s.shock_size, "impacts": r}
+            for s, r in zip(req.scenarios, results)
+        ],
+    }
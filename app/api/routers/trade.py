@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-import json
 from enum import Enum
 
 from fastapi import APIRouter, Depends, Query
 from fastapi.concurrency import run_in_threadpool
 
+from app.api.caching import cached
 from app.api.schemas.common import Page
-from app.core import cache, db
+from app.core import db
 
 
 class TradeFlow(str, Enum):
@@ -20,6 +20,7 @@ router = APIRouter(tags=["logistics"])
 
 
 @router.get("/logistics/trade")
+@cached("trade", tags=["trade_flows"])
 async def get_trade_flows(
     reporter: str = Query(..., min_length=2, max_length=2),
     partner: str | None = Query(None, min_length=2, max_length=5),
@@ -29,16 +30,6 @@ async def get_trade_flows(
     period_end: str | None = Query(None, min_length=6, max_length=6),
     page: Page = Depends(),
 ):
-    key = (
-        f"trade:{reporter}:{partner}:{hs}:{flow.value}:{period_start}:{period_end}:"
-        f"{page.limit}:{page.offset}"
-    )
-    cached = await cache.cache_get(key)
-    if cached:
-        if isinstance(cached, (bytes, str)):
-            return json.loads(cached)
-        return cached
-
     sql = (
         "SELECT reporter_iso2, partner_iso2, hs_code, flow, period, value_usd, "
         "quantity, quantity_unit "
@@ -74,5 +65,4 @@ async def get_trade_flows(
     rows = await run_in_threadpool(db.fetch_all, sql, params)
     count_row = await run_in_threadpool(db.fetch_one, count_sql, params)
     resp = {"data": rows, "count": count_row.get("count", 0) if count_row else 0}
-    await cache.cache_set(key, json.dumps(resp), ttl=30)
     return resp
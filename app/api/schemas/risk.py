@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+
+
+class ShockScenario(BaseModel):
+    factor_id: int
+    shock_size: float = settings.default_shock_sigma
+
+
+class SimulateShockBatchRequest(BaseModel):
+    scenarios: list[ShockScenario] = Field(..., min_length=1, max_length=5000)
+    horizon: int = Field(3, ge=0, le=50)
+    composite: bool = False
+    regime: str | None = None
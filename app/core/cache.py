@@ -1,44 +1,191 @@
+"""Two-tier response cache: a bounded in-process LRU in front of Redis.
+
+Reads try the local tier first and fall back to Redis, copying Redis hits
+into the local tier for no longer than their remaining Redis TTL. Writes go
+to both tiers. Without Redis the local tier is the only cache.
+
+:func:`cache_get_or_set` computes missing values single-flight: concurrent
+misses of a key in one process share one computation, and across workers the
+first to take a short Redis lock computes while the others wait for its value.
+Values are kept for a stale window past their TTL: a read in that window
+gets the old value at once while a single background task recomputes it.
+
+Entries can also be tagged with the tables they are read from. Ingestion
+bumps a version per tag in Redis and announces it with
+:func:`publish_invalidation`; every API worker follows the announcements and
+folds the current versions of an entry's tags into its key (see
+:func:`tag_versions`), so a write makes the entries built from the old data
+unreachable at once.
+"""
+
 from __future__ import annotations
 
+import asyncio
+import json
+import logging
+import sys
 import time
-from typing import Any, Dict
+import uuid
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Iterable, Mapping
 
 from app.core.config import settings
+from app.core.telemetry import CACHE_LOOKUPS
 
 try:  # pragma: no cover - optional dependency
     import redis.asyncio as redis  # type: ignore[import]
 except Exception:  # pragma: no cover - fallback
     redis = None  # type: ignore
 
+logger = logging.getLogger(__name__)
+
+
+def _prefix(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+def _sizeof(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    return sys.getsizeof(value)
+
 
 class LocalCache:
-    def __init__(self) -> None:
-        self._store: Dict[str, tuple[float, Any]] = {}
+    """LRU cache bounded by entry count, total size and per-prefix counts.
+
+    ``prefix_limits`` caps the entries of every key prefix (the part before
+    the first ``:``); the ``"*"`` entry applies to each prefix not listed
+    and ``0`` keeps a prefix out of the local tier. Expired entries are
+    dropped when read and by a sweep over the whole cache that runs at most
+    every ``sweep_interval`` seconds from :meth:`get` and :meth:`set`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        prefix_limits: Mapping[str, int] | None = None,
+        sweep_interval: float = 30.0,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.prefix_limits = dict(prefix_limits or {})
+        self.sweep_interval = sweep_interval
+        self.nbytes = 0
+        # key -> (expires_at, value, size), least recently used first
+        self._store: "OrderedDict[str, tuple[float, Any, int]]" = OrderedDict()
+        self._by_prefix: Dict[str, "OrderedDict[str, None]"] = {}
+        self._swept_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def limit_for(self, key: str) -> int | None:
+        prefix = _prefix(key)
+        return self.prefix_limits.get(prefix, self.prefix_limits.get("*"))
 
     def get(self, key: str) -> Any | None:
+        found = self.lookup(key)
+        return None if found is None else found[0]
+
+    def lookup(self, key: str) -> tuple[Any, float] | None:
+        """Return the value of ``key`` and its remaining TTL in seconds."""
+        now = time.monotonic()
+        self._maybe_sweep(now)
         item = self._store.get(key)
-        if not item:
+        if item is None:
             return None
-        exp, value = item
-        if exp < time.time():
-            del self._store[key]
+        if item[0] <= now:
+            self.delete(key)
             return None
-        return value
+        self._store.move_to_end(key)
+        self._by_prefix[_prefix(key)].move_to_end(key)
+        return item[1], item[0] - now
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.monotonic()
+        self._maybe_sweep(now)
+        self.delete(key)
+        size = _sizeof(value)
+        limit = self.limit_for(key)
+        if ttl <= 0 or limit == 0 or size > self.max_bytes:
+            return
+        prefix = _prefix(key)
+        if limit is not None:
+            while len(self._by_prefix.get(prefix, ())) >= limit:
+                self.delete(next(iter(self._by_prefix[prefix])))
+        while self._store and (
+            len(self._store) >= self.max_entries or self.nbytes + size > self.max_bytes
+        ):
+            self.delete(next(iter(self._store)))
+        self._store[key] = (now + ttl, value, size)
+        self._by_prefix.setdefault(prefix, OrderedDict())[key] = None
+        self.nbytes += size
+
+    def delete(self, key: str) -> None:
+        item = self._store.pop(key, None)
+        if item is None:
+            return
+        self.nbytes -= item[2]
+        prefix = _prefix(key)
+        keys = self._by_prefix[prefix]
+        del keys[key]
+        if not keys:
+            del self._by_prefix[prefix]
+
+    def sweep(self, now: float | None = None) -> int:
+        """Drop every expired entry and return how many were removed."""
+        now = time.monotonic() if now is None else now
+        expired = [k for k, (exp, _, _) in self._store.items() if exp <= now]
+        for key in expired:
+            self.delete(key)
+        self._swept_at = now
+        return len(expired)
+
+    def clear(self) -> None:
+        self._store.clear()
+        self._by_prefix.clear()
+        self.nbytes = 0
 
-    def set(self, key: str, value: Any, ttl: int) -> None:
-        self._store[key] = (time.time() + ttl, value)
+    def _maybe_sweep(self, now: float) -> None:
+        if now - self._swept_at >= self.sweep_interval:
+            self.sweep(now)
 
 
+# Deletes the lock only while it still holds this caller's token, so a leader
+# that overran the lock never releases its successor's.
+_UNLOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Hash of tag -> version; tags are ``table`` or ``table:column=value``.
+VERSIONS_KEY = "cache:versions"
+_RESUBSCRIBE_SECONDS = 1.0
+
 _client: Any | None = None
-_local_cache = LocalCache()
+_listener: "asyncio.Task[None] | None" = None
+_feed_live = False
+_versions: Dict[str, int] = {}
+_inflight: Dict[str, "asyncio.Task[Any]"] = {}
+_local_cache = LocalCache(
+    settings.cache_local_max_entries,
+    settings.cache_local_max_bytes,
+    settings.cache_local_prefix_limits,
+    settings.cache_sweep_seconds,
+)
 
 
 async def init_cache() -> None:
-    global _client
+    global _client, _listener
     if settings.redis_dsn and redis is not None:
         try:
             _client = redis.from_url(settings.redis_dsn)
             await _client.ping()
+            _listener = asyncio.create_task(_follow_invalidations(_client))
             return
         except Exception:  # pragma: no cover - fall back
             _client = None
@@ -46,7 +193,11 @@ async def init_cache() -> None:
 
 
 def close_cache() -> None:
-    global _client
+    global _client, _listener, _feed_live
+    _feed_live = False
+    if _listener is not None:
+        _listener.cancel()
+        _listener = None
     if _client is not None:
         try:
             _client.close()  # type: ignore[attr-defined]
@@ -55,14 +206,198 @@ def close_cache() -> None:
         _client = None
 
 
+def tag(table: str, column: str | None = None, value: Any = None) -> str:
+    """Return the tag of ``table``, or of its rows where ``column == value``."""
+    if column is None:
+        return table.lower()
+    return f"{table}:{column}={value}".lower()
+
+
+def tag_versions(tags: Iterable[str]) -> str:
+    """Return the current versions of ``tags`` as a cache key suffix.
+
+    A ``table:column=value`` tag also carries the version of ``table``, so
+    both table-wide and keyed writes change the suffix.
+    """
+    parts = []
+    for t in tags:
+        t = t.lower()
+        table = t.split(":", 1)[0]
+        if table != t:
+            parts.append(str(_versions.get(table, 0)))
+        parts.append(str(_versions.get(t, 0)))
+    return ".".join(parts)
+
+
+def publish_invalidation(client: Any, tags: Iterable[str]) -> Dict[str, int]:
+    """Bump the version of every tag and announce the new versions.
+
+    ``client`` is a synchronous Redis client, as used by ingestion. Returns
+    the new versions.
+    """
+    tags = sorted({t.lower() for t in tags})
+    if not tags:
+        return {}
+    pipe = client.pipeline()
+    for t in tags:
+        pipe.hincrby(VERSIONS_KEY, t, 1)
+    versions = dict(zip(tags, (int(v) for v in pipe.execute())))
+    client.publish(settings.cache_invalidation_channel, json.dumps(versions))
+    return versions
+
+
+def _apply_versions(versions: Mapping[Any, Any]) -> None:
+    for t, v in versions.items():
+        t = t.decode() if isinstance(t, bytes) else t
+        _versions[t] = max(_versions.get(t, 0), int(v))
+
+
+def invalidation_live() -> bool:
+    """Whether this worker currently receives ingestion's invalidations."""
+    return _feed_live
+
+
+async def _follow_invalidations(client: Any) -> None:
+    global _feed_live
+    while True:
+        try:
+            pubsub = client.pubsub()
+            await pubsub.subscribe(settings.cache_invalidation_channel)
+            # Read the versions only once subscribed, so no bump published in
+            # between is missed.
+            _apply_versions(await client.hgetall(VERSIONS_KEY))
+            _feed_live = True
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    _apply_versions(json.loads(message["data"]))
+        except asyncio.CancelledError:
+            _feed_live = False
+            raise
+        except Exception as exc:
+            _feed_live = False
+            logger.warning("cache invalidation feed lost: %s", exc)
+            await asyncio.sleep(_RESUBSCRIBE_SECONDS)
+
+
+async def _lookup(key: str) -> tuple[Any | None, float, str]:
+    found = _local_cache.lookup(key)
+    if found is not None:
+        return found[0], found[1], "local"
+    if _client is None:
+        return None, 0.0, "miss"
+    # Value and remaining TTL in one round trip, so the local copy never
+    # outlives the shared one.
+    async with _client.pipeline(transaction=False) as pipe:
+        pipe.get(key)
+        pipe.pttl(key)
+        value, pttl = await pipe.execute()
+    if value is None:
+        return None, 0.0, "miss"
+    if pttl is None or pttl < 0:
+        return value, float("inf"), "redis"
+    _local_cache.set(key, value, pttl / 1000.0)
+    return value, pttl / 1000.0, "redis"
+
+
 async def cache_get(key: str) -> Any | None:
-    if _client is not None:
-        return await _client.get(key)
-    return _local_cache.get(key)
+    value, _, result = await _lookup(key)
+    CACHE_LOOKUPS.labels(result).inc()
+    return value
 
 
 async def cache_set(key: str, value: Any, ttl: int = 30) -> None:
+    _local_cache.set(key, value, ttl)
     if _client is not None:
         await _client.setex(key, ttl, value)
-    else:
-        _local_cache.set(key, value, ttl)
+
+
+async def cache_get_or_set(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    ttl: int = 30,
+    stale: int | None = None,
+) -> Any:
+    """Return the cached value of ``key``, computing and storing it on a miss.
+
+    Values are stored for ``ttl`` plus ``stale`` seconds (default
+    ``cache_stale_seconds``). Once ``ttl`` has passed the value is returned
+    as is and recomputed in the background; only a read after both have
+    passed waits for ``compute``. Callers missing the same key concurrently
+    await a single ``compute`` call, which keeps running if the caller that
+    started it is cancelled. ``compute`` must return the value to cache.
+    """
+    stale = settings.cache_stale_seconds if stale is None else stale
+    value, remaining, result = await _lookup(key)
+    if value is not None and remaining <= stale:
+        CACHE_LOOKUPS.labels("stale").inc()
+        _start_fill(key, compute, ttl, stale, wait=False)
+        return value
+    CACHE_LOOKUPS.labels(result).inc()
+    if value is not None:
+        return value
+    value = await asyncio.shield(_start_fill(key, compute, ttl, stale, wait=True))
+    if value is None:
+        # Joined a background refresh that left the work to another worker.
+        value = await _fill(key, compute, ttl, stale, wait=True)
+    return value
+
+
+def _start_fill(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    ttl: int,
+    stale: int,
+    wait: bool,
+) -> "asyncio.Task[Any]":
+    task = _inflight.get(key)
+    if task is not None:
+        if wait:
+            CACHE_LOOKUPS.labels("coalesced").inc()
+        return task
+    task = asyncio.ensure_future(_fill(key, compute, ttl, stale, wait))
+    _inflight[key] = task
+    task.add_done_callback(partial(_fill_done, key, wait))
+    return task
+
+
+def _fill_done(key: str, wait: bool, task: "asyncio.Task[Any]") -> None:
+    _inflight.pop(key, None)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None and not wait:
+        logger.warning("cache refresh of %s failed: %s", key, exc)
+
+
+async def _fill(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    ttl: int,
+    stale: int,
+    wait: bool,
+) -> Any | None:
+    if _client is None:
+        value = await compute()
+        await cache_set(key, value, ttl + stale)
+        return value
+    lock = f"lock:{key}"
+    token = uuid.uuid4().hex
+    lock_ms = int(settings.cache_lock_seconds * 1000)
+    # Another worker holds the lock: a background refresh leaves the work to
+    # it, a blocking read waits for its value. The lock expires on its own,
+    # so a crashed or slow leader delays followers by at most
+    # ``cache_lock_seconds`` before one of them takes over.
+    while not await _client.set(lock, token, nx=True, px=lock_ms):
+        if not wait:
+            return None
+        await asyncio.sleep(settings.cache_lock_poll_seconds)
+        value, _, _ = await _lookup(key)
+        if value is not None:
+            CACHE_LOOKUPS.labels("coalesced").inc()
+            return value
+    try:
+        value = await compute()
+        await cache_set(key, value, ttl + stale)
+        return value
+    finally:
+        await _client.eval(_UNLOCK_SCRIPT, 1, lock, token)
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from app.core.config import settings
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_process_pool() -> ProcessPoolExecutor | None:
+    """Return the shared process pool, or ``None`` when disabled.
+
+    Workers are started by a fork server (or spawned where there is none)
+    instead of forking the threaded API process.
+    """
+    global _pool
+    if settings.compute_workers <= 1:
+        return None
+    if _pool is None:
+        methods = multiprocessing.get_all_start_methods()
+        method = "forkserver" if "forkserver" in methods else "spawn"
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.compute_workers,
+            mp_context=multiprocessing.get_context(method),
+        )
+    return _pool
+
+
+def close_process_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -22,10 +22,55 @@ class Settings(BaseSettings):  # type: ignore[misc]
     readiness_cache_ttl: int = Field(5, alias="READINESS_CACHE_TTL")
     cors_origins: list[str] = Field(default=["*"], alias="CORS_ORIGINS")
 
+    # Response cache
+    cache_local_max_entries: int = Field(10_000, alias="CACHE_LOCAL_MAX_ENTRIES")
+    cache_local_max_bytes: int = Field(64 * 1024 * 1024, alias="CACHE_LOCAL_MAX_BYTES")
+    cache_local_prefix_limits: dict[str, int] = Field(
+        default={
+            "*": 500,
+            "risk": 1000,
+            "port_snapshot": 1000,
+            "chokepoint_snapshot": 1000,
+        },
+        alias="CACHE_LOCAL_PREFIX_LIMITS",
+    )
+    cache_sweep_seconds: float = Field(30.0, alias="CACHE_SWEEP_SECONDS")
+    cache_stale_seconds: int = Field(60, alias="CACHE_STALE_SECONDS")
+    cache_lock_seconds: float = Field(5.0, alias="CACHE_LOCK_SECONDS")
+    cache_lock_poll_seconds: float = Field(0.05, alias="CACHE_LOCK_POLL_SECONDS")
+    cache_invalidation_channel: str = Field(
+        "cache:invalidate", alias="CACHE_INVALIDATION_CHANNEL"
+    )
+
     # Risk engine configuration
     risk_window_days: int = Field(30, alias="RISK_WINDOW_DAYS")
     max_lag_days: int = Field(180, alias="MAX_LAG_DAYS")
+    causality_lags: int = Field(5, alias="CAUSALITY_LAGS")
+    causality_alpha: float = Field(0.05, alias="CAUSALITY_ALPHA")
+    enet_penalty: float = Field(0.2, alias="ENET_PENALTY")
+    enet_l1_ratio: float = Field(0.9, alias="ENET_L1_RATIO")
+    enet_window: int = Field(252, alias="ENET_WINDOW")
+    enet_step: int = Field(21, alias="ENET_STEP")
+    dtw_window: int = Field(252, alias="DTW_WINDOW")
+    dtw_band: int = Field(20, alias="DTW_BAND")
+    dtw_min_similarity: float = Field(0.5, alias="DTW_MIN_SIMILARITY")
+    edge_stats_path: str = Field("data/edge_stats.npz", alias="EDGE_STATS_PATH")
     default_shock_sigma: float = Field(1.0, alias="DEFAULT_SHOCK_SIGMA")
+    influence_matrix_path: str = Field(
+        "data/influence.npz", alias="INFLUENCE_MATRIX_PATH"
+    )
+    influence_threshold: float = Field(1e-6, alias="INFLUENCE_THRESHOLD")
+    systemic_decay: float = Field(0.7, alias="SYSTEMIC_DECAY")
+    systemic_horizon: int = Field(0, alias="SYSTEMIC_HORIZON")
+    graph_edge_method: str = Field("corr", alias="GRAPH_EDGE_METHOD")
+    graph_prune_top_k: int = Field(16, alias="GRAPH_PRUNE_TOP_K")
+    graph_prune_min_weight: float = Field(0.01, alias="GRAPH_PRUNE_MIN_WEIGHT")
+    graph_version_check_seconds: float = Field(5.0, alias="GRAPH_VERSION_CHECK_SECONDS")
+    compute_workers: int = Field(0, alias="COMPUTE_WORKERS")
+    monte_carlo_chunk_size: int = Field(1000, alias="MONTE_CARLO_CHUNK_SIZE")
+    monte_carlo_max_edge_draws: int = Field(
+        50_000_000, alias="MONTE_CARLO_MAX_EDGE_DRAWS"
+    )
 
     # Optional vector store for evidence embeddings
     vector_store_url: str | None = Field(None, alias="VECTOR_STORE_URL")
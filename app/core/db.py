@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Iterable
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator
 
 from psycopg2.extras import RealDictCursor
 from psycopg2.pool import SimpleConnectionPool
@@ -64,3 +65,18 @@ def fetch_one(sql: str, params: Iterable[Any] | None = None) -> dict[str, Any] |
         return dict(row) if row else None
     finally:
         release_conn(conn)
+
+
+@contextmanager
+def transaction() -> Iterator[Any]:
+    """Yield a cursor whose statements are committed together."""
+    conn = get_conn()
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            yield cur
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        release_conn(conn)
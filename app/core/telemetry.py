@@ -4,7 +4,13 @@ from time import perf_counter
 from typing import Awaitable, Callable
 
 from fastapi import APIRouter, Request, Response
-from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
 
 router = APIRouter()
 
@@ -13,16 +19,41 @@ REQUEST_COUNT = Counter(
 )
 REQUEST_LATENCY = Histogram("request_latency_seconds", "Request latency", ["endpoint"])
 
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total", "Response cache lookups by result", ["result"]
+)
+
 RISK_COMPUTE_COUNT = Counter("risk_compute_total", "Risk computations")
 RISK_COMPUTE_LATENCY = Histogram(
     "risk_compute_latency_seconds", "Risk computation latency"
 )
 GRAPH_UPDATE_COUNT = Counter("graph_update_total", "Factor graph updates")
 CASCADE_SIM_COUNT = Counter("cascade_sim_total", "Cascade simulations")
+EDGE_INFERENCE_PAIRS_DONE = Gauge(
+    "edge_inference_pairs_done", "Factor pairs evaluated by the running inference"
+)
+EDGE_INFERENCE_PAIRS_EXPECTED = Gauge(
+    "edge_inference_pairs_expected", "Factor pairs scheduled for the running inference"
+)
+RISK_METRICS_PHASE_SECONDS = Histogram(
+    "risk_metrics_phase_seconds", "risk_metrics job duration per phase", ["phase"]
+)
+RISK_METRICS_OBSERVATIONS = Counter(
+    "risk_metrics_observations_total", "Observations folded in by risk_metrics"
+)
+
+_graph_update_hooks: list[Callable[[], None]] = []
+
+
+def on_graph_update(hook: Callable[[], None]) -> None:
+    """Register ``hook`` to be called whenever the factor graph changes."""
+    _graph_update_hooks.append(hook)
 
 
 def record_graph_update() -> None:
     GRAPH_UPDATE_COUNT.inc()
+    for hook in _graph_update_hooks:
+        hook()
 
 
 def record_cascade_sim() -> None:
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "graph_versions",
+        sa.Column("graph", sa.String(), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_factor_graph_version() RETURNS TRIGGER AS $$
+        BEGIN
+            INSERT INTO graph_versions (graph, version, updated_at)
+            VALUES ('factor_edges', 1, NOW())
+            ON CONFLICT (graph) DO UPDATE
+            SET version = graph_versions.version + 1, updated_at = NOW();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_factor_edges_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON factor_edges
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_factor_graph_version()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_factor_edges_version ON factor_edges")
+    op.execute("DROP FUNCTION IF EXISTS bump_factor_graph_version()")
+    op.drop_table("graph_versions")
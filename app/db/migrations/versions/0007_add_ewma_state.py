@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ewma_state",
+        sa.Column(
+            "series_id",
+            sa.String(),
+            sa.ForeignKey("series.series_id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("span", sa.Integer(), primary_key=True),
+        sa.Column("last_ts", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_log", sa.Float(), nullable=True),
+        sa.Column("mean", sa.Float(), nullable=False),
+        sa.Column("var", sa.Float(), nullable=False),
+        sa.Column("sum_w", sa.Float(), nullable=False),
+        sa.Column("sum_w2", sa.Float(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ewma_state")
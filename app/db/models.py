@@ -5,6 +5,7 @@ from datetime import date, datetime
 
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Boolean,
     Date,
     DateTime,
@@ -298,3 +299,41 @@ class RiskSnapshot(Base):
     node_shock_sigma: Mapped[float | None] = mapped_column(Float, nullable=True)
     impact_pct: Mapped[float | None] = mapped_column(Float, nullable=True)
     systemic_contrib: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+
+class GraphVersion(Base):
+    __tablename__ = "graph_versions"
+
+    graph: Mapped[str] = mapped_column(String, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow
+    )
+
+
+class CurrentRegime(Base):
+    __tablename__ = "current_regime"
+
+    scope: Mapped[str] = mapped_column(String, primary_key=True)
+    regime: Mapped[str | None] = mapped_column(String, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow
+    )
+
+
+class EwmaState(Base):
+    __tablename__ = "ewma_state"
+
+    series_id: Mapped[str] = mapped_column(
+        String, ForeignKey("series.series_id", ondelete="CASCADE"), primary_key=True
+    )
+    span: Mapped[int] = mapped_column(Integer, primary_key=True)
+    last_ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_log: Mapped[float | None] = mapped_column(Float, nullable=True)
+    mean: Mapped[float] = mapped_column(Float, nullable=False)
+    var: Mapped[float] = mapped_column(Float, nullable=False)
+    sum_w: Mapped[float] = mapped_column(Float, nullable=False)
+    sum_w2: Mapped[float] = mapped_column(Float, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow
+    )
@@ -7,7 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.deps import rate_limit
 from app.api.routers import auth, datasources, health, jobs, v1
-from app.core import cache, db
+from app.core import cache, compute, db
 from app.core.config import settings
 from app.core.logging import configure_logging
 from app.core.telemetry import metrics_middleware
@@ -52,6 +52,7 @@ async def _startup() -> None:
 async def _shutdown() -> None:
     db.close_pool()
     cache.close_cache()
+    compute.close_process_pool()
 
 
 @app.middleware("http")  # type: ignore[misc]
@@ -0,0 +1,284 @@
+"""Scheduled job to re-estimate factor edges from observations."""
+
+from __future__ import annotations
+
+import logging
+import os
+from datetime import date
+from typing import Any, Dict, Sequence
+
+import pandas as pd
+from fastapi.concurrency import run_in_threadpool
+from psycopg2.extras import execute_values
+
+from app.core import db
+from app.core.config import settings
+from app.core.telemetry import (
+    EDGE_INFERENCE_PAIRS_DONE,
+    EDGE_INFERENCE_PAIRS_EXPECTED,
+    record_graph_update,
+)
+from risk_engine.edges import EdgeEstimate, infer_edges
+from risk_engine.incremental import PairStatistics
+
+logger = logging.getLogger(__name__)
+
+METHOD = "corr"
+
+
+def _method_options(method: str) -> Dict[str, Any]:
+    if method == "enet":
+        return {
+            "penalty": settings.enet_penalty,
+            "l1_ratio": settings.enet_l1_ratio,
+            "window": settings.enet_window,
+            "step": settings.enet_step,
+        }
+    if method == "dtw":
+        return {
+            "window": settings.dtw_window,
+            "min_similarity": settings.dtw_min_similarity,
+        }
+    return {}
+
+
+def _max_lag(method: str) -> int:
+    if method == "dtw":
+        return settings.dtw_band
+    return settings.max_lag_days if method == METHOD else settings.causality_lags
+
+
+def _report_progress(done: int, total: int) -> None:
+    EDGE_INFERENCE_PAIRS_EXPECTED.set(total)
+    EDGE_INFERENCE_PAIRS_DONE.set(done)
+
+
+def load_factor_series(
+    factors: Sequence[dict[str, Any]], obs: Sequence[dict[str, Any]]
+) -> Dict[int, pd.Series]:
+    """Build one time series per factor from ``(series_id, ts, value)`` rows."""
+    if not obs:
+        return {}
+    frame = pd.DataFrame(obs, columns=["series_id", "ts", "value"])
+    by_series = {
+        sid: pd.Series(group["value"].to_numpy(dtype=float), index=group["ts"])
+        for sid, group in frame.groupby("series_id", sort=False)
+    }
+    return {
+        row["factor_id"]: by_series[row["series_id"]]
+        for row in factors
+        if row["series_id"] in by_series
+    }
+
+
+def _sample_window(a: pd.Series, b: pd.Series) -> tuple[date, date]:
+    start = max(a.index.min(), b.index.min())
+    end = min(a.index.max(), b.index.max())
+    return pd.Timestamp(start).date(), pd.Timestamp(end).date()
+
+
+def _edge_row(method: str, e: EdgeEstimate, start: date, end: date) -> tuple:
+    return (
+        e["src_factor"],
+        e["dst_factor"],
+        1 if e["beta"] >= 0 else -1,
+        e["lag_days"],
+        e["beta"],
+        method,
+        e["confidence"],
+        start,
+        end,
+        e.get("p_value"),
+        e.get("transfer_entropy"),
+    )
+
+
+def _insert_edges(cur: Any, rows: Sequence[tuple]) -> None:
+    execute_values(
+        cur,
+        "INSERT INTO factor_edges (src_factor, dst_factor, sign, lag_days, "
+        "beta, method, confidence, sample_start, sample_end, p_value, "
+        "transfer_entropy) VALUES %s",
+        rows,
+        page_size=1000,
+    )
+
+
+def replace_edges(
+    method: str, edges: Sequence[EdgeEstimate], data: Dict[int, pd.Series]
+) -> int:
+    """Atomically replace all ``factor_edges`` rows produced by ``method``."""
+    rows = [
+        _edge_row(
+            method,
+            e,
+            *(
+                (e["sample_start"], e["sample_end"])
+                if "sample_start" in e
+                else _sample_window(data[e["src_factor"]], data[e["dst_factor"]])
+            ),
+        )
+        for e in edges
+    ]
+    with db.transaction() as cur:
+        cur.execute("DELETE FROM factor_edges WHERE method = %(m)s", {"m": method})
+        _insert_edges(cur, rows)
+    return len(rows)
+
+
+def replace_pair_edges(
+    method: str, pairs: Sequence[tuple[int, int]], edges: Sequence[EdgeEstimate]
+) -> int:
+    """Atomically replace the ``method`` rows of ``pairs`` (either direction)."""
+    rows = [_edge_row(method, e, e["sample_start"], e["sample_end"]) for e in edges]
+    with db.transaction() as cur:
+        cur.execute(
+            "DELETE FROM factor_edges fe "
+            "USING unnest(%(src)s::int[], %(dst)s::int[]) AS p(a, b) "
+            "WHERE fe.method = %(m)s AND ("
+            "(fe.src_factor = p.a AND fe.dst_factor = p.b) OR "
+            "(fe.src_factor = p.b AND fe.dst_factor = p.a))",
+            {
+                "m": method,
+                "src": [a for a, _ in pairs],
+                "dst": [b for _, b in pairs],
+            },
+        )
+        _insert_edges(cur, rows)
+    return len(rows)
+
+
+async def _load_factors() -> Sequence[dict[str, Any]]:
+    return await run_in_threadpool(
+        db.fetch_all,
+        "SELECT factor_id, series_id FROM factors WHERE series_id IS NOT NULL "
+        "ORDER BY factor_id",
+    )
+
+
+async def _load_observations(
+    factors: Sequence[dict[str, Any]], since: date | None = None
+) -> Sequence[dict[str, Any]]:
+    return await run_in_threadpool(
+        db.fetch_all,
+        "SELECT series_id, ts, value FROM observations "
+        "WHERE series_id = ANY(%(sids)s) "
+        "AND (%(since)s::date IS NULL OR ts >= %(since)s::date) "
+        "ORDER BY series_id, ts",
+        {"sids": sorted({row["series_id"] for row in factors}), "since": since},
+    )
+
+
+async def run(method: str = METHOD) -> None:
+    """Re-estimate ``method`` edges between all factors with series.
+
+    Observations are read in one query, pairs are evaluated by
+    ``settings.compute_workers`` processes and the previous edges of
+    ``method`` are replaced in a single transaction. ``granger``, ``te`` and
+    ``enet`` use ``settings.causality_lags`` lags instead of ``max_lag_days``
+    and ``dtw`` uses ``settings.dtw_band`` as its warping band; ``enet`` and
+    ``dtw`` take their other parameters from the ``enet_*`` and ``dtw_*``
+    settings.
+    Progress is exported through the ``edge_inference_pairs_*`` gauges.
+    """
+    factors = await _load_factors()
+    if not factors:
+        return
+    data = load_factor_series(factors, await _load_observations(factors))
+    edges = await run_in_threadpool(
+        infer_edges,
+        data,
+        _max_lag(method),
+        workers=max(1, settings.compute_workers),
+        progress=_report_progress,
+        method=method,
+        alpha=settings.causality_alpha,
+        **_method_options(method),
+    )
+    written = await run_in_threadpool(replace_edges, method, edges, data)
+    record_graph_update()
+    logger.info(
+        "edge_inference",
+        extra={"method": method, "factors": len(data), "edges": written},
+    )
+
+
+async def run_granger() -> None:
+    """Re-estimate ``granger`` edges; see :func:`run`."""
+    await run("granger")
+
+
+async def run_te() -> None:
+    """Re-estimate ``te`` edges; see :func:`run`."""
+    await run("te")
+
+
+async def run_enet() -> None:
+    """Re-estimate ``enet`` edges; see :func:`run`."""
+    await run("enet")
+
+
+async def run_dtw() -> None:
+    """Re-estimate ``dtw`` edges; see :func:`run`."""
+    await run("dtw")
+
+
+def _load_stats(path: str) -> PairStatistics | None:
+    if not os.path.exists(path):
+        return None
+    try:
+        stats = PairStatistics.load(path)
+    except Exception as exc:  # pragma: no cover - corrupt state file
+        logger.warning("edge statistics unreadable, rebuilding: %s", exc)
+        return None
+    return stats if stats.max_lag == settings.max_lag_days else None
+
+
+def _save_stats(stats: PairStatistics, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    stats.save(path)
+
+
+async def refresh(rebuild: bool = False) -> None:
+    """Incrementally update ``corr`` edges from newly arrived observations.
+
+    Per-pair, per-lag running sums are persisted at ``settings.edge_stats_path``.
+    Each run reads only observations from ``max_lag_days`` before the oldest
+    watermark onwards, folds the new points into the sums and rewrites the
+    edges of the pairs that changed. Without saved statistics, or with
+    ``rebuild``, the sums are recomputed from full history.
+    """
+    path = settings.edge_stats_path
+    factors = await _load_factors()
+    if not factors:
+        return
+    stats = None if rebuild else await run_in_threadpool(_load_stats, path)
+    ids = [row["factor_id"] for row in factors]
+    since = stats.context_start(ids) if stats is not None else None
+    data = load_factor_series(factors, await _load_observations(factors, since))
+
+    if stats is None:
+        stats = await run_in_threadpool(
+            PairStatistics.rebuild, data, settings.max_lag_days, path
+        )
+        edges = await run_in_threadpool(stats.estimates)
+        written = await run_in_threadpool(replace_edges, METHOD, edges, data)
+        pairs = len(stats.pairs())
+    else:
+        changed = await run_in_threadpool(stats.update, data)
+        edges = await run_in_threadpool(stats.estimates, changed)
+        positions = stats.pairs()[changed]
+        pairs_ids = [(stats.factor_ids[i], stats.factor_ids[j]) for i, j in positions]
+        written = await run_in_threadpool(replace_pair_edges, METHOD, pairs_ids, edges)
+        pairs = len(changed)
+    await run_in_threadpool(_save_stats, stats, path)
+    if pairs:
+        record_graph_update()
+    logger.info(
+        "edge_refresh", extra={"pairs": pairs, "edges": written, "since": since}
+    )
+
+
+async def rebuild() -> None:
+    """Recompute the persisted edge statistics from full history."""
+    await refresh(rebuild=True)
@@ -0,0 +1,42 @@
+"""Scheduled job to precompute the default-parameter influence matrix."""
+
+from __future__ import annotations
+
+import logging
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services import graph_service, influence_service
+from risk_engine.influence import InfluenceMatrix
+
+logger = logging.getLogger(__name__)
+
+
+async def run() -> None:
+    """Rebuild the influence matrix for the graph of the current regime.
+
+    Intended to run nightly: every factor is shocked with the default
+    ``/simulate_shock`` horizon and decay, impacts below
+    ``settings.influence_threshold`` are dropped and the matrix is written to
+    ``settings.influence_matrix_path`` tagged with the graph version.
+    """
+    graph = await graph_service.get_graph()
+    matrix = await run_in_threadpool(
+        InfluenceMatrix.build,
+        graph,
+        influence_service.HORIZON,
+        influence_service.DECAY,
+        settings.influence_threshold,
+    )
+    await run_in_threadpool(influence_service.install, matrix)
+    logger.info(
+        "influence_matrix",
+        extra={
+            "version": matrix.version,
+            "regime": matrix.regime,
+            "factors": int(matrix.node_ids.size),
+            "entries": int(matrix.values.size),
+            "bytes": matrix.nbytes,
+        },
+    )
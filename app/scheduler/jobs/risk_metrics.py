@@ -2,77 +2,278 @@
 
 from __future__ import annotations
 
+import logging
 from datetime import datetime
-from typing import Any, Sequence
+from typing import Any, Dict, List, Mapping, Sequence
 
+import numpy as np
 import pandas as pd
 from fastapi.concurrency import run_in_threadpool
+from psycopg2.extras import execute_values
 
 from app.core import db
 from app.core.config import settings
-from risk_engine.volatility import ewma_volatility
+from app.core.telemetry import RISK_METRICS_OBSERVATIONS, RISK_METRICS_PHASE_SECONDS
+from app.services import graph_service
+from risk_engine.graph import CompiledGraph
+from risk_engine.systemic import systemic_contributions
+from risk_engine.volatility import EwmaState
 
+logger = logging.getLogger(__name__)
+
+STATE_FIELDS = ("last_log", "mean", "var", "sum_w", "sum_w2")
+
+# Hops used when the systemic impact series does not converge.
+_FALLBACK_HORIZON = 3
+
+# Upper bound on ``series * observations`` laid out at once by ``compute``.
+_BLOCK_ELEMENTS = 1 << 22
+
+_FACTORS_SQL = "SELECT factor_id, series_id FROM factors WHERE series_id IS NOT NULL"
+_STATE_SQL = (
+    "SELECT series_id, last_ts, last_log, mean, var, sum_w, sum_w2 "
+    "FROM ewma_state WHERE span = %(span)s AND series_id = ANY(%(sids)s)"
+)
+_OBS_SQL = """
+    SELECT o.series_id, o.ts, o.value
+    FROM observations o
+    LEFT JOIN ewma_state s
+      ON s.series_id = o.series_id AND s.span = %(span)s AND NOT %(rebuild)s
+    WHERE o.series_id = ANY(%(sids)s)
+      AND (s.last_ts IS NULL OR o.ts > s.last_ts)
+    ORDER BY o.series_id, o.ts
+"""
 
-async def run() -> None:
-    """Recompute risk snapshots and aggregate risk metrics.
 
-    The job iterates over factors linked to time series, computes EWMA
-    volatility for each series, stores it in ``risk_snapshots``, and then
-    aggregates the latest volatilities into a global ``risk_metrics`` record.
+def state_from_rows(
+    series_ids: Sequence[str], rows: Mapping[str, Mapping[str, Any]], span: int
+) -> EwmaState:
+    """Build an :class:`EwmaState` for ``series_ids`` from ``ewma_state`` rows.
+
+    Series without a row start from an empty state.
     """
-    factors: Sequence[dict[str, Any]] = await run_in_threadpool(
-        db.fetch_all,
-        "SELECT factor_id, series_id FROM factors WHERE series_id IS NOT NULL",
-    )
-    now = datetime.utcnow()
-    for row in factors:
-        obs: Sequence[dict[str, Any]] = await run_in_threadpool(
-            db.fetch_all,
-            "SELECT ts, value FROM observations WHERE series_id = %(sid)s ORDER BY ts",
-            {"sid": row["series_id"]},
-        )
-        if not obs:
+    state = EwmaState.empty(len(series_ids), span)
+    for i, sid in enumerate(series_ids):
+        row = rows.get(sid)
+        if row is None:
             continue
-        series = pd.Series([o["value"] for o in obs], index=[o["ts"] for o in obs])
-        vol = ewma_volatility(series, span=settings.risk_window_days)
+        for field in STATE_FIELDS:
+            value = row[field]
+            getattr(state, field)[i] = np.nan if value is None else value
+    return state
+
+
+def state_params(state: EwmaState, i: int) -> Dict[str, float | None]:
+    """Return the ``ewma_state`` column values of series ``i``."""
+    params: Dict[str, float | None] = {}
+    for field in STATE_FIELDS:
+        value = float(getattr(state, field)[i])
+        params[field] = None if np.isnan(value) else value
+    return params
+
+
+def load_inputs(
+    span: int, rebuild: bool
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]]:
+    """Read factors, stored EWMA states and new observations on one connection.
+
+    Observations are those after each series' stored ``last_ts`` (all of them
+    with ``rebuild``), fetched in a single query.
+    """
+    with db.transaction() as cur:
+        cur.execute(_FACTORS_SQL)
+        factors = list(cur.fetchall())
         params = {
-            "factor_id": row["factor_id"],
-            "ts": now,
-            "node_vol": vol,
-            "node_shock_sigma": vol,
+            "span": span,
+            "rebuild": rebuild,
+            "sids": sorted({row["series_id"] for row in factors}),
         }
-        await run_in_threadpool(
-            db.fetch_one,
-            """
-            INSERT INTO risk_snapshots (
-                factor_id, ts, node_vol, node_shock_sigma, impact_pct, systemic_contrib
+        states: list[dict[str, Any]] = []
+        if not rebuild:
+            cur.execute(_STATE_SQL, params)
+            states = list(cur.fetchall())
+        cur.execute(_OBS_SQL, params)
+        obs = list(cur.fetchall())
+    return factors, states, obs
+
+
+def compute(
+    series_ids: Sequence[str],
+    states: Mapping[str, Mapping[str, Any]],
+    obs: Sequence[Mapping[str, Any]],
+    span: int,
+) -> tuple[EwmaState, Dict[str, Any]]:
+    """Fold ``obs`` into the stored states of ``series_ids`` in bulk.
+
+    The ``k``-th new observation of every series is laid out in column ``k``
+    of a ``(series, observations)`` panel, so one vectorized EWMA recursion
+    advances all series together. Returns the updated state and the last
+    observation timestamp of every series that received data.
+    """
+    state = state_from_rows(series_ids, states, span)
+    if not obs:
+        return state, {}
+    frame = pd.DataFrame(obs, columns=["series_id", "ts", "value"])
+    position = {sid: i for i, sid in enumerate(series_ids)}
+    rows = frame["series_id"].map(position).to_numpy()
+    cols = frame.groupby("series_id", sort=False).cumcount().to_numpy()
+    values = frame["value"].to_numpy(dtype=float)
+    width = int(cols.max()) + 1
+    block = max(1, _BLOCK_ELEMENTS // max(1, len(series_ids)))
+    for start in range(0, width, block):
+        stop = min(start + block, width)
+        sel = (cols >= start) & (cols < stop)
+        panel = np.full((len(series_ids), stop - start), np.nan)
+        mask = np.zeros(panel.shape, dtype=bool)
+        panel[rows[sel], cols[sel] - start] = values[sel]
+        mask[rows[sel], cols[sel] - start] = True
+        state.update(panel, mask)
+    last_ts = frame.groupby("series_id", sort=False)["ts"].last().to_dict()
+    return state, last_ts
+
+
+def systemic_scores(
+    graph: CompiledGraph, vols: Mapping[int, float]
+) -> Dict[int, tuple[float, float]]:
+    """Return ``(impact_pct, systemic_contrib)`` per factor of ``graph``.
+
+    Every factor is shocked by its own volatility for the contribution
+    shares. Uses ``settings.systemic_horizon`` hops, or the full Katz solve
+    when it is ``0``; a divergent solve falls back to a truncated series.
+    """
+    shocks = np.array([vols.get(int(f), 0.0) for f in graph.node_ids])
+    decay = settings.systemic_decay
+    try:
+        impact, contrib = systemic_contributions(
+            graph, shocks, decay, settings.systemic_horizon or None
+        )
+    except ValueError as exc:
+        logger.warning("%s, truncating at %d hops", exc, _FALLBACK_HORIZON)
+        impact, contrib = systemic_contributions(
+            graph, shocks, decay, _FALLBACK_HORIZON
+        )
+    return {
+        int(f): (float(i), float(c)) for f, i, c in zip(graph.node_ids, impact, contrib)
+    }
+
+
+def write_results(
+    state_rows: Sequence[tuple],
+    snapshot_rows: Sequence[tuple],
+    avg_vol: float | None,
+    now: datetime,
+) -> None:
+    """Upsert states, snapshots and the global metric in one transaction."""
+    with db.transaction() as cur:
+        if state_rows:
+            execute_values(
+                cur,
+                """
+                INSERT INTO ewma_state (
+                    series_id, span, last_ts, last_log, mean, var, sum_w, sum_w2,
+                    updated_at
+                )
+                VALUES %s
+                ON CONFLICT (series_id, span) DO UPDATE
+                SET last_ts = EXCLUDED.last_ts,
+                    last_log = EXCLUDED.last_log,
+                    mean = EXCLUDED.mean,
+                    var = EXCLUDED.var,
+                    sum_w = EXCLUDED.sum_w,
+                    sum_w2 = EXCLUDED.sum_w2,
+                    updated_at = EXCLUDED.updated_at
+                """,
+                state_rows,
+                page_size=1000,
+            )
+        if snapshot_rows:
+            execute_values(
+                cur,
+                """
+                INSERT INTO risk_snapshots (
+                    factor_id, ts, node_vol, node_shock_sigma, impact_pct,
+                    systemic_contrib
+                )
+                VALUES %s
+                ON CONFLICT (factor_id, ts) DO UPDATE
+                SET node_vol = EXCLUDED.node_vol,
+                    node_shock_sigma = EXCLUDED.node_shock_sigma,
+                    impact_pct = EXCLUDED.impact_pct,
+                    systemic_contrib = EXCLUDED.systemic_contrib
+                """,
+                snapshot_rows,
+                page_size=1000,
             )
-            VALUES (%(factor_id)s, %(ts)s, %(node_vol)s, %(node_shock_sigma)s, 0, 0)
-            ON CONFLICT (factor_id, ts) DO UPDATE
-            SET node_vol = EXCLUDED.node_vol,
-                node_shock_sigma = EXCLUDED.node_shock_sigma
-            RETURNING factor_id
-            """,
-            params,
+        if avg_vol is not None:
+            cur.execute(
+                """
+                INSERT INTO risk_metrics (entity_id, metric, value, updated_at)
+                VALUES ('GLOBAL', 'macro', %(val)s, %(ts)s)
+                ON CONFLICT (entity_id, metric) DO UPDATE
+                SET value = EXCLUDED.value, updated_at = EXCLUDED.updated_at
+                """,
+                {"val": avg_vol, "ts": now},
+            )
+
+
+async def run(rebuild: bool = False) -> None:
+    """Recompute risk snapshots and aggregate risk metrics.
+
+    The job runs as a set-based pipeline: one read of factors, stored EWMA
+    states (``ewma_state``, one row per series and span) and the
+    observations newer than each state's ``last_ts``; one vectorized update
+    of all states and one graph-wide systemic impact solve
+    (:func:`systemic_scores`); one transaction upserting the states, a
+    ``risk_snapshots`` row per linked factor and the global ``risk_metrics``
+    record (the mean of the snapshot volatilities). With ``rebuild`` stored
+    states are ignored and each series is replayed from its full history.
+    Phase durations are exported as ``risk_metrics_phase_seconds``.
+    """
+    span = settings.risk_window_days
+    now = datetime.utcnow()
+    with RISK_METRICS_PHASE_SECONDS.labels("read").time():
+        factors, state_list, obs = await run_in_threadpool(load_inputs, span, rebuild)
+
+    with RISK_METRICS_PHASE_SECONDS.labels("compute").time():
+        series_ids = sorted({row["series_id"] for row in factors})
+        states = {row["series_id"]: row for row in state_list}
+        state, last_ts = await run_in_threadpool(compute, series_ids, states, obs, span)
+        vols = np.nan_to_num(state.volatility, nan=0.0)
+        position = {sid: i for i, sid in enumerate(series_ids)}
+        state_rows = [
+            (sid, span, ts, *state_params(state, position[sid]).values(), now)
+            for sid, ts in last_ts.items()
+        ]
+        factor_vols = {
+            row["factor_id"]: float(vols[position[row["series_id"]]])
+            for row in factors
+            if row["series_id"] in states or row["series_id"] in last_ts
+        }
+        graph = await graph_service.get_graph()
+        scores = await run_in_threadpool(systemic_scores, graph, factor_vols)
+        snapshot_rows: List[tuple] = [
+            (factor_id, now, vol, vol, *scores.get(factor_id, (0.0, 0.0)))
+            for factor_id, vol in factor_vols.items()
+        ]
+        avg_vol = (
+            sum(r[2] for r in snapshot_rows) / len(snapshot_rows)
+            if snapshot_rows
+            else None
         )
+    RISK_METRICS_OBSERVATIONS.inc(len(obs))
 
-    vols: Sequence[dict[str, Any]] = await run_in_threadpool(
-        db.fetch_all,
-        """
-        SELECT node_vol FROM risk_snapshots
-        WHERE ts = (SELECT MAX(ts) FROM risk_snapshots)
-        """,
+    with RISK_METRICS_PHASE_SECONDS.labels("write").time():
+        await run_in_threadpool(write_results, state_rows, snapshot_rows, avg_vol, now)
+    logger.info(
+        "risk_metrics",
+        extra={
+            "series": len(series_ids),
+            "observations": len(obs),
+            "snapshots": len(snapshot_rows),
+        },
     )
-    if vols:
-        avg_vol = sum(v["node_vol"] for v in vols if v.get("node_vol")) / len(vols)
-        await run_in_threadpool(
-            db.fetch_one,
-            """
-            INSERT INTO risk_metrics (entity_id, metric, value, updated_at)
-            VALUES ('GLOBAL', 'macro', %(val)s, %(ts)s)
-            ON CONFLICT (entity_id, metric) DO UPDATE
-            SET value = EXCLUDED.value, updated_at = EXCLUDED.updated_at
-            RETURNING entity_id
-            """,
-            {"val": avg_vol, "ts": now},
-        )
+
+
+async def rebuild() -> None:
+    """Replay every series' full history into a fresh EWMA state."""
+    await run(rebuild=True)
@@ -0,0 +1,160 @@
+"""Process-wide compiled factor graph shared by the risk endpoints."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Dict
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core import db
+from app.core.config import settings
+from app.core.telemetry import on_graph_update
+from risk_engine.graph import CompiledGraph, compile_regime_graphs
+
+logger = logging.getLogger(__name__)
+
+_EDGES_SQL = (
+    "SELECT src_factor, dst_factor, beta, lag_days, confidence, regime, method "
+    "FROM factor_edges WHERE COALESCE(method, 'corr') = %(method)s"
+)
+_VERSION_SQL = (
+    "SELECT "
+    "(SELECT version FROM graph_versions WHERE graph = 'factor_edges') AS version, "
+    "(SELECT regime FROM current_regime WHERE scope = 'GLOBAL') AS regime"
+)
+
+
+class GraphCache:
+    """Compiled graphs tagged with the ``graph_versions`` row they come from.
+
+    Only edges of ``graph_edge_method`` are used, so pairs estimated by
+    several methods are not counted more than once. One graph is kept per
+    edge ``regime`` (see
+    :func:`risk_engine.graph.compile_regime_graphs`), all loaded side by
+    side, each with a sparsified copy holding only the ``graph_prune_top_k``
+    strongest outgoing edges of at least ``graph_prune_min_weight``. The
+    version row and the current regime label are polled at most every
+    ``check_interval`` seconds and the edges are re-read only when the
+    version changes or :meth:`invalidate` was called. If the version row is
+    unavailable the graphs are reloaded on every check.
+    """
+
+    def __init__(self, check_interval: float) -> None:
+        self.check_interval = check_interval
+        self.graphs: Dict[str | None, CompiledGraph] = {}
+        self.pruned: Dict[str | None, CompiledGraph] = {}
+        self.version: int | None = None
+        self.current_regime: str | None = None
+        self._checked_at = 0.0
+        self._stale = True
+        self._lock = threading.Lock()
+
+    @property
+    def graph(self) -> CompiledGraph | None:
+        return self.graphs.get(None)
+
+    def select(self, regime: str | None = None, pruned: bool = False) -> CompiledGraph:
+        """Return the graph of ``regime``, or of the current regime label.
+
+        ``pruned`` returns its sparsified copy. Raises ``KeyError`` for an
+        explicitly requested unknown regime; an unknown current label falls
+        back to the base graph.
+        """
+        if regime is None:
+            current = self.current_regime
+            regime = current if current in self.graphs else None
+        return (self.pruned if pruned else self.graphs)[regime]
+
+    def fresh(
+        self, regime: str | None = None, pruned: bool = False
+    ) -> CompiledGraph | None:
+        if self._stale or not self.graphs:
+            return None
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            return None
+        return self.select(regime, pruned)
+
+    def invalidate(self) -> None:
+        self._stale = True
+
+    def refresh(self, regime: str | None = None, pruned: bool = False) -> CompiledGraph:
+        with self._lock:
+            graph = self.fresh(regime, pruned)
+            if graph is not None:
+                return graph
+            version, current = _fetch_version()
+            if (
+                self._stale
+                or not self.graphs
+                or version is None
+                or version != self.version
+            ):
+                method = settings.graph_edge_method
+                rows = db.fetch_all(_EDGES_SQL, {"method": method})
+                graphs = compile_regime_graphs(rows, method)
+                for g in graphs.values():
+                    g.version = version
+                self.graphs, self.version = graphs, version
+                self.pruned = {
+                    r: g.sparsify(
+                        settings.graph_prune_top_k or None,
+                        settings.graph_prune_min_weight,
+                    )
+                    for r, g in graphs.items()
+                }
+                logger.info(
+                    "factor_graph_loaded",
+                    extra={
+                        "version": version,
+                        "edges": graphs[None].n_edges,
+                        "regimes": [r for r in graphs if r is not None],
+                    },
+                )
+            self.current_regime = current
+            self._stale = False
+            self._checked_at = time.monotonic()
+            return self.select(regime, pruned)
+
+
+def _fetch_version() -> tuple[int | None, str | None]:
+    try:
+        row = db.fetch_one(_VERSION_SQL, {})
+    except Exception as exc:
+        logger.warning("graph version lookup failed: %s", exc)
+        return None, None
+    if not row:
+        return None, None
+    version = row.get("version")
+    return (None if version is None else int(version)), row.get("regime")
+
+
+_cache = GraphCache(settings.graph_version_check_seconds)
+on_graph_update(_cache.invalidate)
+
+
+async def get_graph(regime: str | None = None, pruned: bool = False) -> CompiledGraph:
+    """Return the compiled graph of ``regime``, reloading it if it changed.
+
+    Without ``regime`` the graph of the current regime label is returned
+    (the base graph when no label is set); ``pruned`` selects its
+    sparsified copy. Raises ``KeyError`` if ``regime`` has no edges.
+    """
+    graph = _cache.fresh(regime, pruned)
+    if graph is not None:
+        return graph
+    return await run_in_threadpool(_cache.refresh, regime, pruned)
+
+
+def current_regime() -> str | None:
+    return _cache.current_regime
+
+
+def graph_version() -> int | None:
+    return _cache.version
+
+
+def invalidate() -> None:
+    _cache.invalidate()
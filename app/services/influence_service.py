@@ -0,0 +1,105 @@
+"""Precomputed influence matrix answering default-parameter shock queries."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from risk_engine.graph import CompiledGraph
+from risk_engine.influence import InfluenceMatrix
+
+logger = logging.getLogger(__name__)
+
+# Cascade parameters the matrix is precomputed for (``/simulate_shock``
+# defaults).
+HORIZON = 3
+DECAY = 0.7
+
+
+class InfluenceCache:
+    """Influence matrix loaded from ``path``, reloaded when the file changes.
+
+    The file's modification time is checked at most every
+    ``check_interval`` seconds so other processes pick up a nightly rebuild.
+    """
+
+    def __init__(self, path: str, check_interval: float) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        self.matrix: InfluenceMatrix | None = None
+        self._mtime: float | None = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def fresh(self) -> bool:
+        return time.monotonic() - self._checked_at < self.check_interval
+
+    def install(self, matrix: InfluenceMatrix) -> None:
+        """Write ``matrix`` to disk and serve it from this process."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        matrix.save(self.path)
+        with self._lock:
+            self.matrix = matrix
+            self._mtime = os.path.getmtime(self.path)
+            self._checked_at = time.monotonic()
+
+    def refresh(self) -> InfluenceMatrix | None:
+        with self._lock:
+            if self.fresh():
+                return self.matrix
+            try:
+                mtime: float | None = os.path.getmtime(self.path)
+            except OSError:
+                mtime = None
+            if mtime is None:
+                self.matrix = None
+            elif mtime != self._mtime:
+                try:
+                    self.matrix = InfluenceMatrix.load(self.path)
+                    logger.info(
+                        "influence_matrix_loaded",
+                        extra={"version": self.matrix.version},
+                    )
+                except Exception as exc:  # pragma: no cover - corrupt file
+                    logger.warning("influence matrix unreadable: %s", exc)
+                    self.matrix = None
+            self._mtime = mtime
+            self._checked_at = time.monotonic()
+            return self.matrix
+
+
+_cache = InfluenceCache(
+    settings.influence_matrix_path, settings.graph_version_check_seconds
+)
+
+
+async def get_matrix(
+    graph: CompiledGraph, horizon: int, decay: float = DECAY
+) -> InfluenceMatrix | None:
+    """Return the precomputed matrix if it can answer a query on ``graph``.
+
+    The matrix must have been built with ``horizon`` and ``decay`` from the
+    same graph version and regime; ``None`` means the live engine has to be used.
+    """
+    matrix = _cache.matrix if _cache.fresh() else None
+    if matrix is None:
+        matrix = await run_in_threadpool(_cache.refresh)
+    if (
+        matrix is None
+        or graph.version is None
+        or matrix.version != graph.version
+        or matrix.regime != graph.regime
+        or matrix.horizon != horizon
+        or matrix.decay != decay
+    ):
+        return None
+    return matrix
+
+
+def install(matrix: InfluenceMatrix) -> None:
+    _cache.install(matrix)
@@ -2,13 +2,29 @@ from __future__ import annotations
 
 from typing import Awaitable, Callable, Dict, List
 
-from app.scheduler.jobs import datasource_check, heartbeat
+from app.scheduler.jobs import (
+    datasource_check,
+    edge_inference,
+    heartbeat,
+    influence_matrix,
+    risk_metrics,
+)
 
 JobFunc = Callable[[], Awaitable[None]]
 
 REGISTRY: Dict[str, JobFunc] = {
     "heartbeat": heartbeat.run,
     "datasource_check": datasource_check.run,
+    "edge_inference": edge_inference.run,
+    "edge_inference_granger": edge_inference.run_granger,
+    "edge_inference_te": edge_inference.run_te,
+    "edge_inference_enet": edge_inference.run_enet,
+    "edge_inference_dtw": edge_inference.run_dtw,
+    "edge_refresh": edge_inference.refresh,
+    "edge_rebuild": edge_inference.rebuild,
+    "risk_metrics": risk_metrics.run,
+    "risk_metrics_rebuild": risk_metrics.rebuild,
+    "influence_matrix": influence_matrix.run,
 }
 
 
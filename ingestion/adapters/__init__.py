@@ -48,6 +48,7 @@ def adapter_factory(dataset_id: str, cfg: Dict[str, Any]):
         "target_table",
         "conflict_keys",
         "enabled",
+        "invalidate_by",
     }
     kwargs = {k: v for k, v in cfg.items() if k not in std_keys}
 
@@ -3,21 +3,30 @@ from __future__ import annotations
 import csv
 import io
 import json
-from typing import Iterable, Mapping
+from typing import Any, Callable, Iterable, Mapping, Sequence
 from uuid import uuid4
 
 import psycopg2
 
+from app.core.cache import tag
+
+UpsertFn = Callable[[Any, str, Iterable[Mapping[str, object]], list[str]], int]
+
 
 def bulk_upsert(
     conn: psycopg2.extensions.connection,
     table: str,
     rows: Iterable[Mapping[str, object]],
     conflict_keys: list[str],
+    written: list[dict[str, object]] | None = None,
+    returning: Sequence[str] = (),
 ) -> int:
     """COPY rows into a temp table then UPSERT into ``table``.
 
-    Returns the number of rows affected in the target table.
+    Returns the number of rows inserted or changed in the target table;
+    conflicting rows whose values are already stored are left untouched.
+    When ``written`` is given, the ``returning`` columns (the conflict keys
+    by default) of exactly those rows are appended to it.
     """
 
     row_list = list(rows)
@@ -54,15 +63,64 @@ def bulk_upsert(
         buffer,
     )
 
-    assignments = ", ".join(
-        f"{col}=EXCLUDED.{col}" for col in columns if col not in conflict_keys
+    updated = [col for col in columns if col not in conflict_keys]
+    assignments = ", ".join(f"{col}=EXCLUDED.{col}" for col in updated)
+    # Rows are compared as text because ``json`` columns have no equality
+    # operator.
+    current = ", ".join(f"t.{col}" for col in updated)
+    incoming = ", ".join(f"EXCLUDED.{col}" for col in updated)
+    action = (
+        f"DO UPDATE SET {assignments} "
+        f"WHERE ROW({current})::text IS DISTINCT FROM ROW({incoming})::text"
+        if updated
+        else "DO NOTHING"
     )
-    action = f"DO UPDATE SET {assignments}" if assignments else "DO NOTHING"
     sql = (
-        f"INSERT INTO {table} ({', '.join(columns)}) SELECT {', '.join(columns)} "
-        f"FROM {tmp_table} ON CONFLICT ({', '.join(conflict_keys)}) {action}"
+        f"INSERT INTO {table} AS t ({', '.join(columns)}) "
+        f"SELECT {', '.join(columns)} FROM {tmp_table} "
+        f"ON CONFLICT ({', '.join(conflict_keys)}) {action}"
     )
+    if written is not None:
+        returned = list(returning) or conflict_keys
+        sql += f" RETURNING {', '.join(returned)}"
     cur.execute(sql)
     affected = cur.rowcount
+    if written is not None:
+        written.extend(dict(zip(returned, row)) for row in cur.fetchall())
     conn.commit()
     return affected
+
+
+def track_upserts(
+    upsert_fn: Callable[..., int], touched: set[str], columns: Sequence[str] = ()
+) -> UpsertFn:
+    """Wrap ``upsert_fn`` to collect the cache tags of the data it changes.
+
+    ``upsert_fn`` takes the ``written`` and ``returning`` keywords of
+    :func:`bulk_upsert`. Every call that affects rows adds
+    ``table:column=value`` tags for the distinct values of ``columns`` in
+    the rows it actually wrote to ``touched``, or the plain ``table`` tag
+    when no ``columns`` are given or none of them is set.
+    """
+
+    def upsert(
+        conn: Any,
+        table: str,
+        rows: Iterable[Mapping[str, object]],
+        conflict_keys: list[str],
+    ) -> int:
+        written: list[dict[str, object]] = []
+        affected = upsert_fn(
+            conn, table, rows, conflict_keys, written=written, returning=columns
+        )
+        if affected:
+            tags = {
+                tag(table, col, row[col])
+                for row in written
+                for col in columns
+                if row.get(col) is not None
+            }
+            touched.update(tags or {tag(table)})
+        return affected
+
+    return upsert
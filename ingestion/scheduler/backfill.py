@@ -2,10 +2,14 @@ from __future__ import annotations
 
 from datetime import datetime
 
+import redis  # type: ignore[import-untyped]
+
+from app.core.config import settings
 from app.core.db import get_conn, release_conn
 from ingestion.adapters import adapter_factory
-from ingestion.loaders.postgres import bulk_upsert
+from ingestion.loaders.postgres import bulk_upsert, track_upserts
 from ingestion.registry import load_registry
+from ingestion.scheduler.jobs import announce_writes
 
 
 def backfill(dataset: str, start: datetime, end: datetime) -> None:
@@ -27,16 +31,19 @@ def backfill(dataset: str, start: datetime, end: datetime) -> None:
         raise KeyError(f"Unknown dataset: {dataset}")
 
     conn = get_conn()
+    touched: set[str] = set()
     try:
         adapter = adapter_factory(dataset, cfg)
         setattr(adapter, "start", start)
         setattr(adapter, "end", end)
         adapter.run(
             conn,
-            bulk_upsert,
+            track_upserts(bulk_upsert, touched, cfg.get("invalidate_by", ())),
             cfg["target_table"],
             cfg["conflict_keys"],
             cursor=start,
         )
     finally:
         release_conn(conn)
+        if touched:
+            announce_writes(redis.Redis.from_url(settings.redis_dsn), touched)
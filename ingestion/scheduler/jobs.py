@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+import logging
 import time
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Iterable
 
 import redis  # type: ignore[import-untyped]
 from apscheduler.schedulers.background import BackgroundScheduler
 from prometheus_client import Counter, Histogram
 
+from app.core.cache import publish_invalidation
 from app.core.config import settings
+from ingestion.loaders.postgres import track_upserts
+
+logger = logging.getLogger(__name__)
 
 INGEST_SUCCESS = Counter(
     "ingestion_success_total", "Successful ingestion runs", ["dataset_id"]
@@ -32,10 +37,18 @@ def _cadence_seconds(cadence: str) -> int:
     }.get(cadence, 3600)
 
 
+def announce_writes(client: Any, tags: Iterable[str]) -> None:
+    """Tell the API caches which tables a run changed; never fails the run."""
+    try:
+        publish_invalidation(client, tags)
+    except Exception as exc:
+        logger.warning("cache invalidation publish failed: %s", exc)
+
+
 def schedule_jobs(
     registry: Dict[str, Any],
     adapter_factory: Callable[[str, Dict[str, Any]], Any],
-    upsert_fn: Callable[[Any, str, Any, list[str]], int],
+    upsert_fn: Callable[..., int],
     get_conn: Callable[[], Any],
     release_conn: Callable[[Any], None],
 ) -> BackgroundScheduler:
@@ -57,11 +70,12 @@ def schedule_jobs(
                 delay = time.time() - float(last_ts)
                 INGEST_DELAY.labels(dataset_id).observe(delay)
             conn = get_conn()
+            touched: set[str] = set()
             try:
                 adapter = adapter_factory(dataset_id, cfg)
                 adapter.run(
                     conn,
-                    upsert_fn,
+                    track_upserts(upsert_fn, touched, cfg.get("invalidate_by", ())),
                     cfg["target_table"],
                     cfg["conflict_keys"],
                 )
@@ -78,6 +92,7 @@ def schedule_jobs(
                 raise
             finally:
                 release_conn(conn)
+                announce_writes(cache, touched)
 
         scheduler.add_job(
             job,
@@ -47,7 +47,7 @@ def test_backfill_invokes_adapter(monkeypatch):
     def fake_factory(dataset_id, cfg):
         return DummyAdapter()
 
-    def fake_bulk(conn, table, rows, keys):
+    def fake_bulk(conn, table, rows, keys, written=None, returning=()):
         calls["bulk"] = True
         return 0
 
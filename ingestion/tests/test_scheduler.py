@@ -26,7 +26,7 @@ def test_schedule_jobs_runs_and_caches(monkeypatch):
 
     calls = {}
 
-    def fake_bulk(conn, table, rows, keys):
+    def fake_bulk(conn, table, rows, keys, written=None, returning=()):
         calls["table"] = table
         calls["rows"] = rows
         calls["keys"] = keys
@@ -88,7 +88,7 @@ def test_schedule_jobs_respects_cadence(monkeypatch):
     def fake_factory(dataset_id, cfg):
         return DummyAdapter()
 
-    def fake_bulk(conn, table, rows, keys):
+    def fake_bulk(conn, table, rows, keys, written=None, returning=()):
         return 0
 
     monkeypatch.setattr(jobs.redis.Redis, "from_url", lambda *a, **k: None)
@@ -101,3 +101,56 @@ def test_schedule_jobs_respects_cadence(monkeypatch):
     # Interval trigger should match hourly cadence (3600 seconds)
     assert int(job.trigger.interval.total_seconds()) == 3600
     scheduler.shutdown()
+
+
+def test_schedule_jobs_announces_written_tables(monkeypatch):
+    registry = {
+        "datasets": {
+            "dummy": {
+                "cadence": "daily",
+                "adapter": "dummy",
+                "target_table": "metrics_ts",
+                "conflict_keys": ["series_id", "ts"],
+                "invalidate_by": ["metric"],
+                "enabled": True,
+            }
+        }
+    }
+
+    class DummyAdapter:
+        def run(self, conn, upsert_fn, table, keys, cursor=None):
+            rows = [
+                {"series_id": "a", "ts": 1, "metric": "CPI"},
+                {"series_id": "b", "ts": 1, "metric": "gdp"},
+            ]
+            upsert_fn(conn, table, rows, keys)
+
+    class FakeRedis:
+        def setex(self, key: str, ttl: int, value: str) -> None:  # noqa: ARG002
+            pass
+
+        def get(self, key: str) -> str | None:  # noqa: ARG002
+            return None
+
+    announced = []
+    monkeypatch.setattr(jobs.redis.Redis, "from_url", lambda *a, **k: FakeRedis())
+    monkeypatch.setattr(
+        jobs, "publish_invalidation", lambda client, tags: announced.append(tags)
+    )
+
+    def upsert(conn, table, rows, keys, written, returning):
+        # Only the second row differs from what is stored.
+        changed = [row for row in rows if row["series_id"] == "b"]
+        written.extend({col: row[col] for col in returning} for row in changed)
+        return len(changed)
+
+    scheduler = jobs.schedule_jobs(
+        registry,
+        lambda dataset_id, cfg: DummyAdapter(),
+        upsert,
+        lambda: None,
+        lambda conn: None,
+    )
+    scheduler.get_job("dummy").func()
+    scheduler.shutdown()
+    assert announced == [{"metrics_ts:metric=gdp"}]
@@ -0,0 +1,140 @@
+"""Attribution of cascade impacts to upstream factors and paths."""
+
+from __future__ import annotations
+
+import heapq
+from itertools import count
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from risk_engine.graph import CompiledGraph
+
+
+def upstream_contributions(
+    graph: CompiledGraph,
+    target_factor: int,
+    horizon: int = 3,
+    decay: float = 0.7,
+    top: int | None = None,
+) -> List[Tuple[int, float]]:
+    """Return the factors driving ``target_factor`` and their impact on it.
+
+    The impact of factor ``j`` is what :func:`risk_engine.cascade.propagate_shock`
+    with a unit shock at ``j`` returns for ``target_factor``. All of them are
+    obtained at once by propagating the target's indicator backwards over the
+    transposed graph, hop ``d`` scaled by ``decay ** d`` as in
+    :func:`risk_engine.cascade.propagate`. Factors reaching the target within
+    ``horizon`` hops are returned, strongest absolute impact first, at most
+    ``top`` of them; the target itself is left out.
+    """
+    idx = graph.index_of(target_factor)
+    if idx is None:
+        return []
+    y = np.zeros(graph.n_nodes)
+    y[idx] = 1.0
+    impact = np.zeros(graph.n_nodes)
+    frontier = y != 0
+    reached = np.zeros(graph.n_nodes, dtype=bool)
+    for depth in range(1, horizon + 1):
+        y = graph.spmm_t(y) * (decay**depth)
+        impact += y
+        frontier = graph.reach_t(frontier)
+        if not frontier.any():
+            break
+        reached |= frontier
+    reached[idx] = False
+    rows = np.flatnonzero(reached)
+    rows = rows[np.argsort(-np.abs(impact[rows]), kind="stable")][:top]
+    return [(int(graph.node_ids[i]), float(impact[i])) for i in rows]
+
+
+def _path_gains(graph: CompiledGraph, target: int, horizon: int) -> np.ndarray:
+    # gains[l, u]: largest product of |weight| over ``l``-hop walks u -> target,
+    # one max-product hop against the edge direction per step.
+    order, indptr = graph.outgoing()
+    starts = indptr[:-1]
+    nonempty = indptr[1:] > starts
+    magnitude = np.abs(graph.weight)[order]
+    gains = np.zeros((horizon + 1, graph.n_nodes))
+    gains[0, target] = 1.0
+    for hops in range(1, horizon + 1):
+        reach = magnitude * gains[hops - 1, graph.dst[order]]
+        if reach.size:
+            gains[hops, nonempty] = np.maximum.reduceat(reach, starts[nonempty])
+    return gains
+
+
+def dominant_paths(
+    graph: CompiledGraph,
+    start_factor: int,
+    shock: float,
+    targets: Sequence[int],
+    k: int = 3,
+    horizon: int = 3,
+    decay: float = 0.7,
+) -> Dict[int, List[Tuple[List[int], float]]]:
+    """Return the ``k`` paths carrying the most impact to every target.
+
+    The contribution of a walk of ``d`` hops is ``shock`` times its edge
+    weights times ``decay ** 1 * ... * decay ** d``; summed over all walks of
+    at most ``horizon`` hops it is the impact
+    :func:`risk_engine.cascade.propagate_shock` reports. Walks are explored
+    best-first, ordered by an upper bound on the contribution of any
+    completion: the largest ``|weight|`` product from each node to the
+    target in each number of remaining hops, obtained beforehand with a
+    backward max-product pass. Partial walks that cannot reach the target
+    in the hops left are never expanded, and the search for a target stops
+    after its ``k``-th path.
+
+    Returns
+    -------
+    dict[int, list[tuple[list[int], float]]]
+        Factor-id paths from ``start_factor`` with their signed
+        contributions, strongest first, per target.
+    """
+    result: Dict[int, List[Tuple[List[int], float]]] = {}
+    source = graph.index_of(start_factor)
+    order, indptr = graph.outgoing()
+    scale = np.cumprod([1.0] + [decay**d for d in range(1, horizon + 1)])
+    for target_factor in targets:
+        target = graph.index_of(target_factor)
+        if source is None or target is None:
+            result[target_factor] = (
+                [([start_factor], shock)] if start_factor == target_factor else []
+            )
+            continue
+        gains = _path_gains(graph, target, horizon)
+        # bound[d, u]: best factor still to come for a walk at ``u`` after
+        # ``d`` hops, over one or more further hops.
+        bound = np.zeros((horizon + 1, graph.n_nodes))
+        for d in range(horizon):
+            remaining = (
+                gains[1 : horizon - d + 1] * (scale[d + 1 :] / scale[d])[:, None]
+            )
+            bound[d] = remaining.max(axis=0)
+
+        paths: List[Tuple[List[int], float]] = []
+        heap: list = []
+        tie = count()
+
+        def push(node: int, depth: int, value: float, path: tuple) -> None:
+            if node == target and value != 0.0:
+                heapq.heappush(heap, (-abs(value), next(tie), True, path, value))
+            key = abs(value) * bound[depth, node]
+            if key > 0.0:
+                heapq.heappush(heap, (-key, next(tie), False, path, value))
+
+        push(source, 0, shock, (source,))
+        while heap and len(paths) < k:
+            _, _, complete, path, value = heapq.heappop(heap)
+            if complete:
+                paths.append(([int(graph.node_ids[i]) for i in path], value))
+                continue
+            node, depth = path[-1], len(path) - 1
+            for e in order[indptr[node] : indptr[node + 1]]:
+                nxt = int(graph.dst[e])
+                step = value * graph.weight[e] * decay ** (depth + 1)
+                push(nxt, depth + 1, step, path + (nxt,))
+        result[target_factor] = paths
+    return result
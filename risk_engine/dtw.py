@@ -0,0 +1,165 @@
+"""Dynamic time warping between z-normalized factor series.
+
+Pairs are screened with the LB_Kim (first/last point) and LB_Keogh (band
+envelope) lower bounds before the full DTW, which is computed with a
+Sakoe-Chiba band by a dynamic program vectorized over all surviving pairs of
+a block. Costs are squared differences, so for z-normalized series of length
+``n`` the zero-warping distance is ``2 n (1 - corr)``.
+"""
+
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from risk_engine.pairs import ProgressCallback, block_size, map_pair_blocks
+
+
+def znormalize(values: np.ndarray) -> np.ndarray:
+    """Z-score every row of a complete ``(series, time)`` matrix."""
+    mean = values.mean(axis=1, keepdims=True)
+    std = values.std(axis=1, keepdims=True)
+    return (values - mean) / np.where(std > 0, std, 1.0)
+
+
+def envelope(values: np.ndarray, band: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return the running max and min of every row over ``t - band..t + band``."""
+    padded = np.pad(values, ((0, 0), (band, band)), mode="edge")
+    windows = sliding_window_view(padded, 2 * band + 1, axis=1)
+    return windows.max(axis=2), windows.min(axis=2)
+
+
+def lb_kim(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Lower bound from the first and last points, which DTW always aligns."""
+    return (a[:, 0] - b[:, 0]) ** 2 + (a[:, -1] - b[:, -1]) ** 2
+
+
+def lb_keogh(q: np.ndarray, upper: np.ndarray, lower: np.ndarray) -> np.ndarray:
+    """Lower bound of ``q`` against a candidate's band envelope."""
+    above = np.maximum(q - upper, 0.0)
+    below = np.maximum(lower - q, 0.0)
+    return (above * above + below * below).sum(axis=1)
+
+
+def _banded_dtw(
+    a: np.ndarray, b: np.ndarray, band: int, threshold: float
+) -> tuple[np.ndarray, np.ndarray]:
+    # Row ``i`` of the cost matrix is kept in band coordinates: column ``k``
+    # is ``j = i + k - band``. Alongside the cumulative cost each cell
+    # carries the summed offset ``j - i`` and length of its optimal path over
+    # the central half of the rows, away from the pinned end points.
+    n_pairs, n = a.shape
+    width = 2 * band + 1
+    dist = np.full(n_pairs, np.inf)
+    offset = np.zeros(n_pairs)
+    alive = np.arange(n_pairs)
+    cost_p = np.full((n_pairs, width), np.inf)
+    off_p = np.zeros((n_pairs, width))
+    len_p = np.zeros((n_pairs, width))
+    shift = np.arange(width) - band
+    for i in range(n):
+        central = float(n // 4 <= i < n - n // 4)
+        j = i + shift
+        inside = (j >= 0) & (j < n)
+        diff = a[:, i, None] - b[:, np.clip(j, 0, n - 1)]
+        step = np.where(inside, diff * diff, np.inf)
+        cost_c = np.full_like(cost_p, np.inf)
+        off_c = np.zeros_like(off_p)
+        len_c = np.zeros_like(len_p)
+        for k in np.flatnonzero(inside):
+            if i == 0 and k == band:
+                best = np.zeros(len(alive))
+                off, length = best, best
+            else:
+                best, off, length = cost_p[:, k], off_p[:, k], len_p[:, k]
+            if k + 1 < width:
+                take = cost_p[:, k + 1] < best
+                best = np.where(take, cost_p[:, k + 1], best)
+                off = np.where(take, off_p[:, k + 1], off)
+                length = np.where(take, len_p[:, k + 1], length)
+            if k >= 1:
+                take = cost_c[:, k - 1] < best
+                best = np.where(take, cost_c[:, k - 1], best)
+                off = np.where(take, off_c[:, k - 1], off)
+                length = np.where(take, len_c[:, k - 1], length)
+            cost_c[:, k] = best + step[:, k]
+            off_c[:, k] = off + central * shift[k]
+            len_c[:, k] = length + central
+        cost_p, off_p, len_p = cost_c, off_c, len_c
+        # Costs only grow along a path: abandon pairs already over budget.
+        keep = cost_p.min(axis=1) <= threshold
+        if not keep.all():
+            alive, a, b = alive[keep], a[keep], b[keep]
+            cost_p, off_p, len_p = cost_p[keep], off_p[keep], len_p[keep]
+            if not len(alive):
+                break
+    if len(alive):
+        final = cost_p[:, band]
+        dist[alive] = np.where(final <= threshold, final, np.inf)
+        offset[alive] = off_p[:, band] / len_p[:, band]
+    return dist, offset
+
+
+def _dtw_kernel(
+    arrays: Dict[str, np.ndarray], pairs: np.ndarray, band: int, threshold: float
+) -> tuple[np.ndarray, np.ndarray]:
+    values, upper, lower = arrays["values"], arrays["upper"], arrays["lower"]
+    src, dst, sign = pairs.T
+    dist = np.full(len(pairs), np.inf)
+    offset = np.zeros(len(pairs))
+    a = values[src]
+    b = values[dst] * sign[:, None]
+    survivors = np.flatnonzero(lb_kim(a, b) <= threshold)
+    a, b, sgn = a[survivors], b[survivors], sign[survivors, None]
+    # The envelope of ``-b`` is ``(-lower, -upper)``.
+    b_upper = np.where(sgn > 0, upper[dst[survivors]], -lower[dst[survivors]])
+    b_lower = np.where(sgn > 0, lower[dst[survivors]], -upper[dst[survivors]])
+    bound = np.maximum(
+        lb_keogh(a, b_upper, b_lower),
+        lb_keogh(b, upper[src[survivors]], lower[src[survivors]]),
+    )
+    keep = bound <= threshold
+    survivors, a, b = survivors[keep], a[keep], b[keep]
+    if len(survivors):
+        dist[survivors], offset[survivors] = _banded_dtw(a, b, band, threshold)
+    return dist, offset
+
+
+def dtw_distances(
+    values: np.ndarray,
+    pairs: np.ndarray,
+    band: int,
+    threshold: float = np.inf,
+    workers: int = 1,
+    progress: ProgressCallback | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the banded DTW distance of every ``(a, b, sign)`` triple.
+
+    ``values`` holds complete, z-normalized rows; ``sign`` is ``1`` or ``-1``
+    to compare ``a`` with ``b`` or with ``-b``. Pairs whose lower bounds or
+    partial cost exceed ``threshold`` are skipped and get ``inf``.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        The summed squared-difference distance and the mean offset ``j - i``
+        along the central half of the optimal path, positive when ``b``
+        trails ``a``.
+    """
+    if len(pairs) == 0:
+        return np.zeros(0), np.zeros(0)
+    band = int(min(band, values.shape[1] - 1))
+    upper, lower = envelope(values, band)
+    dist, offset = map_pair_blocks(
+        _dtw_kernel,
+        {"values": values, "upper": upper, "lower": lower},
+        pairs,
+        block_size(4 * values.shape[1] + 10 * (2 * band + 1)),
+        workers,
+        progress,
+        band=band,
+        threshold=threshold,
+    )
+    return dist, offset
@@ -1,27 +1,263 @@
 """Infer causal edges between factors.
 
-The real implementation would use advanced statistics (Elastic Net, Granger
-causality, transfer entropy, DTW). For the MVP we provide a lightweight
-correlation-based approximation that returns the strongest lagged
-correlation within a 180 day window.
+The default ``corr`` method is a lightweight approximation that returns the
+strongest lagged correlation within a 180 day window. ``granger`` and ``te``
+run the directed tests of :mod:`risk_engine.causality` (Granger F-tests and
+transfer entropy) on every ordered factor pair. ``enet`` fits one Elastic Net
+per factor on the lags of all other factors over rolling windows, and ``dtw``
+links factors whose recent shapes match under dynamic time warping
+(:mod:`risk_engine.dtw`).
 """
 
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Any, Dict, List
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from risk_engine.causality import changes, granger_tests, standardize, transfer_entropy
+from risk_engine.dtw import dtw_distances, znormalize
+from risk_engine.pairs import ProgressCallback, block_size, map_pair_blocks
+
+# Order of the per-lag co-moment sums produced by the correlation engine.
+SUM_FIELDS = ("n", "sx", "sy", "sxx", "syy", "sxy")
+
+METHODS = ("corr", "granger", "te", "enet", "dtw")
+
+# Methods whose betas are transmission coefficients a cascade can propagate;
+# ``dtw`` edges only score how similar two series' shapes are.
+PROPAGATION_METHODS = ("corr", "granger", "te", "enet")
 
 
 class EdgeEstimate(dict):
     """Simple container for inferred edge parameters."""
 
 
+def align_series(data: Dict[int, pd.Series]) -> tuple[list[int], np.ndarray]:
+    """Align all series on the union of their indices.
+
+    Returns the factor ids and a ``(factors, time)`` float matrix with ``NaN``
+    where a series has no observation.
+    """
+    ids = list(data)
+    if not ids:
+        return ids, np.empty((0, 0))
+    frame = pd.concat([data[i] for i in ids], axis=1, keys=range(len(ids)))
+    return ids, frame.sort_index().to_numpy(dtype=float).T
+
+
+def aligned_index(data: Dict[int, pd.Series]) -> pd.Index:
+    """Return the sorted union index used by :func:`align_series`."""
+    index = pd.Index([])
+    for series in data.values():
+        index = index.union(series.index)
+    return index.sort_values()
+
+
+def daily_matrix(
+    ids: List[int], data: Dict[int, pd.Series]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return day ordinals and a ``(factors, days)`` matrix on a daily grid.
+
+    Unlike :func:`align_series` every calendar day between the first and
+    last observation gets a column, so column offsets are calendar days.
+    """
+    daily = {}
+    for fid in ids:
+        s = data[fid].dropna()
+        days = np.array([pd.Timestamp(t).toordinal() for t in s.index])
+        daily[fid] = pd.Series(s.to_numpy(dtype=float), index=days)
+    present = [d for d in daily.values() if len(d)]
+    if not present:
+        return np.empty(0, dtype=np.int64), np.empty((len(ids), 0))
+    first = min(int(d.index.min()) for d in present)
+    last = max(int(d.index.max()) for d in present)
+    grid = np.arange(first, last + 1)
+    values = np.full((len(ids), grid.size), np.nan)
+    for row, fid in enumerate(ids):
+        d = daily[fid].groupby(level=0).last()
+        values[row, d.index.to_numpy() - first] = d.to_numpy()
+    return grid, values
+
+
+def calendar_lags(index: pd.Index, lags: np.ndarray) -> np.ndarray:
+    """Convert lags counted in rows of ``index`` to calendar days.
+
+    A lag of ``k`` rows becomes the median number of days between rows
+    ``k`` apart, so 5 rows of business days are 7 days.
+    """
+    days = np.array([pd.Timestamp(t).toordinal() for t in index], dtype=np.int64)
+    lags = np.asarray(lags, dtype=np.int64)
+    out = np.zeros_like(lags)
+    for k in np.unique(np.abs(lags)):
+        if 0 < k < len(days):
+            span = int(np.rint(np.median(days[k:] - days[:-k])))
+            out[np.abs(lags) == k] = span
+    return np.sign(lags) * out
+
+
+def select_lags(
+    sums: np.ndarray, lags: np.ndarray, min_overlap: int = 3
+) -> tuple[np.ndarray, np.ndarray]:
+    """Pick the strongest lag from ``(6, pairs, lags)`` co-moment sums.
+
+    The lag with the largest absolute centred cross-product is selected, as
+    in a direct ``np.correlate`` scan, and its Pearson correlation returned.
+    Pairs without ``min_overlap`` common observations get ``NaN``.
+    """
+    n, sx, sy, sxx, syy, sxy = sums
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / n
+        var = (sxx - sx * sx / n) * (syy - sy * sy / n)
+        corr = cov / np.sqrt(var)
+    valid = (n >= min_overlap) & (var > 0) & np.isfinite(corr)
+    score = np.where(valid, np.abs(cov), -np.inf)
+    best = score.argmax(axis=1)
+    rows = np.arange(len(best))
+    beta = np.where(valid[rows, best], np.clip(corr[rows, best], -1.0, 1.0), np.nan)
+    return lags[best], beta
+
+
+class _Spectra:
+    """FFT spectra of the masked, centred series shared by all pair blocks."""
+
+    def __init__(
+        self,
+        x: np.ndarray,
+        xx: np.ndarray,
+        m: np.ndarray,
+        n_fft: int,
+        max_lag: int,
+        min_overlap: int,
+    ) -> None:
+        self.x = x
+        self.xx = xx
+        self.m = m
+        self.n_fft = n_fft
+        self.lags = np.arange(-max_lag, max_lag + 1)
+        self.min_overlap = min_overlap
+        self.means: np.ndarray | None = None
+
+    @classmethod
+    def from_values(
+        cls, values: np.ndarray, max_lag: int, min_overlap: int
+    ) -> "_Spectra":
+        n_time = values.shape[1]
+        mask = np.isfinite(values)
+        # Centring does not change correlations but keeps FFT round-off small.
+        counts = mask.sum(axis=1)
+        means = np.where(mask, values, 0.0).sum(axis=1) / np.maximum(counts, 1)
+        x = np.where(mask, values - means[:, None], 0.0)
+        n_fft = 1 << int(np.ceil(np.log2(max(2 * n_time - 1, 1))))
+        spectra = cls(
+            np.fft.rfft(x, n_fft, axis=1),
+            np.fft.rfft(x * x, n_fft, axis=1),
+            np.fft.rfft(mask.astype(float), n_fft, axis=1),
+            n_fft,
+            min(max_lag, n_time - 1),
+            min_overlap,
+        )
+        spectra.means = means
+        return spectra
+
+    @property
+    def block_size(self) -> int:
+        return block_size(self.n_fft)
+
+    def sums(self, pairs: np.ndarray) -> np.ndarray:
+        """Return the lagged co-moment sums of every pair in ``pairs``.
+
+        The result has shape ``(6, pairs, lags)`` ordered as ``SUM_FIELDS``,
+        computed on the centred series.
+        """
+        cols = self.lags % self.n_fft
+
+        def xcorr(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+            # sum_t a[t] * b[t + l] for every lag in the window
+            return np.fft.irfft(np.conj(a) * b, self.n_fft, axis=1)[:, cols]
+
+        src, dst = pairs.T
+        return np.stack(
+            (
+                np.rint(xcorr(self.m[src], self.m[dst])),
+                xcorr(self.x[src], self.m[dst]),
+                xcorr(self.m[src], self.x[dst]),
+                xcorr(self.xx[src], self.m[dst]),
+                xcorr(self.m[src], self.xx[dst]),
+                xcorr(self.x[src], self.x[dst]),
+            )
+        )
+
+    def correlate(self, pairs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return the best lag and correlation of every pair in ``pairs``."""
+        return select_lags(self.sums(pairs), self.lags, self.min_overlap)
+
+
+def _correlate_kernel(
+    arrays: Dict[str, np.ndarray],
+    pairs: np.ndarray,
+    n_fft: int,
+    max_lag: int,
+    min_overlap: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    spectra = _Spectra(
+        arrays["x"], arrays["xx"], arrays["m"], n_fft, max_lag, min_overlap
+    )
+    return spectra.correlate(pairs)
+
+
+def lagged_correlations(
+    values: np.ndarray,
+    pairs: np.ndarray,
+    max_lag: int,
+    min_overlap: int = 3,
+    workers: int = 1,
+    progress: ProgressCallback | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the strongest lagged correlation of every ``(src, dst)`` pair.
+
+    ``values`` is a ``(factors, time)`` matrix with ``NaN`` for missing data.
+    For lag ``l`` the correlation pairs ``src[t]`` with ``dst[t + l]`` over
+    the observations both series have, so a positive lag means ``src``
+    leads. All pairwise sums are cross-correlations of the masked series and
+    are obtained with batched FFTs, restricted to ``-max_lag..max_lag``.
+
+    The best lag of each pair is chosen by :func:`select_lags`.
+
+    Pair blocks are evaluated by :func:`risk_engine.pairs.map_pair_blocks`,
+    over ``workers`` processes sharing memory-mapped spectra when
+    ``workers > 1``. ``progress`` is called with ``(pairs_done,
+    pairs_total)`` after every block.
+    """
+    spectra = _Spectra.from_values(values, max_lag, min_overlap)
+    if len(pairs) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    lags, betas = map_pair_blocks(
+        _correlate_kernel,
+        {"x": spectra.x, "xx": spectra.xx, "m": spectra.m},
+        pairs,
+        spectra.block_size,
+        workers,
+        progress,
+        n_fft=spectra.n_fft,
+        max_lag=int(spectra.lags[-1]),
+        min_overlap=min_overlap,
+    )
+    return lags, betas
+
+
 def infer_edges(
-    data: Dict[int, pd.Series], max_lag_days: int = 180
+    data: Dict[int, pd.Series],
+    max_lag_days: int = 180,
+    workers: int = 1,
+    progress: ProgressCallback | None = None,
+    method: str = "corr",
+    alpha: float = 0.05,
+    **options: Any,
 ) -> List[EdgeEstimate]:
-    """Infer connections between factors using lagged correlations.
+    """Infer connections between factors.
 
     Parameters
     ----------
@@ -29,42 +265,396 @@ def infer_edges(
         Mapping of ``factor_id`` to time series (indexed by datetime).
     max_lag_days:
         Maximum lag (in days) to consider when searching for lead/lag
-        relationships. Defaults to ``180``.
+        relationships. Defaults to ``180``. ``corr`` counts calendar days
+        (see :func:`daily_matrix`), as the incremental
+        :class:`risk_engine.incremental.PairStatistics` does. For
+        ``granger``, ``te`` and ``enet`` it is the number of lags in the
+        model and for ``dtw`` the Sakoe-Chiba band radius, both in rows of
+        the aligned index; the lags they find are reported in calendar days
+        (see :func:`calendar_lags`).
+    workers:
+        Number of processes used to evaluate factor pairs. Defaults to ``1``.
+    progress:
+        Optional callback receiving ``(pairs_done, pairs_total)``.
+    method:
+        ``corr`` (lagged correlation, one edge per unordered pair),
+        ``granger`` (an edge for every direction whose Granger p-value is at
+        most ``alpha``, with ``p_value`` set) or ``te`` (the direction with
+        the larger transfer entropy if significant at ``alpha``, with
+        ``transfer_entropy`` and ``p_value`` set) or ``enet`` (the non-zero
+        coefficients of :func:`rolling_elastic_net`, with ``sample_start``
+        and ``sample_end`` of the last window set) or ``dtw`` (pairs whose
+        DTW similarity reaches ``min_similarity``, see :func:`_dtw_edges`).
+    alpha:
+        Significance level of the ``granger`` and ``te`` methods.
+    options:
+        Further keyword arguments for the ``enet`` and ``dtw`` estimators.
 
     Returns
     -------
     list[EdgeEstimate]
         List of inferred edges with beta, ``lag_days`` and ``confidence`` fields.
+
+    Raises
+    ------
+    ValueError
+        If ``method`` is not one of :data:`METHODS`.
     """
+    if method not in METHODS:
+        raise ValueError(f"unknown edge method: {method}")
+    ids = list(data)
+    pairs = np.array(
+        [(i, j) for i in range(len(ids)) for j in range(i + 1, len(ids))],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    if len(pairs) == 0:
+        return []
+    if method == "corr":
+        _, values = daily_matrix(ids, data)
+        lags, betas = lagged_correlations(
+            values, pairs, max_lag_days, workers=workers, progress=progress
+        )
+        return _to_estimates(ids, pairs, lags, betas)
+    _, values = align_series(data)
+    if method == "granger":
+        return _granger_edges(
+            data, ids, values, pairs, max_lag_days, alpha, workers, progress
+        )
+    if method == "enet":
+        return _enet_edges(data, ids, values, max_lag_days, progress, **options)
+    if method == "dtw":
+        return _dtw_edges(data, ids, values, max_lag_days, workers, progress, **options)
+    return _te_edges(data, ids, values, pairs, max_lag_days, alpha, workers, progress)
+
 
+def _granger_edges(
+    data: Dict[int, pd.Series],
+    ids: list[int],
+    values: np.ndarray,
+    pairs: np.ndarray,
+    order: int,
+    alpha: float,
+    workers: int,
+    progress: ProgressCallback | None,
+) -> List[EdgeEstimate]:
+    directed = np.concatenate((pairs, pairs[:, ::-1]))
+    _, p_value, lags, betas = granger_tests(
+        values, directed, order, workers=workers, progress=progress
+    )
+    lags = calendar_lags(aligned_index(data), lags)
     edges: List[EdgeEstimate] = []
-    factors = list(data.items())
-    for i, (src_id, src_series) in enumerate(factors):
-        for dst_id, dst_series in factors[i + 1 :]:
-            # Align series
-            df = pd.concat([src_series, dst_series], axis=1).dropna()
-            if df.empty:
+    for (i, j), p, lag, beta in zip(directed, p_value, lags, betas):
+        if not p <= alpha:
+            continue
+        edges.append(
+            EdgeEstimate(
+                {
+                    "src_factor": ids[i],
+                    "dst_factor": ids[j],
+                    "beta": float(beta),
+                    "lag_days": int(lag),
+                    "confidence": 1.0 - float(p),
+                    "p_value": float(p),
+                }
+            )
+        )
+    return edges
+
+
+def _te_edges(
+    data: Dict[int, pd.Series],
+    ids: list[int],
+    values: np.ndarray,
+    pairs: np.ndarray,
+    max_lag: int,
+    alpha: float,
+    workers: int,
+    progress: ProgressCallback | None,
+) -> List[EdgeEstimate]:
+    directed = np.concatenate((pairs, pairs[:, ::-1]))
+    te, lags, corr, p_value = transfer_entropy(
+        values, directed, max_lag, workers=workers, progress=progress
+    )
+    lags = calendar_lags(aligned_index(data), lags)
+    n = len(pairs)
+    # Keep the dominant direction of every unordered pair.
+    forward = ~(np.nan_to_num(te[n:], nan=-1.0) > np.nan_to_num(te[:n], nan=-1.0))
+    pick = np.where(forward, np.arange(n), np.arange(n, 2 * n))
+    edges: List[EdgeEstimate] = []
+    for k in pick:
+        if not p_value[k] <= alpha or np.isnan(corr[k]):
+            continue
+        i, j = directed[k]
+        edges.append(
+            EdgeEstimate(
+                {
+                    "src_factor": ids[i],
+                    "dst_factor": ids[j],
+                    "beta": float(corr[k]),
+                    "lag_days": int(lags[k]),
+                    "confidence": float(np.sqrt(1.0 - np.exp(-2.0 * te[k]))),
+                    "transfer_entropy": float(te[k]),
+                    "p_value": float(p_value[k]),
+                }
+            )
+        )
+    return edges
+
+
+def _coordinate_descent(
+    gram: np.ndarray,
+    xy: np.ndarray,
+    coef: np.ndarray,
+    allowed: np.ndarray,
+    l1: float,
+    l2: float,
+    tol: float,
+    max_iter: int,
+) -> np.ndarray:
+    # Covariance-form coordinate descent, all targets (columns) at once; the
+    # product ``gram @ coef`` is kept current with rank-one updates. Sweeps
+    # cycle over the active coordinates until they converge and a full sweep
+    # then checks that no other coordinate enters, as in glmnet.
+    q = gram @ coef
+    diag = np.diag(gram)
+    every = np.flatnonzero(diag > 0)
+
+    def sweep(coords: np.ndarray) -> float:
+        largest = 0.0
+        for j in coords:
+            rho = xy[j] - q[j] + diag[j] * coef[j]
+            new = np.sign(rho) * np.maximum(np.abs(rho) - l1, 0.0) / (diag[j] + l2)
+            new *= allowed[j]
+            delta = new - coef[j]
+            if not delta.any():
                 continue
-            src = df.iloc[:, 0]
-            dst = df.iloc[:, 1]
-            # Compute cross-correlation to find lag
-            corr = np.correlate(src - src.mean(), dst - dst.mean(), mode="full")
-            lag = corr.argmax() - (len(dst) - 1)
-            if lag > max_lag_days:
-                lag = max_lag_days
-            if lag < -max_lag_days:
-                lag = -max_lag_days
-            beta = float(np.corrcoef(src.shift(lag).dropna(), dst[lag:].dropna())[0, 1])
-            confidence = abs(beta)
-            edges.append(
-                EdgeEstimate(
-                    {
-                        "src_factor": src_id,
-                        "dst_factor": dst_id,
-                        "beta": beta,
-                        "lag_days": int(lag),
-                        "confidence": confidence,
-                    }
-                )
+            coef[j] = new
+            q[:] += np.outer(gram[:, j], delta)
+            largest = max(largest, float(np.abs(delta).max()))
+        return largest
+
+    for _ in range(max_iter):
+        if sweep(every) < tol:
+            break
+        active = every[coef[every].any(axis=1)]
+        for _ in range(max_iter):
+            if sweep(active) < tol:
+                break
+    return coef
+
+
+def _strongest_lags(coef: np.ndarray, n_factors: int, lags: int) -> tuple:
+    # ``coef[f * lags + m, i]`` is lag ``m + 1`` of factor ``f`` for target ``i``.
+    by_lag = coef.reshape(n_factors, lags, n_factors)
+    best = np.abs(by_lag).argmax(axis=1)
+    value = np.take_along_axis(by_lag, best[:, None, :], axis=1)[:, 0, :]
+    return value, best + 1
+
+
+def rolling_elastic_net(
+    values: np.ndarray,
+    lags: int = 5,
+    penalty: float = 0.2,
+    l1_ratio: float = 0.9,
+    window: int = 252,
+    step: int = 21,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+    progress: ProgressCallback | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, tuple[int, int]]:
+    """Regress every factor on ``lags`` lags of all other factors.
+
+    Works on the standardized changes of ``values`` (a ``(factors, time)``
+    matrix), with missing entries set to the mean. Each window of ``window``
+    rows, advanced by ``step``, minimizes
+    ``|y - X b|^2 / 2n + penalty * (l1_ratio |b|_1 + (1 - l1_ratio) |b|^2 / 2)``
+    for all targets at once by coordinate descent on the Gram matrix, warm
+    started from the previous window. The design matrix is a strided view of
+    the changes; the Gram matrix and ``X.T y`` are updated by the rows that
+    enter and leave the window.
+
+    Returns
+    -------
+    tuple
+        For every ``(src, dst)``: the last window's coefficient at the
+        strongest lag, that lag (``0`` for no edge) and the fraction of
+        windows whose strongest coefficient had the same non-zero sign,
+        followed by the first and last target column of the last window.
+    """
+    z = np.nan_to_num(standardize(changes(values)))
+    n_factors, n_time = z.shape
+    n = n_time - lags
+    empty = np.zeros((n_factors, n_factors))
+    if n_factors < 2 or n < 2:
+        return empty, empty.astype(np.int64), empty.copy(), (0, 0)
+    p = n_factors * lags
+    # design[k, f, m] is lag ``m + 1`` of factor ``f`` for target row ``k + lags``.
+    design = sliding_window_view(z.T, lags, axis=0)[:n, :, ::-1]
+    target = z.T[lags:]
+    allowed = np.repeat(~np.eye(n_factors, dtype=bool), lags, axis=0)
+    window = min(window, n)
+    step = max(1, min(step, window))
+    starts = list(range(0, n - window + 1, step))
+    if starts[-1] != n - window:
+        starts.append(n - window)
+
+    def rows(a: int, b: int) -> np.ndarray:
+        return design[a:b].reshape(b - a, p)
+
+    gram = np.zeros((p, p))
+    xy = np.zeros((p, n_factors))
+    coef = np.zeros((p, n_factors))
+    signs = []
+    prev = (starts[0], starts[0])
+    for k, start in enumerate(starts):
+        end = start + window
+        # Rows leaving and entering the window; ``step <= window`` keeps
+        # them disjoint from the rows both windows share.
+        old, new = rows(prev[0], start), rows(prev[1], end)
+        gram += new.T @ new - old.T @ old
+        xy += new.T @ target[prev[1] : end] - old.T @ target[prev[0] : start]
+        prev = (start, end)
+        _coordinate_descent(
+            gram / window,
+            xy / window,
+            coef,
+            allowed,
+            penalty * l1_ratio,
+            penalty * (1.0 - l1_ratio),
+            tol,
+            max_iter,
+        )
+        signs.append(np.sign(_strongest_lags(coef, n_factors, lags)[0]))
+        if progress is not None:
+            progress(k + 1, len(starts))
+    beta, lag = _strongest_lags(coef, n_factors, lags)
+    final = np.sign(beta)
+    stability = (np.array(signs) == final).mean(axis=0) * (final != 0)
+    lag = np.where(final != 0, lag, 0)
+    return beta, lag, stability, (starts[-1] + lags, starts[-1] + window - 1 + lags)
+
+
+def _enet_edges(
+    data: Dict[int, pd.Series],
+    ids: list[int],
+    values: np.ndarray,
+    lags: int,
+    progress: ProgressCallback | None,
+    **options: Any,
+) -> List[EdgeEstimate]:
+    beta, lag, stability, (first, last) = rolling_elastic_net(
+        values, lags, progress=progress, **options
+    )
+    index = aligned_index(data)
+    start = pd.Timestamp(index[first]).date()
+    end = pd.Timestamp(index[last]).date()
+    days = calendar_lags(index, lag)
+    edges: List[EdgeEstimate] = []
+    for i, j in zip(*np.nonzero(lag)):
+        edges.append(
+            EdgeEstimate(
+                {
+                    "src_factor": ids[i],
+                    "dst_factor": ids[j],
+                    "beta": float(np.clip(beta[i, j], -1.0, 1.0)),
+                    "lag_days": int(days[i, j]),
+                    "confidence": float(stability[i, j]),
+                    "sample_start": start,
+                    "sample_end": end,
+                }
+            )
+        )
+    return edges
+
+
+def _dtw_edges(
+    data: Dict[int, pd.Series],
+    ids: list[int],
+    values: np.ndarray,
+    band: int,
+    workers: int,
+    progress: ProgressCallback | None,
+    window: int = 252,
+    min_similarity: float = 0.5,
+) -> List[EdgeEstimate]:
+    """Link factors whose last ``window`` rows match under banded DTW.
+
+    Series are forward filled, cut to the last ``window`` rows and
+    z-normalized; factors without a complete window are skipped. Every pair
+    is compared with both signs and the closer match kept. The similarity
+    ``1 - DTW / (2 n)`` equals the correlation without warping and is the
+    edge's confidence, signed as its beta. The mean offset of the warping
+    path orients the edge from the leading factor and gives ``lag_days``,
+    converted from rows to calendar days with :func:`calendar_lags`.
+
+    These edges measure similarity, not transmission, and are not in
+    :data:`PROPAGATION_METHODS`.
+    """
+    filled = pd.DataFrame(values.T).ffill().to_numpy().T[:, -window:]
+    n = filled.shape[1]
+    rows = np.flatnonzero(
+        np.isfinite(filled).all(axis=1) & (np.ptp(filled, axis=1) > 0)
+    )
+    if len(rows) < 2 or n < 2:
+        return []
+    z = znormalize(filled[rows])
+    pairs = np.array(
+        [
+            (a, b, sign)
+            for a in range(len(rows))
+            for b in range(a + 1, len(rows))
+            for sign in (1, -1)
+        ],
+        dtype=np.int64,
+    )
+    dist, offset = dtw_distances(
+        z, pairs, band, 2.0 * n * (1.0 - min_similarity), workers, progress
+    )
+    index = aligned_index(data)[-n:]
+    start = pd.Timestamp(index[0]).date()
+    end = pd.Timestamp(index[-1]).date()
+    best = np.arange(0, len(pairs), 2)
+    best += dist[best + 1] < dist[best]
+    best = best[np.isfinite(dist[best])]
+    lags = np.rint(offset[best]).astype(np.int64)
+    days = calendar_lags(index, np.abs(lags))
+    edges: List[EdgeEstimate] = []
+    for k, lag, lag_days in zip(best, lags, days):
+        a, b, sign = pairs[k]
+        src, dst = (a, b) if lag >= 0 else (b, a)
+        similarity = 1.0 - dist[k] / (2.0 * n)
+        edges.append(
+            EdgeEstimate(
+                {
+                    "src_factor": ids[rows[src]],
+                    "dst_factor": ids[rows[dst]],
+                    "beta": float(sign * similarity),
+                    "lag_days": int(lag_days),
+                    "confidence": float(similarity),
+                    "sample_start": start,
+                    "sample_end": end,
+                }
+            )
+        )
+    return edges
+
+
+def _to_estimates(
+    ids: list[int], pairs: np.ndarray, lags: np.ndarray, betas: np.ndarray
+) -> List[EdgeEstimate]:
+    edges: List[EdgeEstimate] = []
+    for (i, j), lag, beta in zip(pairs, lags, betas):
+        if np.isnan(beta):
+            continue
+        edges.append(
+            EdgeEstimate(
+                {
+                    "src_factor": ids[i],
+                    "dst_factor": ids[j],
+                    "beta": float(beta),
+                    "lag_days": int(lag),
+                    "confidence": abs(float(beta)),
+                }
             )
+        )
     return edges
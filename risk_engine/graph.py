@@ -0,0 +1,291 @@
+"""Compiled factor graph used by the cascade engine."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from risk_engine.edges import PROPAGATION_METHODS
+
+
+class CompiledGraph:
+    """Factor graph compiled into flat NumPy arrays.
+
+    Factors are addressed by a dense index where ``node_ids[i]`` is the
+    ``factor_id`` of index ``i``. Edges are kept sorted by destination and
+    ``indptr`` delimits the incoming edges of every node (CSR layout of the
+    transposed adjacency matrix), so one propagation hop is a gather over
+    ``src`` followed by a segmented sum.
+    """
+
+    def __init__(
+        self,
+        node_ids: np.ndarray,
+        src: np.ndarray,
+        dst: np.ndarray,
+        beta: np.ndarray,
+        confidence: np.ndarray,
+        lag_days: np.ndarray,
+    ) -> None:
+        order = np.argsort(dst, kind="stable")
+        self.node_ids = node_ids
+        self.src = src[order]
+        self.dst = dst[order]
+        self.beta = beta[order]
+        self.confidence = confidence[order]
+        self.lag_days = lag_days[order]
+        self.weight = self.beta * self.confidence
+        counts = np.bincount(self.dst, minlength=len(node_ids))
+        self.indptr = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self.index: Dict[int, int] = {int(f): i for i, f in enumerate(node_ids)}
+        self._by_src: tuple[np.ndarray, np.ndarray] | None = None
+        # Version of the edge set this graph was compiled from, if known.
+        self.version: int | None = None
+        # Regime whose edges this graph holds, ``None`` for the base graph.
+        self.regime: str | None = None
+        # Set by :meth:`sparsify`: absolute outgoing weight each node lost and
+        # the largest absolute outgoing weight sum of the unpruned graph.
+        self.dropped_weight: np.ndarray | None = None
+        self.source_norm = 0.0
+
+    @property
+    def n_nodes(self) -> int:
+        return int(self.node_ids.size)
+
+    @property
+    def n_edges(self) -> int:
+        return int(self.src.size)
+
+    def index_of(self, factor_id: int) -> int | None:
+        """Return the dense index of ``factor_id`` or ``None`` if unknown."""
+        return self.index.get(int(factor_id))
+
+    def sparsify(
+        self, top_k: int | None = None, min_weight: float = 0.0
+    ) -> "CompiledGraph":
+        """Return a copy without the weakest outgoing edges of every node.
+
+        Edges with ``|weight| < min_weight`` are dropped and at most
+        ``top_k`` of the strongest remaining edges are kept per source. The
+        copy keeps ``node_ids`` (so dense indices match), ``version`` and
+        ``regime``, and records what was dropped for
+        :func:`risk_engine.cascade.pruning_error_bound`.
+        """
+        magnitude = np.abs(self.weight)
+        keep = magnitude >= min_weight
+        if top_k is not None:
+            order = np.lexsort((-magnitude, self.src))
+            counts = np.bincount(self.src, minlength=self.n_nodes)
+            starts = np.concatenate(([0], np.cumsum(counts)))[self.src[order]]
+            rank = np.empty(self.n_edges, dtype=np.int64)
+            rank[order] = np.arange(self.n_edges) - starts
+            keep &= rank < top_k
+        graph = CompiledGraph(
+            self.node_ids,
+            self.src[keep],
+            self.dst[keep],
+            self.beta[keep],
+            self.confidence[keep],
+            self.lag_days[keep],
+        )
+        graph.version = self.version
+        graph.regime = self.regime
+        graph.dropped_weight = np.bincount(
+            self.src[~keep], magnitude[~keep], minlength=self.n_nodes
+        )
+        graph.source_norm = float(
+            np.bincount(self.src, magnitude, minlength=self.n_nodes).max(initial=0.0)
+        )
+        return graph
+
+    def spmm(self, x: np.ndarray, weight: np.ndarray | None = None) -> np.ndarray:
+        """Return ``W @ x`` where ``W[dst, src]`` holds the edge weights.
+
+        ``x`` may be a vector of length ``n_nodes`` or a matrix with one
+        column per scenario. ``weight`` overrides the compiled edge weights,
+        either once for all columns or as an ``(n_edges, columns)`` matrix.
+        """
+        w = self.weight if weight is None else weight
+        if x.ndim > 1 and w.ndim == 1:
+            w = w[:, None]
+        return self._segment_sum(x[self.src] * w)
+
+    def outgoing(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the source-ordered edge permutation and its ``indptr``.
+
+        Edges ``order[indptr[i]:indptr[i + 1]]`` leave node ``i``; built on
+        first use.
+        """
+        if self._by_src is None:
+            order = np.argsort(self.src, kind="stable")
+            counts = np.bincount(self.src, minlength=self.n_nodes)
+            self._by_src = order, np.concatenate(([0], np.cumsum(counts)))
+        return self._by_src
+
+    def spmm_t(self, x: np.ndarray, weight: np.ndarray | None = None) -> np.ndarray:
+        """Return ``W.T @ x``, i.e. one hop against the edge direction.
+
+        Accepts the same ``x`` and ``weight`` shapes as :meth:`spmm`; edges
+        are summed in :meth:`outgoing` order.
+        """
+        w = self.weight if weight is None else weight
+        if x.ndim > 1 and w.ndim == 1:
+            w = w[:, None]
+        order, indptr = self.outgoing()
+        contrib = (x[self.dst] * w)[order]
+        out = np.zeros((self.n_nodes,) + contrib.shape[1:], dtype=float)
+        if contrib.shape[0] == 0:
+            return out
+        starts = indptr[:-1]
+        nonempty = indptr[1:] > starts
+        out[nonempty] = np.add.reduceat(contrib, starts[nonempty], axis=0)
+        return out
+
+    def spmm_lagged(
+        self, x: np.ndarray, weight: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Return one lagged hop over a ``(n_nodes, days)`` impact matrix.
+
+        Column ``t`` of the result holds ``sum(w * x[src, t - lag])`` for the
+        incoming edges of every node, i.e. each edge shifts its source row
+        ``lag_days`` columns to the right. The shift is read from a strided
+        sliding-window view over a left-padded copy of ``x``, so no per-edge
+        copies are made before the gather. Negative lags land the same day.
+        """
+        w = self.weight if weight is None else weight
+        days = x.shape[1]
+        # Only edges leaving a node with a non-zero row can contribute.
+        active = np.flatnonzero(x.any(axis=1)[self.src])
+        out = np.zeros((self.n_nodes, days), dtype=float)
+        if active.size == 0:
+            return out
+        lag = np.maximum(self.lag_days[active], 0)
+        max_lag = int(lag.max())
+        padded = np.concatenate((np.zeros((x.shape[0], max_lag)), x), axis=1)
+        windows = sliding_window_view(padded, days, axis=1)
+        contrib = windows[self.src[active], max_lag - lag] * w[active, None]
+        rows, starts = np.unique(self.dst[active], return_index=True)
+        out[rows] = np.add.reduceat(contrib, starts, axis=0)
+        return out
+
+    def earliest_arrival(self, arrival: np.ndarray) -> np.ndarray:
+        """Return the earliest day each node is hit one hop after ``arrival``.
+
+        ``arrival`` holds a day per node (``inf`` where the node is not hit);
+        each edge adds its lag and the minimum over incoming edges is kept.
+        """
+        out = np.full(self.n_nodes, np.inf)
+        if self.n_edges == 0:
+            return out
+        cand = arrival[self.src] + np.maximum(self.lag_days, 0)
+        starts = self.indptr[:-1]
+        nonempty = self.indptr[1:] > starts
+        out[nonempty] = np.minimum.reduceat(cand, starts[nonempty])
+        return out
+
+    def reach(self, mask: np.ndarray) -> np.ndarray:
+        """Return nodes reachable in exactly one hop from ``mask``."""
+        out = np.zeros_like(mask, dtype=bool)
+        active = mask[self.src]
+        if mask.ndim == 1:
+            out[self.dst[active]] = True
+        else:
+            rows, cols = np.nonzero(active)
+            out[self.dst[rows], cols] = True
+        return out
+
+    def reach_t(self, mask: np.ndarray) -> np.ndarray:
+        """Return nodes with an edge into ``mask``, i.e. :meth:`reach` reversed."""
+        out = np.zeros_like(mask, dtype=bool)
+        out[self.src[mask[self.dst]]] = True
+        return out
+
+    def _segment_sum(self, contrib: np.ndarray) -> np.ndarray:
+        out = np.zeros((self.n_nodes,) + contrib.shape[1:], dtype=float)
+        if contrib.shape[0] == 0:
+            return out
+        starts = self.indptr[:-1]
+        nonempty = self.indptr[1:] > starts
+        out[nonempty] = np.add.reduceat(contrib, starts[nonempty], axis=0)
+        return out
+
+
+def compile_graph(
+    edges: Iterable[Mapping[str, Any]],
+    top_k: int | None = None,
+    min_weight: float = 0.0,
+) -> CompiledGraph:
+    """Compile edge records into a :class:`CompiledGraph`.
+
+    Field coercion mirrors :class:`risk_engine.cascade.Edge`: missing betas
+    become ``0``, missing lags ``0`` and missing confidences ``1``. With
+    ``top_k`` or ``min_weight`` the result is pruned with
+    :meth:`CompiledGraph.sparsify`.
+    """
+    src_ids: list[int] = []
+    dst_ids: list[int] = []
+    betas: list[float] = []
+    confs: list[float] = []
+    lags: list[int] = []
+    for e in edges:
+        src_ids.append(int(e["src_factor"]))
+        dst_ids.append(int(e["dst_factor"]))
+        betas.append(float(e.get("beta", 0.0) or 0.0))
+        confs.append(float(e.get("confidence", 1.0) or 1.0))
+        lags.append(int(e.get("lag_days", 0) or 0))
+
+    src_arr = np.asarray(src_ids, dtype=np.int64)
+    dst_arr = np.asarray(dst_ids, dtype=np.int64)
+    node_ids = np.unique(np.concatenate((src_arr, dst_arr)))
+    graph = CompiledGraph(
+        node_ids=node_ids,
+        src=np.searchsorted(node_ids, src_arr),
+        dst=np.searchsorted(node_ids, dst_arr),
+        beta=np.asarray(betas, dtype=float),
+        confidence=np.asarray(confs, dtype=float),
+        lag_days=np.asarray(lags, dtype=np.int64),
+    )
+    if top_k is None and min_weight <= 0:
+        return graph
+    return graph.sparsify(top_k, min_weight)
+
+
+def compile_regime_graphs(
+    edges: Sequence[Mapping[str, Any]],
+    method: str | None = None,
+) -> Dict[str | None, CompiledGraph]:
+    """Compile one graph per ``regime`` found in ``edges``.
+
+    Edges without a regime form the base graph (key ``None``). Every regime
+    graph holds the base edges plus that regime's edges, a regime edge
+    replacing the base edge between the same two factors. With a ``method``
+    only edges estimated by it are used (edges without one count as
+    ``corr``), since edges of different methods between the same factors
+    would otherwise add up. Raises ``ValueError`` for a method outside
+    :data:`risk_engine.edges.PROPAGATION_METHODS`.
+    """
+    if method is not None and method not in PROPAGATION_METHODS:
+        raise ValueError(f"{method} edges cannot be propagated")
+    base: List[Mapping[str, Any]] = []
+    by_regime: Dict[str, List[Mapping[str, Any]]] = {}
+    for e in edges:
+        if method is not None and (e.get("method") or "corr") != method:
+            continue
+        regime = e.get("regime")
+        if regime is None:
+            base.append(e)
+        else:
+            by_regime.setdefault(str(regime), []).append(e)
+
+    graphs: Dict[str | None, CompiledGraph] = {None: compile_graph(base)}
+    for regime, specific in sorted(by_regime.items()):
+        pairs = {(int(e["src_factor"]), int(e["dst_factor"])) for e in specific}
+        kept = [
+            e for e in base if (int(e["src_factor"]), int(e["dst_factor"])) not in pairs
+        ]
+        graph = compile_graph(kept + specific)
+        graph.regime = regime
+        graphs[regime] = graph
+    return graphs
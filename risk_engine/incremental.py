@@ -0,0 +1,367 @@
+"""Incremental re-estimation of lagged-correlation edges.
+
+:class:`PairStatistics` keeps, for every factor pair and lag, the running
+sums ``n, sum(x), sum(y), sum(x^2), sum(y^2), sum(x*y)`` over the aligned
+observations on a daily calendar grid. Those sums are all the lagged
+correlation estimator needs, so new observations can be folded in without
+revisiting history and the edges read off with
+:func:`risk_engine.edges.select_lags`. The sums can be kept in a
+memory-mapped ``.npy`` file that is updated and grown in place.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+from datetime import date
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from risk_engine.edges import EdgeEstimate, _Spectra, daily_matrix, select_lags
+from risk_engine.pairs import _BLOCK_ELEMENTS
+
+# Watermark of a factor that has not been seen yet.
+_NEVER = np.iinfo(np.int64).min
+
+
+def sums_path(path: str) -> str:
+    """Return the ``.npy`` file holding the sums of statistics at ``path``."""
+    return f"{os.path.splitext(path)[0]}.sums.npy"
+
+
+def _create_sums(path: str, shape: tuple[int, ...]) -> np.memmap:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return np.lib.format.open_memmap(
+        sums_path(path), mode="w+", dtype=np.float64, shape=shape
+    )
+
+
+def _grow_sums(sums: np.memmap, rows: int) -> np.memmap:
+    """Extend the ``.npy`` file mapped by ``sums`` to ``rows`` zeroed rows.
+
+    ``.npy`` headers keep room for the first axis to grow, so only the
+    header and the file length change.
+    """
+    shape = (rows,) + sums.shape[1:]
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(
+        header,
+        {
+            "descr": np.lib.format.dtype_to_descr(sums.dtype),
+            "fortran_order": False,
+            "shape": shape,
+        },
+    )
+    if len(header.getvalue()) != sums.offset:
+        raise ValueError(f"cannot grow {sums.filename} in place")
+    sums.flush()
+    with open(sums.filename, "r+b") as f:
+        f.write(header.getvalue())
+        f.truncate(sums.offset + int(np.prod(shape)) * sums.dtype.itemsize)
+    return np.lib.format.open_memmap(sums.filename, mode="r+")
+
+
+class PairStatistics:
+    """Running lagged co-moment sums for every pair of known factors.
+
+    ``sums`` has shape ``(pairs, 6, 2 * max_lag + 1)``. Pairs ``(i, j)``
+    with ``i < j`` in ``factor_ids`` order are laid out at
+    ``j * (j - 1) / 2 + i`` so that new factors only append pairs. Values are
+    shifted by a per-factor reference fixed when the factor is first seen,
+    which keeps the sums well conditioned.
+
+    With a ``path`` the sums live in :func:`sums_path` and are memory-mapped,
+    so only the pairs being read or updated are paged in. Such statistics
+    are changed on disk: the ``path`` file is removed before the first
+    change and written again by :meth:`save`, so a run that stops in
+    between leaves nothing to load and the next one rebuilds.
+    """
+
+    def __init__(
+        self,
+        max_lag: int,
+        factor_ids: List[int] | None = None,
+        refs: np.ndarray | None = None,
+        first: np.ndarray | None = None,
+        last: np.ndarray | None = None,
+        sums: np.ndarray | None = None,
+        path: str | None = None,
+    ) -> None:
+        self.max_lag = max_lag
+        self.lags = np.arange(-max_lag, max_lag + 1)
+        self.factor_ids = list(factor_ids or [])
+        n = len(self.factor_ids)
+        self.refs = np.zeros(n) if refs is None else refs
+        self.first = np.full(n, _NEVER, dtype=np.int64) if first is None else first
+        self.last = np.full(n, _NEVER, dtype=np.int64) if last is None else last
+        shape = (n * (n - 1) // 2, 6, self.lags.size)
+        if sums is None:
+            sums = np.zeros(shape) if path is None else _create_sums(path, shape)
+        self.sums = sums
+        self.path = path
+
+    @staticmethod
+    def pair_index(i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        return j * (j - 1) // 2 + i
+
+    def pairs(self) -> np.ndarray:
+        """Return the ``(src, dst)`` factor positions in storage order."""
+        n = len(self.factor_ids)
+        j, i = np.triu_indices(n, k=1)[::-1]
+        order = np.argsort(self.pair_index(i, j), kind="stable")
+        return np.stack((i[order], j[order]), axis=1)
+
+    @classmethod
+    def rebuild(
+        cls, data: Dict[int, pd.Series], max_lag: int, path: str | None = None
+    ) -> "PairStatistics":
+        """Compute the sums from full history with the FFT engine.
+
+        With a ``path`` the sums are written straight to :func:`sums_path`
+        instead of being held in memory; :meth:`save` completes the state.
+        """
+        ids = list(data)
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+        stats = cls(max_lag, ids, path=path)
+        grid, values = daily_matrix(ids, data)
+        if grid.size == 0:
+            return stats
+        spectra = _Spectra.from_values(values, max_lag, min_overlap=1)
+        assert spectra.means is not None
+        stats.refs = spectra.means
+        offset = max_lag + int(spectra.lags[0])
+        pairs = stats.pairs()
+        for start in range(0, len(pairs), spectra.block_size):
+            block = pairs[start : start + spectra.block_size]
+            stats.sums[
+                start : start + len(block), :, offset : offset + spectra.lags.size
+            ] = np.moveaxis(spectra.sums(block), 0, 1)
+        stats._mark_seen(np.arange(len(ids)), grid, values)
+        return stats
+
+    def update(self, data: Dict[int, pd.Series]) -> np.ndarray:
+        """Fold observations newer than each factor's watermark into the sums.
+
+        ``data`` must contain, for every factor, the observations after its
+        watermark plus at least ``max_lag`` days of earlier context; older
+        points are only used as partners of new ones. Each pair of points is
+        counted exactly once, in the run where the later of the two arrives,
+        so late-published series are handled correctly. Returns the storage
+        indices of the pairs whose sums changed.
+        """
+        added = [fid for fid in data if fid not in self._positions()]
+        if added:
+            self._begin_write()
+            self._add_factors(added)
+        pos = self._positions()
+        ids = list(data)
+        rows = np.array([pos[fid] for fid in ids], dtype=np.int64)
+        grid, values = daily_matrix(ids, data)
+        if grid.size == 0:
+            return np.empty(0, dtype=np.int64)
+        unseen = (self.first[rows] == _NEVER) & np.isfinite(values).any(axis=1)
+        self.refs[rows[unseen]] = np.nanmean(values[unseen], axis=1)
+        values -= self.refs[rows][:, None]
+        new = np.isfinite(values) & (grid[None, :] > self.last[rows][:, None])
+        updated = new.any(axis=1)
+        if not updated.any():
+            return np.empty(0, dtype=np.int64)
+
+        a, b = np.triu_indices(len(ids), k=1)
+        keep = updated[a] | updated[b]
+        a, b = a[keep], b[keep]
+        # Storage orders pairs by factor position, swap where needed.
+        swap = rows[a] > rows[b]
+        src = np.where(swap, b, a)
+        dst = np.where(swap, a, b)
+        index = self.pair_index(rows[src], rows[dst])
+        # Visit the stored pairs in file order.
+        order = np.argsort(index)
+        src, dst, index = src[order], dst[order], index[order]
+
+        self._begin_write()
+        cols = np.flatnonzero(new.any(axis=0))
+        block = max(1, _BLOCK_ELEMENTS // max(1, cols.size * self.lags.size))
+        for start in range(0, len(index), block):
+            sl = slice(start, start + block)
+            self.sums[index[sl]] += self._increments(
+                values, new, src[sl], dst[sl], cols
+            )
+        self._mark_seen(rows[updated], grid, values[updated])
+        return index
+
+    def _increments(
+        self,
+        values: np.ndarray,
+        new: np.ndarray,
+        src: np.ndarray,
+        dst: np.ndarray,
+        cols: np.ndarray,
+    ) -> np.ndarray:
+        n_days = values.shape[1]
+        lags = self.lags[:, None]
+        out = np.zeros((len(src), 6, self.lags.size))
+
+        def accumulate(x: np.ndarray, y: np.ndarray, ok: np.ndarray) -> None:
+            x = np.where(ok, x, 0.0)
+            y = np.where(ok, y, 0.0)
+            out[:, 0] += ok.sum(axis=2)
+            out[:, 1] += x.sum(axis=2)
+            out[:, 2] += y.sum(axis=2)
+            out[:, 3] += (x * x).sum(axis=2)
+            out[:, 4] += (y * y).sum(axis=2)
+            out[:, 5] += (x * y).sum(axis=2)
+
+        # New src point at t paired with dst at t + lag.
+        t = cols[None, :]
+        u = t + lags
+        inside = (u >= 0) & (u < n_days)
+        u = np.clip(u, 0, n_days - 1)
+        x = values[src][:, None, cols]
+        y = values[dst][:, u]
+        ok = new[src][:, None, cols] & np.isfinite(y) & inside
+        accumulate(np.broadcast_to(x, y.shape), y, ok)
+
+        # New dst point at u paired with an old src point at u - lag.
+        u = cols[None, :]
+        t = u - lags
+        inside = (t >= 0) & (t < n_days)
+        t = np.clip(t, 0, n_days - 1)
+        x = values[src][:, t]
+        y = values[dst][:, None, cols]
+        ok = new[dst][:, None, cols] & np.isfinite(x) & ~new[src][:, t] & inside
+        accumulate(x, np.broadcast_to(y, x.shape), ok)
+        return out
+
+    def context_start(self, factor_ids: List[int]) -> date | None:
+        """Return the first date :meth:`update` needs for ``factor_ids``.
+
+        ``None`` means full history is required because a factor has not
+        been seen yet.
+        """
+        pos = self._positions()
+        rows = [pos.get(fid) for fid in factor_ids]
+        if not rows or any(r is None or self.last[r] == _NEVER for r in rows):
+            return None
+        start = min(int(self.last[r]) for r in rows) - self.max_lag
+        return date.fromordinal(max(start, 1))
+
+    def estimates(
+        self, index: np.ndarray | None = None, min_overlap: int = 3
+    ) -> List[EdgeEstimate]:
+        """Return edge estimates for the pairs at ``index`` (all by default).
+
+        Besides the usual fields each estimate carries the ``sample_start``
+        and ``sample_end`` dates the pair's sums cover.
+        """
+        pairs = self.pairs()
+        if index is None:
+            index = np.arange(len(pairs))
+        index = np.unique(index)
+        block = max(1, _BLOCK_ELEMENTS // (6 * self.lags.size))
+        edges: List[EdgeEstimate] = []
+        for offset in range(0, len(index), block):
+            part = index[offset : offset + block]
+            sums = np.moveaxis(self.sums[part], 1, 0)
+            lags, betas = select_lags(sums, self.lags, min_overlap)
+            for (i, j), lag, beta in zip(pairs[part], lags, betas):
+                if np.isnan(beta):
+                    continue
+                start = max(self.first[i], self.first[j])
+                end = min(self.last[i], self.last[j])
+                edges.append(
+                    EdgeEstimate(
+                        {
+                            "src_factor": self.factor_ids[i],
+                            "dst_factor": self.factor_ids[j],
+                            "beta": float(beta),
+                            "lag_days": int(lag),
+                            "confidence": abs(float(beta)),
+                            "sample_start": date.fromordinal(int(start)),
+                            "sample_end": date.fromordinal(int(end)),
+                        }
+                    )
+                )
+        return edges
+
+    def save(self, path: str) -> None:
+        """Write the statistics to ``path`` (``.npz``) and :func:`sums_path`.
+
+        Sums mapped from ``path`` are flushed in place, others are copied.
+        ``path`` is replaced last and atomically, so it only exists while
+        both files agree.
+        """
+        if isinstance(self.sums, np.memmap) and self.path == path:
+            self.sums.flush()
+        else:
+            if os.path.exists(path):
+                os.remove(path)
+            tmp = f"{sums_path(path)}.tmp.npy"
+            np.save(tmp, self.sums)
+            os.replace(tmp, sums_path(path))
+        tmp = f"{path}.tmp.npz"
+        np.savez(
+            tmp,
+            max_lag=self.max_lag,
+            factor_ids=np.asarray(self.factor_ids, dtype=np.int64),
+            refs=self.refs,
+            first=self.first,
+            last=self.last,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "PairStatistics":
+        """Open the statistics at ``path`` with their sums memory-mapped."""
+        with np.load(path) as f:
+            stats = cls(
+                int(f["max_lag"]),
+                [int(x) for x in f["factor_ids"]],
+                f["refs"],
+                f["first"],
+                f["last"],
+                np.lib.format.open_memmap(sums_path(path), mode="r+"),
+                path,
+            )
+        n = len(stats.factor_ids)
+        if stats.sums.shape != (n * (n - 1) // 2, 6, stats.lags.size):
+            raise ValueError(f"{sums_path(path)} does not match {path}")
+        return stats
+
+    def _positions(self) -> Dict[int, int]:
+        return {fid: i for i, fid in enumerate(self.factor_ids)}
+
+    def _add_factors(self, factor_ids: List[int]) -> None:
+        if not factor_ids:
+            return
+        self.factor_ids.extend(factor_ids)
+        k = len(factor_ids)
+        self.refs = np.concatenate((self.refs, np.zeros(k)))
+        self.first = np.concatenate((self.first, np.full(k, _NEVER)))
+        self.last = np.concatenate((self.last, np.full(k, _NEVER)))
+        n = len(self.factor_ids)
+        rows = n * (n - 1) // 2
+        if isinstance(self.sums, np.memmap):
+            self.sums = _grow_sums(self.sums, rows)
+            return
+        grown = np.zeros((rows,) + self.sums.shape[1:])
+        grown[: len(self.sums)] = self.sums
+        self.sums = grown
+
+    def _begin_write(self) -> None:
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _mark_seen(
+        self, rows: np.ndarray, grid: np.ndarray, values: np.ndarray
+    ) -> None:
+        for row, series in zip(rows, values):
+            seen = grid[np.isfinite(series)]
+            if not seen.size:
+                continue
+            if self.first[row] == _NEVER:
+                self.first[row] = seen[0]
+            self.last[row] = max(self.last[row], seen[-1])
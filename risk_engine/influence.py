@@ -0,0 +1,131 @@
+"""Precomputed factor-to-factor influence for fixed cascade parameters."""
+
+from __future__ import annotations
+
+import os
+from typing import Dict
+
+import numpy as np
+
+from risk_engine.cascade import propagate
+from risk_engine.graph import CompiledGraph
+
+
+class InfluenceMatrix:
+    """Unit-shock impacts of every source factor, stored row-sparse.
+
+    Row ``s`` lists the factors reached from ``node_ids[s]`` within
+    ``horizon`` hops together with the impact of a unit shock, so a single
+    shock is answered by scaling one row. Rows use CSR arrays (``indptr``,
+    ``indices``, ``values``) with ``float32`` values; ``version`` and
+    ``regime`` identify the graph the matrix was built from.
+    """
+
+    def __init__(
+        self,
+        node_ids: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        values: np.ndarray,
+        horizon: int,
+        decay: float,
+        version: int | None = None,
+        regime: str | None = None,
+    ) -> None:
+        self.node_ids = node_ids
+        self.indptr = indptr
+        self.indices = indices
+        self.values = values
+        self.horizon = horizon
+        self.decay = decay
+        self.version = version
+        self.regime = regime
+        self.index: Dict[int, int] = {int(f): i for i, f in enumerate(node_ids)}
+
+    @classmethod
+    def build(
+        cls,
+        graph: CompiledGraph,
+        horizon: int = 3,
+        decay: float = 0.7,
+        threshold: float = 0.0,
+        chunk_size: int = 256,
+    ) -> "InfluenceMatrix":
+        """Propagate unit shocks from every node, ``chunk_size`` at a time.
+
+        Entries whose absolute impact is below ``threshold`` are dropped,
+        except the source itself; ``0`` keeps every reached factor, i.e. the
+        same factors :func:`risk_engine.cascade.propagate_shock` returns.
+        """
+        n = graph.n_nodes
+        counts = np.zeros(n, dtype=np.int64)
+        indices: list[np.ndarray] = []
+        values: list[np.ndarray] = []
+        for start in range(0, n, chunk_size):
+            sources = np.arange(start, min(start + chunk_size, n))
+            cols = np.arange(sources.size)
+            x = np.zeros((n, sources.size))
+            x[sources, cols] = 1.0
+            impacts, reached = propagate(graph, x, horizon, decay, origin=x != 0)
+            keep = reached & (np.abs(impacts) >= threshold)
+            keep[sources, cols] = True
+            col, row = np.nonzero(keep.T)
+            counts[sources] = np.bincount(col, minlength=sources.size)
+            indices.append(row.astype(np.int32))
+            values.append(impacts[row, col].astype(np.float32))
+        return cls(
+            graph.node_ids.copy(),
+            np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+            np.concatenate(indices) if indices else np.empty(0, dtype=np.int32),
+            np.concatenate(values) if values else np.empty(0, dtype=np.float32),
+            horizon,
+            decay,
+            graph.version,
+            graph.regime,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.indptr.nbytes + self.indices.nbytes + self.values.nbytes)
+
+    def impacts(self, start_factor: int, shock: float) -> Dict[int, float]:
+        """Return ``propagate_shock``'s result for a shock at ``start_factor``."""
+        s = self.index.get(int(start_factor))
+        if s is None:
+            return {start_factor: shock}
+        lo, hi = self.indptr[s], self.indptr[s + 1]
+        ids = self.node_ids[self.indices[lo:hi]]
+        scaled = self.values[lo:hi].astype(float) * shock
+        return dict(zip(ids.tolist(), scaled.tolist()))
+
+    def save(self, path: str) -> None:
+        """Atomically write the matrix to ``path`` (``.npz``)."""
+        tmp = f"{path}.tmp.npz"
+        np.savez(
+            tmp,
+            node_ids=self.node_ids,
+            indptr=self.indptr,
+            indices=self.indices,
+            values=self.values,
+            horizon=self.horizon,
+            decay=self.decay,
+            version=-1 if self.version is None else self.version,
+            regime="" if self.regime is None else self.regime,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "InfluenceMatrix":
+        with np.load(path) as f:
+            version = int(f["version"])
+            regime = str(f["regime"]) if "regime" in f.files else ""
+            return cls(
+                f["node_ids"],
+                f["indptr"],
+                f["indices"],
+                f["values"],
+                int(f["horizon"]),
+                float(f["decay"]),
+                None if version < 0 else version,
+                regime or None,
+            )
@@ -0,0 +1,107 @@
+"""Block-wise evaluation of factor pairs, optionally over a process pool."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Mapping
+
+import numpy as np
+
+# Upper bound on the elements of the temporaries of one pair block, keeps a
+# block's working set around a few hundred megabytes.
+_BLOCK_ELEMENTS = 1 << 22
+
+ProgressCallback = Callable[[int, int], None]
+
+# ``kernel(arrays, pairs, **params)`` returns a tuple of per-pair arrays.
+PairKernel = Callable[..., tuple]
+
+# Shared arrays attached by each worker process of a parallel run.
+_worker_arrays: Dict[str, np.ndarray] = {}
+
+
+def block_size(elements_per_pair: int) -> int:
+    """Return how many pairs fit in one block of ``_BLOCK_ELEMENTS``."""
+    return max(1, _BLOCK_ELEMENTS // max(1, elements_per_pair))
+
+
+def _attach_worker(directory: str, names: List[str]) -> None:
+    global _worker_arrays
+    _worker_arrays = {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+        for name in names
+    }
+
+
+def _run_block(kernel: PairKernel, pairs: np.ndarray, params: Dict[str, Any]) -> tuple:
+    return kernel(_worker_arrays, pairs, **params)
+
+
+def _save_arrays(directory: str, arrays: Mapping[str, np.ndarray]) -> None:
+    for name, arr in arrays.items():
+        out = np.lib.format.open_memmap(
+            os.path.join(directory, f"{name}.npy"),
+            mode="w+",
+            dtype=arr.dtype,
+            shape=arr.shape,
+        )
+        out[:] = arr
+        out.flush()
+
+
+def map_pair_blocks(
+    kernel: PairKernel,
+    arrays: Dict[str, np.ndarray],
+    pairs: np.ndarray,
+    block: int,
+    workers: int = 1,
+    progress: ProgressCallback | None = None,
+    **params: Any,
+) -> List[np.ndarray]:
+    """Evaluate ``kernel`` over ``pairs`` in blocks of ``block`` pairs.
+
+    ``kernel`` must be a module-level function so it can be sent to worker
+    processes. With ``workers > 1`` the shared ``arrays`` are written once to
+    memory-mapped files that each worker maps instead of receiving them, and
+    equally sized pair blocks are evaluated by a process pool. Outputs are
+    stored by block position, so they do not depend on scheduling.
+    ``progress`` is called with ``(pairs_done, pairs_total)`` after every
+    block. Returns the kernel outputs concatenated over all pairs.
+    """
+    starts = list(range(0, len(pairs), block))
+    results: Dict[int, tuple] = {}
+    done = 0
+
+    def store(start: int, result: tuple) -> None:
+        nonlocal done
+        results[start] = result
+        done += min(block, len(pairs) - start)
+        if progress is not None:
+            progress(done, len(pairs))
+
+    if workers <= 1:
+        for start in starts:
+            store(start, kernel(arrays, pairs[start : start + block], **params))
+    else:
+        with tempfile.TemporaryDirectory(prefix="pairs-") as directory:
+            _save_arrays(directory, arrays)
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_attach_worker,
+                initargs=(directory, list(arrays)),
+            ) as pool:
+                futures = {
+                    pool.submit(
+                        _run_block, kernel, pairs[start : start + block], params
+                    ): start
+                    for start in starts
+                }
+                for future in as_completed(futures):
+                    store(futures[future], future.result())
+
+    if not starts:
+        return []
+    ordered = [results[start] for start in starts]
+    return [np.concatenate(parts) for parts in zip(*ordered)]
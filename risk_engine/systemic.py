@@ -0,0 +1,75 @@
+"""Graph-wide systemic impact measures.
+
+The total downstream impact of a unit shock at factor ``j`` is the column
+sum of the Leontief-style inverse ``(I - decay * W)^-1`` minus the shock
+itself, i.e. the Katz centrality of ``j`` on the transposed graph. All
+columns are obtained at once by solving ``(I - decay * W.T) z = 1`` with a
+sparse fixed-point (Jacobi / Neumann) iteration, one ``W.T @ z`` product per
+step, instead of one :func:`risk_engine.cascade.propagate_shock` per factor.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from risk_engine.graph import CompiledGraph
+
+
+def downstream_impact(
+    graph: CompiledGraph,
+    decay: float = 0.7,
+    horizon: int | None = None,
+    tol: float = 1e-10,
+    max_iter: int = 1000,
+) -> np.ndarray:
+    """Return the total downstream impact of a unit shock at every node.
+
+    Edge weights enter by magnitude so opposite-signed paths do not cancel.
+    With ``horizon`` the Neumann series ``sum_{d=1..horizon} (decay W)^d`` is
+    truncated after that many hops; otherwise it is iterated until the
+    relative change drops below ``tol``.
+
+    Raises
+    ------
+    ValueError
+        If the series does not converge within ``max_iter`` steps, which
+        happens when the spectral radius of ``decay * |W|`` is at least one.
+    """
+    weight = decay * np.abs(graph.weight)
+    ones = np.ones(graph.n_nodes)
+    z = ones.copy()
+    steps = max_iter if horizon is None else horizon
+    for _ in range(steps):
+        nxt = ones + graph.spmm_t(z, weight)
+        delta = np.abs(nxt - z).max(initial=0.0)
+        z = nxt
+        if horizon is None and delta <= tol * np.abs(z).max(initial=1.0):
+            return z - 1.0
+        if not np.isfinite(delta):
+            break
+    if horizon is None:
+        raise ValueError(
+            "systemic impact diverges: spectral radius of decay * |W| is not below 1"
+        )
+    return z - 1.0
+
+
+def systemic_contributions(
+    graph: CompiledGraph,
+    shocks: np.ndarray | None = None,
+    decay: float = 0.7,
+    horizon: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return per-node ``impact_pct`` and ``systemic_contrib``.
+
+    ``impact_pct`` is the downstream impact of a shock as a percentage of
+    the shock size. ``systemic_contrib`` is each node's share of the
+    system-wide impact when every node receives its own ``shocks`` entry
+    (e.g. its volatility); it sums to one unless there is no impact at all.
+    """
+    impact = downstream_impact(graph, decay, horizon)
+    size = np.ones(graph.n_nodes) if shocks is None else np.abs(shocks)
+    total = size * impact
+    denom = total.sum()
+    contrib = total / denom if denom > 0 else np.zeros_like(total)
+    return 100.0 * impact, contrib
@@ -5,7 +5,146 @@ from __future__ import annotations
 from typing import Iterable
 
 import numpy as np
-import pandas as pd
+
+
+class EwmaState:
+    """Running EWMA moments of the log returns of a panel of series.
+
+    Mirrors ``pandas.Series.ewm(span=span).std()`` (``adjust=True``, bias
+    corrected) applied to each series' returns between consecutive
+    observations. Per series it keeps the last log level, the weighted mean
+    and biased variance of the returns and the sums of weights and squared
+    weights, so new observations can be folded in without the history.
+    """
+
+    def __init__(
+        self,
+        span: int,
+        last_log: np.ndarray,
+        mean: np.ndarray,
+        var: np.ndarray,
+        sum_w: np.ndarray,
+        sum_w2: np.ndarray,
+    ) -> None:
+        self.span = span
+        self.last_log = last_log
+        self.mean = mean
+        self.var = var
+        self.sum_w = sum_w
+        self.sum_w2 = sum_w2
+
+    @classmethod
+    def empty(cls, n_series: int, span: int = 30) -> "EwmaState":
+        zeros = np.zeros(n_series)
+        return cls(
+            span,
+            np.full(n_series, np.nan),
+            zeros.copy(),
+            zeros.copy(),
+            zeros.copy(),
+            zeros.copy(),
+        )
+
+    @property
+    def volatility(self) -> np.ndarray:
+        """Return the current volatility per series, ``NaN`` if undefined."""
+        numerator = self.sum_w * self.sum_w
+        denominator = numerator - self.sum_w2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var = np.where(denominator > 0, self.var * numerator / denominator, np.nan)
+        return np.sqrt(np.maximum(var, 0.0))
+
+    def update(
+        self,
+        values: np.ndarray,
+        mask: np.ndarray | None = None,
+        path: bool = False,
+    ) -> np.ndarray | None:
+        """Fold a ``(series, time)`` block of levels into the state.
+
+        ``mask`` flags observed entries; by default every finite, positive
+        level counts as observed. Returns are taken between consecutive
+        observations of a series, including the last level of a previous
+        update. The recursion runs once per column over all series at once.
+        With ``path`` the volatility after every column is returned as a
+        ``(series, time)`` array.
+        """
+        values = np.asarray(values, dtype=float)
+        ok = np.isfinite(values) & (values > 0)
+        if mask is not None:
+            ok &= mask
+        with np.errstate(divide="ignore", invalid="ignore"):
+            logs = np.where(ok, np.log(values), np.nan)
+        returns = self._returns(logs, ok)
+        out = np.full(values.shape, np.nan) if path else None
+
+        decay = 1.0 - 2.0 / (self.span + 1.0)
+        for t in range(values.shape[1]):
+            x = returns[:, t]
+            valid = np.isfinite(x)
+            if valid.any():
+                self._step(np.where(valid, x, 0.0), valid, decay)
+            if out is not None:
+                out[:, t] = self.volatility
+        return out
+
+    def _returns(self, logs: np.ndarray, ok: np.ndarray) -> np.ndarray:
+        # Forward fill the last observed log level (seeded by the state).
+        n, t = logs.shape
+        seeded = np.concatenate((self.last_log[:, None], logs), axis=1)
+        has = np.concatenate((np.isfinite(self.last_log)[:, None], ok), axis=1)
+        idx = np.where(has, np.arange(t + 1), 0)
+        np.maximum.accumulate(idx, axis=1, out=idx)
+        filled = seeded[np.arange(n)[:, None], idx]
+        observed = has.any(axis=1)
+        self.last_log = np.where(observed, filled[:, -1], self.last_log)
+        return np.where(ok, logs - filled[:, :-1], np.nan)
+
+    def _step(self, x: np.ndarray, valid: np.ndarray, decay: float) -> None:
+        old_w = np.where(valid, self.sum_w * decay, self.sum_w)
+        new_w = valid.astype(float)
+        total = old_w + new_w
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = (old_w * self.mean + new_w * x) / total
+            var = (
+                old_w * (self.var + (self.mean - mean) ** 2) + new_w * (x - mean) ** 2
+            ) / total
+        self.mean = np.where(valid, mean, self.mean)
+        self.var = np.where(valid, var, self.var)
+        self.sum_w = np.where(valid, total, self.sum_w)
+        self.sum_w2 = np.where(valid, self.sum_w2 * decay * decay + 1.0, self.sum_w2)
+
+
+def ewma_volatility_panel(
+    values: np.ndarray,
+    mask: np.ndarray | None = None,
+    span: int = 30,
+    path: bool = False,
+) -> tuple[np.ndarray, np.ndarray | None]:
+    """Compute EWMA log-return volatility for every row of a panel.
+
+    Parameters
+    ----------
+    values:
+        ``(series, time)`` array of price or index levels.
+    mask:
+        Optional boolean array of the same shape flagging observed entries.
+        Non-finite and non-positive levels are always treated as missing.
+    span:
+        Span for the exponential weighting; defaults to 30.
+    path:
+        Also return the full ``(series, time)`` volatility path.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray | None]
+        The latest volatility per series (``0.0`` if insufficient data) and
+        the path (``NaN`` until defined) or ``None``.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    state = EwmaState.empty(values.shape[0], span)
+    out = state.update(values, mask, path=path)
+    return np.nan_to_num(state.volatility, nan=0.0), out
 
 
 def ewma_volatility(values: Iterable[float], span: int = 30) -> float:
@@ -23,11 +162,8 @@ def ewma_volatility(values: Iterable[float], span: int = 30) -> float:
     float
         The latest EWMA volatility. Returns ``0.0`` if insufficient data.
     """
-    series = pd.Series(list(values))
+    series = np.fromiter(values, dtype=float)
     if series.size < 2:
         return 0.0
-    log_returns = np.log(series).diff()
-    vol = log_returns.ewm(span=span).std().iloc[-1]
-    if pd.isna(vol):
-        return 0.0
-    return float(vol)
+    latest, _ = ewma_volatility_panel(series[None, :], span=span)
+    return float(latest[0])
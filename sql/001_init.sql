@@ -121,6 +121,46 @@ CREATE TABLE IF NOT EXISTS risk_snapshots (
     PRIMARY KEY (factor_id, ts)
 );
 
+CREATE TABLE IF NOT EXISTS graph_versions (
+    graph TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION bump_factor_graph_version() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO graph_versions (graph, version, updated_at)
+    VALUES ('factor_edges', 1, NOW())
+    ON CONFLICT (graph) DO UPDATE
+    SET version = graph_versions.version + 1, updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_factor_edges_version ON factor_edges;
+CREATE TRIGGER trg_factor_edges_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON factor_edges
+FOR EACH STATEMENT EXECUTE FUNCTION bump_factor_graph_version();
+
+CREATE TABLE IF NOT EXISTS current_regime (
+    scope TEXT PRIMARY KEY,
+    regime TEXT,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS ewma_state (
+    series_id TEXT NOT NULL REFERENCES series(series_id) ON DELETE CASCADE,
+    span INT NOT NULL,
+    last_ts TIMESTAMPTZ NOT NULL,
+    last_log DOUBLE PRECISION,
+    mean DOUBLE PRECISION NOT NULL,
+    var DOUBLE PRECISION NOT NULL,
+    sum_w DOUBLE PRECISION NOT NULL,
+    sum_w2 DOUBLE PRECISION NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (series_id, span)
+);
+
 CREATE TABLE IF NOT EXISTS prices_eod (
     symbol TEXT NOT NULL,
     ts DATE NOT NULL,
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from typing import Iterator
+from unittest.mock import patch
+
+import pytest
+
+from app.core import cache
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache() -> Iterator[None]:
+    """Give every API test its own empty, Redis-less response cache."""
+    with patch.object(cache, "_client", None), patch.object(
+        cache, "_local_cache", cache.LocalCache()
+    ), patch.dict(cache._versions, clear=True):
+        yield
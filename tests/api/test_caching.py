@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from app.api import caching
+from app.api.caching import cache_key, dumps
+from app.api.routers.fx import FXPair
+from app.api.schemas.common import Page
+from app.core import cache
+from app.main import app
+
+client = TestClient(app)
+
+ROW = {
+    "ts": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    "value": Decimal("1.25"),
+}
+
+
+def test_cache_key_is_canonical() -> None:
+    page = Page(limit=10, offset=20)
+    a = cache_key("fx", {"pair": FXPair.usd_eur, "start": None, "page": page})
+    b = cache_key("fx", {"page": page, "start": None, "pair": FXPair.usd_eur})
+    assert a == b == "fx:limit=10&offset=20&pair=usd_eur&start="
+    stamp = datetime(2024, 1, 1)
+    assert cache_key("bdi", {"start": stamp}) == "bdi:start=2024-01-01T00%3A00%3A00"
+
+
+def test_cache_key_escapes_values() -> None:
+    forged = cache_key("ports", {"port_id": "x&offset=20"})
+    real = cache_key("ports", {"offset": "20", "port_id": "x"})
+    assert forged != real
+    assert forged == "ports:port_id=x%26offset%3D20"
+
+
+def test_cached_routes_keep_their_response_schema() -> None:
+    paths = app.openapi()["paths"]
+    response = paths["/v1/risk"]["get"]["responses"]["200"]
+    assert response["content"]["application/json"]["schema"]["type"] == "object"
+
+
+def test_dumps_encodes_datetimes_and_decimals() -> None:
+    expected = b'{"ts":"2024-01-02T03:04:05+00:00","value":1.25}'
+    assert dumps(ROW) == expected
+    with patch.object(caching, "orjson", None):
+        assert dumps(ROW) == expected
+
+
+@patch("app.api.routers.fx.db.fetch_one", new_callable=MagicMock)
+@patch("app.api.routers.fx.db.fetch_all", new_callable=MagicMock)
+def test_hits_return_the_stored_body(
+    fetch_all: MagicMock, fetch_one: MagicMock
+) -> None:
+    fetch_all.return_value = [ROW]
+    fetch_one.return_value = {"count": 1}
+    first = client.get("/v1/fx", params={"pair": "usd_eur", "limit": 5})
+    second = client.get("/v1/fx", params={"limit": 5, "pair": "usd_eur"})
+    assert first.status_code == second.status_code == 200
+    assert first.headers["content-type"] == "application/json"
+    assert first.content == second.content
+    assert first.json()["data"][0]["ts"] == "2024-01-02T03:04:05+00:00"
+    fetch_all.assert_called_once()
+
+
+@patch("app.api.routers.macro.db.fetch_one", new_callable=MagicMock)
+@patch("app.api.routers.macro.db.fetch_all", new_callable=MagicMock)
+def test_table_writes_retire_tagged_entries(
+    fetch_all: MagicMock, fetch_one: MagicMock
+) -> None:
+    fetch_all.return_value = []
+    fetch_one.return_value = {"count": 0}
+    params = {"country": "USA", "metric": "cpi_yoy_percent"}
+    client.get("/v1/macro", params=params)
+    client.get("/v1/macro", params=params)
+    assert fetch_all.call_count == 1
+
+    cache._apply_versions({"metrics_ts:metric=gdp_current_usd": 1})
+    client.get("/v1/macro", params=params)
+    assert fetch_all.call_count == 1
+
+    cache._apply_versions({"metrics_ts:metric=cpi_yoy_percent": 1})
+    client.get("/v1/macro", params=params)
+    assert fetch_all.call_count == 2
+
+    cache._apply_versions({"metrics_ts": 1})
+    client.get("/v1/macro", params=params)
+    assert fetch_all.call_count == 3
+
+
+@patch("app.api.routers.macro.db.fetch_one", new_callable=MagicMock)
+@patch("app.api.routers.macro.db.fetch_all", new_callable=MagicMock)
+def test_long_ttl_needs_a_live_invalidation_feed(
+    fetch_all: MagicMock, fetch_one: MagicMock
+) -> None:
+    fetch_all.return_value = []
+    fetch_one.return_value = {"count": 0}
+
+    def expires_in(country: str) -> float:
+        client.get(
+            "/v1/macro", params={"country": country, "metric": "cpi_yoy_percent"}
+        )
+        (key,) = [k for k in cache._local_cache._store if f"country={country}" in k]
+        return cache._local_cache.lookup(key)[1] - cache.settings.cache_stale_seconds
+
+    assert not cache.invalidation_live()
+    assert expires_in("USA") <= 30
+    with patch.object(cache, "_feed_live", True):
+        assert expires_in("GBR") > 3600
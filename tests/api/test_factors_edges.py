@@ -1,25 +1,29 @@
 from __future__ import annotations
 
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock, patch
 
+import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.services import graph_service, influence_service
+from app.services.influence_service import InfluenceCache
+from risk_engine.graph import compile_graph
+from risk_engine.influence import InfluenceMatrix
 
 client = TestClient(app)
 
 
-@patch("app.api.routers.risk.cache.cache_get", new_callable=AsyncMock)
-@patch("app.api.routers.risk.cache.cache_set", new_callable=AsyncMock)
+def setup_function() -> None:
+    graph_service.invalidate()
+
+
 @patch("app.api.routers.risk.db.fetch_one", new_callable=MagicMock)
 @patch("app.api.routers.risk.db.fetch_all", new_callable=MagicMock)
 def test_list_factors(
     fetch_all: MagicMock,
     fetch_one: MagicMock,
-    cache_set: AsyncMock,
-    cache_get: AsyncMock,
 ) -> None:
-    cache_get.return_value = None
     fetch_all.return_value = [
         {
             "factor_id": 1,
@@ -36,17 +40,12 @@ def test_list_factors(
     fetch_all.assert_called_once()
 
 
-@patch("app.api.routers.risk.cache.cache_get", new_callable=AsyncMock)
-@patch("app.api.routers.risk.cache.cache_set", new_callable=AsyncMock)
 @patch("app.api.routers.risk.db.fetch_one", new_callable=MagicMock)
 @patch("app.api.routers.risk.db.fetch_all", new_callable=MagicMock)
 def test_list_edges(
     fetch_all: MagicMock,
     fetch_one: MagicMock,
-    cache_set: AsyncMock,
-    cache_get: AsyncMock,
 ) -> None:
-    cache_get.return_value = None
     fetch_all.return_value = [
         {
             "edge_id": 1,
@@ -73,17 +72,12 @@ def test_list_edges(
     fetch_all.assert_called_once()
 
 
-@patch("app.api.routers.risk.cache.cache_get", new_callable=AsyncMock)
-@patch("app.api.routers.risk.cache.cache_set", new_callable=AsyncMock)
 @patch("app.api.routers.risk.db.fetch_one", new_callable=MagicMock)
 @patch("app.api.routers.risk.db.fetch_all", new_callable=MagicMock)
 def test_list_risk_snapshots(
     fetch_all: MagicMock,
     fetch_one: MagicMock,
-    cache_set: AsyncMock,
-    cache_get: AsyncMock,
 ) -> None:
-    cache_get.return_value = None
     fetch_all.return_value = [
         {
             "factor_id": 1,
@@ -119,3 +113,197 @@ def test_simulate_shock(fetch_all: MagicMock) -> None:
     assert resp.json()["factor_id"] == 1
     # Decay of 0.7 applied to downstream shock
     assert resp.json()["impacts"] == {"1": 1.0, "2": 0.35}
+
+    resp = client.get("/v1/simulate_shock", params={"factor_id": 1, "horizon": 51})
+    assert resp.status_code == 422
+
+
+@patch("app.api.routers.risk.db.fetch_one", new_callable=MagicMock)
+@patch("app.api.routers.risk.db.fetch_all", new_callable=MagicMock)
+def test_simulate_shock_regime(fetch_all: MagicMock, fetch_one: MagicMock) -> None:
+    edge = {"src_factor": 1, "dst_factor": 2, "beta": 0.5, "confidence": 1.0}
+    fetch_all.return_value = [edge, {**edge, "beta": -1.0, "regime": "crisis"}]
+    fetch_one.return_value = {"version": 1, "regime": None}
+    params = {"factor_id": 1, "horizon": 1}
+
+    body = client.get("/v1/simulate_shock", params=params).json()
+    assert body["regime"] is None and body["impacts"]["2"] == 0.35
+    body = client.get("/v1/simulate_shock", params={**params, "regime": "crisis"})
+    assert body.json()["regime"] == "crisis"
+    assert body.json()["impacts"]["2"] == -0.7
+    resp = client.get("/v1/simulate_shock", params={**params, "regime": "calm"})
+    assert resp.status_code == 404
+
+    fetch_one.return_value = {"version": 1, "regime": "crisis"}
+    graph_service._cache._checked_at = 0.0
+    resp = client.post(
+        "/v1/simulate_shock/batch",
+        json={"scenarios": [{"factor_id": 1, "shock_size": 1.0}], "horizon": 1},
+    )
+    assert resp.json()["regime"] == "crisis"
+    assert resp.json()["results"][0]["impacts"]["2"] == -0.7
+
+
+@patch("app.api.routers.risk.db.fetch_one", new_callable=MagicMock)
+@patch("app.api.routers.risk.db.fetch_all", new_callable=MagicMock)
+def test_simulate_shock_uses_matching_influence_matrix(
+    fetch_all: MagicMock, fetch_one: MagicMock, tmp_path
+) -> None:
+    edge = {"src_factor": 1, "dst_factor": 2, "beta": 0.5, "confidence": 1.0}
+    fetch_all.return_value = [edge]
+    fetch_one.return_value = {"version": 9}
+    # Built from a different beta so the lookup is distinguishable.
+    graph = compile_graph([{**edge, "beta": 1.0}])
+    graph.version = 9
+    cache = InfluenceCache(str(tmp_path / "m.npz"), check_interval=3600)
+    cache.install(InfluenceMatrix.build(graph))
+    with patch.object(influence_service, "_cache", cache):
+        resp = client.get("/v1/simulate_shock", params={"factor_id": 1})
+        assert resp.json()["impacts"]["2"] == pytest.approx(0.7)
+        fetch_one.return_value = {"version": 10}
+        graph_service.invalidate()
+        resp = client.get("/v1/simulate_shock", params={"factor_id": 1})
+        assert resp.json()["impacts"]["2"] == pytest.approx(0.35)
+
+
+@patch("app.api.routers.risk.db.fetch_all", new_callable=MagicMock)
+def test_simulate_shock_by_day(fetch_all: MagicMock) -> None:
+    fetch_all.return_value = [
+        {
+            "src_factor": 1,
+            "dst_factor": 2,
+            "beta": 0.5,
+            "lag_days": 2,
+            "confidence": 1.0,
+        }
+    ]
+    resp = client.get(
+        "/v1/simulate_shock",
+        params={"factor_id": 1, "shock_size": 1.0, "horizon": 1, "days": 3},
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["days"] == 3
+    assert body["impacts"] == {"1": 1.0, "2": 0.35}
+    assert body["impacts_by_day"]["2"] == [0.0, 0.0, 0.35, 0.0]
+
+
+@patch("app.api.routers.risk.db.fetch_all", new_callable=MagicMock)
+def test_simulate_shock_bands(fetch_all: MagicMock) -> None:
+    fetch_all.return_value = [
+        {
+            "src_factor": 1,
+            "dst_factor": 2,
+            "beta": 0.5,
+            "lag_days": 0,
+            "confidence": 0.5,
+        }
+    ]
+    resp = client.get(
+        "/v1/simulate_shock",
+        params={"factor_id": 1, "horizon": 1, "draws": 200, "seed": 3},
+    )
+    assert resp.status_code == 200
+    bands = resp.json()["bands"]
+    assert bands["1"] == {"p5": 1.0, "p50": 1.0, "p95": 1.0}
+    assert bands["2"]["p5"] < bands["2"]["p50"] < bands["2"]["p95"]
+
+    resp = client.get(
+        "/v1/simulate_shock", params={"factor_id": 1, "draws": 200, "days": 5}
+    )
+    assert resp.status_code == 400
+
+    with patch("app.api.routers.risk.settings.monte_carlo_max_edge_draws", 100):
+        resp = client.get("/v1/simulate_shock", params={"factor_id": 1, "draws": 200})
+    assert resp.status_code == 400
+
+
+@patch("app.api.routers.risk.db.fetch_all", new_callable=MagicMock)
+def test_simulate_shock_batch(fetch_all: MagicMock) -> None:
+    fetch_all.return_value = [
+        {
+            "src_factor": 1,
+            "dst_factor": 2,
+            "beta": 0.5,
+            "lag_days": 0,
+            "confidence": 1.0,
+        }
+    ]
+    payload = {
+        "scenarios": [
+            {"factor_id": 1, "shock_size": 1.0},
+            {"factor_id": 2, "shock_size": 2.0},
+        ],
+        "horizon": 1,
+    }
+    resp = client.post("/v1/simulate_shock/batch", json=payload)
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert results[0]["impacts"] == {"1": 1.0, "2": 0.35}
+    assert results[1]["impacts"] == {"2": 2.0}
+    fetch_all.assert_called_once()
+
+    resp = client.post("/v1/simulate_shock/batch", json={**payload, "composite": True})
+    assert resp.status_code == 200
+    assert resp.json()["impacts"] == {"1": 1.0, "2": 2.35}
+
+
+@patch("app.api.routers.risk.db.fetch_one", new_callable=MagicMock)
+@patch("app.api.routers.risk.db.fetch_all", new_callable=MagicMock)
+def test_simulate_shock_pruned_graph_reports_error_bound(
+    fetch_all: MagicMock, fetch_one: MagicMock
+) -> None:
+    fetch_all.return_value = [
+        {"src_factor": 1, "dst_factor": 2, "beta": 0.5, "confidence": 1.0},
+        {"src_factor": 1, "dst_factor": 3, "beta": 0.001, "confidence": 1.0},
+    ]
+    fetch_one.return_value = {"version": 1}
+    params = {"factor_id": 1, "horizon": 1}
+
+    exact = client.get("/v1/simulate_shock", params=params).json()
+    assert "error_bound" not in exact and "3" in exact["impacts"]
+    body = client.get("/v1/simulate_shock", params={**params, "pruned": True}).json()
+    assert body["pruned"] is True
+    assert body["impacts"] == {"1": 1.0, "2": 0.35}
+    assert body["error_bound"] == pytest.approx(0.7 * 0.001)
+
+
+@patch("app.api.routers.risk.db.fetch_one", new_callable=MagicMock)
+@patch("app.api.routers.risk.db.fetch_all", new_callable=MagicMock)
+def test_upstream_factors(fetch_all: MagicMock, fetch_one: MagicMock) -> None:
+    fetch_all.return_value = [
+        {"src_factor": 1, "dst_factor": 2, "beta": 0.5, "confidence": 1.0},
+        {"src_factor": 3, "dst_factor": 1, "beta": 1.0, "confidence": 1.0},
+    ]
+    fetch_one.return_value = {"version": 1}
+    resp = client.get("/v1/factors/2/upstream", params={"horizon": 2})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["factor_id"] == 2 and body["horizon"] == 2
+    assert [d["factor_id"] for d in body["drivers"]] == [1, 3]
+    assert body["drivers"][1]["impact"] == pytest.approx(0.7 * 0.49 * 0.5)
+    resp = client.get("/v1/factors/2/upstream", params={"horizon": 51})
+    assert resp.status_code == 422
+
+
+@patch("app.api.routers.risk.db.fetch_one", new_callable=MagicMock)
+@patch("app.api.routers.risk.db.fetch_all", new_callable=MagicMock)
+def test_simulate_shock_explain_paths(
+    fetch_all: MagicMock, fetch_one: MagicMock
+) -> None:
+    fetch_all.return_value = [
+        {"src_factor": 1, "dst_factor": 2, "beta": 0.4, "confidence": 1.0},
+        {"src_factor": 1, "dst_factor": 3, "beta": 1.0, "confidence": 1.0},
+        {"src_factor": 3, "dst_factor": 2, "beta": 1.0, "confidence": 1.0},
+    ]
+    fetch_one.return_value = {"version": 1}
+    resp = client.get(
+        "/v1/simulate_shock", params={"factor_id": 1, "explain": [2], "paths": 1}
+    )
+    assert resp.json()["paths"] == {
+        "2": [{"path": [1, 3, 2], "contribution": pytest.approx(0.7**3)}]
+    }
+    resp = client.get(
+        "/v1/simulate_shock", params={"factor_id": 1, "explain": [2], "days": 5}
+    )
+    assert resp.status_code == 400
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock, patch
 
 from fastapi.testclient import TestClient
 
@@ -9,17 +9,12 @@ from app.main import app
 client = TestClient(app)
 
 
-@patch("app.api.routers.ports.cache.cache_get", new_callable=AsyncMock)
-@patch("app.api.routers.ports.cache.cache_set", new_callable=AsyncMock)
 @patch("app.api.routers.ports.db.fetch_one", new_callable=MagicMock)
 @patch("app.api.routers.ports.db.fetch_all", new_callable=MagicMock)
 def test_get_port_series(
     fetch_all: MagicMock,
     fetch_one: MagicMock,
-    cache_set: AsyncMock,
-    cache_get: AsyncMock,
 ) -> None:
-    cache_get.return_value = None
     fetch_all.return_value = [
         {
             "port_id": "LA",
@@ -39,13 +34,8 @@ def test_get_port_series(
     fetch_one.assert_called_once()
 
 
-@patch("app.api.routers.ports.cache.cache_get", new_callable=AsyncMock)
-@patch("app.api.routers.ports.cache.cache_set", new_callable=AsyncMock)
 @patch("app.api.routers.ports.db.fetch_all", new_callable=MagicMock)
-def test_get_port_snapshot(
-    fetch_all: MagicMock, cache_set: AsyncMock, cache_get: AsyncMock
-) -> None:
-    cache_get.return_value = None
+def test_get_port_snapshot(fetch_all: MagicMock) -> None:
     fetch_all.return_value = [
         {
             "port_id": "LA",
@@ -63,17 +53,12 @@ def test_get_port_snapshot(
     fetch_all.assert_called_once()
 
 
-@patch("app.api.routers.chokepoints.cache.cache_get", new_callable=AsyncMock)
-@patch("app.api.routers.chokepoints.cache.cache_set", new_callable=AsyncMock)
 @patch("app.api.routers.chokepoints.db.fetch_one", new_callable=MagicMock)
 @patch("app.api.routers.chokepoints.db.fetch_all", new_callable=MagicMock)
 def test_get_chokepoint_series(
     fetch_all: MagicMock,
     fetch_one: MagicMock,
-    cache_set: AsyncMock,
-    cache_get: AsyncMock,
 ) -> None:
-    cache_get.return_value = None
     fetch_all.return_value = [
         {
             "chokepoint_id": "pc",
@@ -93,13 +78,8 @@ def test_get_chokepoint_series(
     fetch_one.assert_called_once()
 
 
-@patch("app.api.routers.chokepoints.cache.cache_get", new_callable=AsyncMock)
-@patch("app.api.routers.chokepoints.cache.cache_set", new_callable=AsyncMock)
 @patch("app.api.routers.chokepoints.db.fetch_all", new_callable=MagicMock)
-def test_get_chokepoint_snapshot(
-    fetch_all: MagicMock, cache_set: AsyncMock, cache_get: AsyncMock
-) -> None:
-    cache_get.return_value = None
+def test_get_chokepoint_snapshot(fetch_all: MagicMock) -> None:
     fetch_all.return_value = [
         {
             "chokepoint_id": "pc",
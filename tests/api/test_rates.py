@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock, patch
 
 from fastapi.testclient import TestClient
 
@@ -9,17 +9,12 @@ from app.main import app
 client = TestClient(app)
 
 
-@patch("app.api.routers.rates.cache.cache_get", new_callable=AsyncMock)
-@patch("app.api.routers.rates.cache.cache_set", new_callable=AsyncMock)
 @patch("app.api.routers.rates.db.fetch_one", new_callable=MagicMock)
 @patch("app.api.routers.rates.db.fetch_all", new_callable=MagicMock)
 def test_get_rates_series(
     fetch_all: MagicMock,
     fetch_one: MagicMock,
-    cache_set: AsyncMock,
-    cache_get: AsyncMock,
 ) -> None:
-    cache_get.return_value = None
     fetch_all.return_value = [{"ts": "2024-01-01", "value": 4.0, "unit": "percent"}]
     fetch_one.return_value = {"count": 1}
     resp = client.get(
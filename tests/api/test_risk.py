@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock, patch
 
 from fastapi.testclient import TestClient
 
@@ -9,15 +9,10 @@ from app.main import app
 client = TestClient(app)
 
 
-@patch("app.api.routers.risk.cache.cache_get", new_callable=AsyncMock)
-@patch("app.api.routers.risk.cache.cache_set", new_callable=AsyncMock)
 @patch("app.api.routers.risk.db.fetch_all", new_callable=MagicMock)
 def test_get_risk_score(
     fetch_all: MagicMock,
-    cache_set: AsyncMock,
-    cache_get: AsyncMock,
 ) -> None:
-    cache_get.return_value = None
     fetch_all.return_value = [
         {"metric": "macro", "value": 0.2},
         {"metric": "market", "value": 0.3},
@@ -41,13 +36,8 @@ def test_get_risk_score(
     fetch_all.assert_called_once()
 
 
-@patch("app.api.routers.risk.cache.cache_get", new_callable=AsyncMock)
-@patch("app.api.routers.risk.cache.cache_set", new_callable=AsyncMock)
 @patch("app.api.routers.risk.db.fetch_all", new_callable=MagicMock)
-def test_get_risk_score_defaults(
-    fetch_all: MagicMock, cache_set: AsyncMock, cache_get: AsyncMock
-) -> None:
-    cache_get.return_value = None
+def test_get_risk_score_defaults(fetch_all: MagicMock) -> None:
     fetch_all.return_value = []
     resp = client.get("/v1/risk", params={"country": "USA"})
     assert resp.status_code == 200
@@ -353,6 +353,24 @@ def test_worldbank_adapter_idempotent() -> None:
     conn.close()
 
 
+def test_bulk_upsert_returns_only_written_rows() -> None:
+    conn = _get_conn()
+    _setup_tables(conn)
+    rows = [
+        {"series_id": "a", "metric": "cpi", "ts": "2024-01-01", "value": 1.0},
+        {"series_id": "b", "metric": "gdp", "ts": "2024-01-01", "value": 2.0},
+    ]
+    bulk_upsert(conn, "metrics_ts", rows, ["series_id", "ts"])
+    rows[1] = {**rows[1], "value": 3.0}
+    written: list[dict[str, object]] = []
+    affected = bulk_upsert(
+        conn, "metrics_ts", rows, ["series_id", "ts"], written, ["metric"]
+    )
+    assert affected == 1
+    assert written == [{"metric": "gdp"}]
+    conn.close()
+
+
 def test_fred_adapter_idempotent() -> None:
     conn = _get_conn()
     _setup_tables(conn)
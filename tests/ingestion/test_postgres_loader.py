@@ -26,8 +26,9 @@ def test_bulk_upsert_idempotent() -> None:
     conn.commit()
 
     rows = [{"id": 1, "val": "a"}]
-    bulk_upsert(conn, "upsert_test", rows, ["id"])
-    bulk_upsert(conn, "upsert_test", [{"id": 1, "val": "b"}], ["id"])
+    assert bulk_upsert(conn, "upsert_test", rows, ["id"]) == 1
+    assert bulk_upsert(conn, "upsert_test", rows, ["id"]) == 0
+    assert bulk_upsert(conn, "upsert_test", [{"id": 1, "val": "b"}], ["id"]) == 1
 
     cur.execute("SELECT val FROM upsert_test WHERE id=1")
     result = cur.fetchone()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from risk_engine.attribution import dominant_paths, upstream_contributions
+from risk_engine.cascade import propagate_shock
+from risk_engine.graph import compile_graph
+
+
+def _random_graph(n: int = 25, m: int = 90):
+    rng = np.random.default_rng(0)
+    return compile_graph(
+        {
+            "src_factor": int(a),
+            "dst_factor": int(b),
+            "beta": float(w),
+            "confidence": 0.8,
+        }
+        for (a, b), w in zip(rng.integers(0, n, (m, 2)), rng.normal(0, 0.6, m))
+        if a != b
+    )
+
+
+def test_upstream_matches_forward_shocks() -> None:
+    graph = _random_graph()
+    for target in range(25):
+        drivers = dict(upstream_contributions(graph, target, horizon=4))
+        expected = {}
+        for source in graph.node_ids.tolist():
+            hit = propagate_shock(graph, source, 1.0, 4).get(target)
+            if source != target and hit is not None:
+                expected[source] = hit
+        assert drivers == pytest.approx(expected)
+
+
+def test_upstream_orders_and_truncates() -> None:
+    edges = [
+        {"src_factor": 1, "dst_factor": 3, "beta": 0.2},
+        {"src_factor": 2, "dst_factor": 3, "beta": -0.9},
+        {"src_factor": 4, "dst_factor": 2, "beta": 1.0},
+    ]
+    graph = compile_graph(edges)
+    assert upstream_contributions(graph, 3, horizon=1) == [
+        (2, pytest.approx(-0.63)),
+        (1, pytest.approx(0.14)),
+    ]
+    assert [f for f, _ in upstream_contributions(graph, 3, top=2)] == [2, 4]
+    assert upstream_contributions(graph, 99) == []
+
+
+def _walks(graph, start: int, target: int, horizon: int) -> list:
+    """Every walk of at most ``horizon`` hops, by brute force."""
+    out, stack = [], [((graph.index_of(start),), 1.0)]
+    while stack:
+        path, value = stack.pop()
+        if path[-1] == graph.index_of(target) and value != 0:
+            out.append(value)
+        if len(path) <= horizon:
+            for e in np.flatnonzero(graph.src == path[-1]):
+                step = value * graph.weight[e] * 0.7 ** len(path)
+                stack.append((path + (int(graph.dst[e]),), step))
+    return sorted(out, key=abs, reverse=True)
+
+
+def test_dominant_paths_match_exhaustive_enumeration() -> None:
+    graph = _random_graph(12, 40)
+    for start in graph.node_ids[:4].tolist():
+        targets = graph.node_ids.tolist()
+        found = dominant_paths(graph, start, 1.0, targets, k=4, horizon=4)
+        for target in targets:
+            expected = _walks(graph, start, target, 4)[:4]
+            assert [v for _, v in found[target]] == pytest.approx(expected)
+
+
+def test_dominant_paths_sum_to_impact() -> None:
+    edges = [
+        {"src_factor": 1, "dst_factor": 2, "beta": 0.5},
+        {"src_factor": 1, "dst_factor": 3, "beta": 0.8},
+        {"src_factor": 3, "dst_factor": 2, "beta": -0.4},
+    ]
+    graph = compile_graph(edges)
+    (direct, indirect) = dominant_paths(graph, 1, 2.0, [2], k=5)[2]
+    assert direct == ([1, 2], pytest.approx(0.7))
+    assert indirect == ([1, 3, 2], pytest.approx(2.0 * 0.8 * -0.4 * 0.7**3))
+    impact = propagate_shock(graph, 1, 2.0)[2]
+    assert direct[1] + indirect[1] == pytest.approx(impact)
+    assert dominant_paths(graph, 2, 1.0, [1, 2, 9]) == {1: [], 2: [([2], 1.0)], 9: []}
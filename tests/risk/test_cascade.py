@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from risk_engine.cascade import (
+    propagate_shock,
+    propagate_shock_by_day,
+    propagate_shocks,
+    pruning_error_bound,
+)
+from risk_engine.graph import compile_graph, compile_regime_graphs
+
+EDGES = [
+    {"src_factor": 1, "dst_factor": 2, "beta": 0.5, "confidence": 1.0},
+    {"src_factor": 1, "dst_factor": 3, "beta": 0.4, "confidence": 0.5},
+    {"src_factor": 2, "dst_factor": 4, "beta": 1.0, "confidence": 1.0},
+    {"src_factor": 3, "dst_factor": 4, "beta": -1.0, "confidence": None},
+    {"src_factor": 4, "dst_factor": 1, "beta": 0.0, "confidence": 1.0},
+]
+
+
+def test_propagate_shock_sums_paths() -> None:
+    """Impacts of converging paths are summed with per-hop decay."""
+    impacts = propagate_shock(EDGES, 1, 1.0, horizon=2, decay=0.5)
+    assert impacts[1] == pytest.approx(1.0)
+    assert impacts[2] == pytest.approx(0.25)
+    assert impacts[3] == pytest.approx(0.1)
+    # via 2: 0.25 * 1.0 * 0.25, via 3: 0.1 * -1.0 * 0.25
+    assert impacts[4] == pytest.approx(0.0625 - 0.025)
+
+
+def test_propagate_shock_reports_zero_weight_nodes() -> None:
+    """Nodes reached through zero-beta edges are still reported."""
+    impacts = propagate_shock(EDGES, 4, 2.0, horizon=1)
+    assert impacts == {4: 2.0, 1: 0.0}
+
+
+def test_propagate_shock_accepts_compiled_graph() -> None:
+    graph = compile_graph(EDGES)
+    assert graph.n_nodes == 4
+    assert graph.n_edges == 5
+    assert propagate_shock(graph, 1, 1.0, horizon=3) == propagate_shock(
+        EDGES, 1, 1.0, horizon=3
+    )
+    assert propagate_shock(graph, 99, 1.5) == {99: 1.5}
+
+
+def test_propagate_shocks_matches_single_runs() -> None:
+    scenarios = [(1, 1.0), (3, -2.0), (42, 0.5)]
+    results = propagate_shocks(EDGES, scenarios, horizon=3)
+    assert results[0] == pytest.approx(propagate_shock(EDGES, 1, 1.0, horizon=3))
+    assert results[1] == pytest.approx(propagate_shock(EDGES, 3, -2.0, horizon=3))
+    assert results[2] == {42: 0.5}
+
+
+def test_propagate_shocks_composite_is_linear() -> None:
+    (combined,) = propagate_shocks(
+        EDGES, [(1, 1.0), (2, 2.0)], horizon=2, composite=True
+    )
+    first = propagate_shock(EDGES, 1, 1.0, horizon=2)
+    second = propagate_shock(EDGES, 2, 2.0, horizon=2)
+    for node in set(first) | set(second):
+        assert combined[node] == pytest.approx(
+            first.get(node, 0.0) + second.get(node, 0.0)
+        )
+
+
+def test_propagate_shock_by_day_applies_lags() -> None:
+    edges = [
+        {"src_factor": 1, "dst_factor": 2, "beta": 0.5, "lag_days": 3},
+        {"src_factor": 2, "dst_factor": 3, "beta": 2.0, "lag_days": 2},
+        {"src_factor": 1, "dst_factor": 3, "beta": 1.0, "lag_days": 0},
+        {"src_factor": 3, "dst_factor": 4, "beta": 1.0, "lag_days": 30},
+    ]
+    by_day = propagate_shock_by_day(edges, 1, 1.0, days=6)
+    assert set(by_day) == {1, 2, 3}
+    assert all(len(path) == 7 for path in by_day.values())
+    assert by_day[2][3] == pytest.approx(0.35)
+    assert by_day[3][0] == pytest.approx(0.7)
+    assert by_day[3][5] == pytest.approx(0.35 * 2.0 * 0.49)
+    totals = {k: sum(v) for k, v in by_day.items()}
+    assert totals == pytest.approx(propagate_shock(edges[:3], 1, 1.0))
+
+
+def test_compile_regime_graphs_overrides_base_edges() -> None:
+    graphs = compile_regime_graphs(
+        [
+            {"src_factor": 1, "dst_factor": 2, "beta": 0.5},
+            {"src_factor": 2, "dst_factor": 3, "beta": 0.4},
+            {"src_factor": 1, "dst_factor": 2, "beta": -0.2, "regime": "crisis"},
+        ]
+    )
+    assert set(graphs) == {None, "crisis"}
+    assert propagate_shock(graphs[None], 1, 1.0, horizon=1)[2] == 0.35
+    crisis = propagate_shock(graphs["crisis"], 1, 1.0, horizon=2)
+    assert abs(crisis[2] + 0.14) < 1e-12
+    assert graphs["crisis"].regime == "crisis" and graphs["crisis"].n_edges == 2
+
+
+def test_sparsify_keeps_strongest_outgoing_edges() -> None:
+    graph = compile_graph(EDGES, top_k=1)
+    kept = {
+        (int(graph.node_ids[s]), int(graph.node_ids[d]))
+        for s, d in zip(graph.src, graph.dst)
+    }
+    assert kept == {(1, 2), (2, 4), (3, 4), (4, 1)}
+    assert graph.n_nodes == 4
+    assert compile_graph(EDGES, min_weight=0.3).n_edges == 3
+    assert pruning_error_bound(compile_graph(EDGES), 1, 1.0) == 0.0
+
+
+def test_pruning_error_bound_holds() -> None:
+    rng = np.random.default_rng(0)
+    edges = [
+        {
+            "src_factor": int(a),
+            "dst_factor": int(b),
+            "beta": float(w),
+            "confidence": 1.0,
+        }
+        for (a, b), w in zip(rng.integers(0, 30, (300, 2)), rng.normal(0, 0.4, 300))
+        if a != b
+    ]
+    exact = compile_graph(edges)
+    pruned = exact.sparsify(top_k=3, min_weight=0.05)
+    assert pruned.n_edges < exact.n_edges
+    for start in range(30):
+        full = propagate_shock(exact, start, 2.0, 4)
+        approx = propagate_shock(pruned, start, 2.0, 4)
+        error = sum(abs(full.get(f, 0.0) - approx.get(f, 0.0)) for f in full)
+        assert error <= pruning_error_bound(pruned, start, 2.0, 4) + 1e-12
+
+
+def test_compile_regime_graphs_keeps_one_method() -> None:
+    edges = [
+        {"src_factor": 1, "dst_factor": 2, "beta": 0.5},
+        {"src_factor": 1, "dst_factor": 2, "beta": 0.9, "method": "dtw"},
+    ]
+    assert list(compile_regime_graphs(edges, "corr")[None].beta) == [0.5]
+    with pytest.raises(ValueError):
+        compile_regime_graphs(edges, "dtw")
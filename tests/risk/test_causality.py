@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from risk_engine.causality import (
+    betainc,
+    changes,
+    chi2_pvalue,
+    granger_tests,
+    transfer_entropy,
+)
+from risk_engine.edges import infer_edges
+
+
+def _leader_follower(n: int = 400, lag: int = 2) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    lead = rng.normal(size=n)
+    follow = np.zeros(n)
+    follow[lag:] = 0.8 * lead[:-lag]
+    follow += 0.3 * rng.normal(size=n)
+    noise = rng.normal(size=n)
+    return np.vstack((lead, follow, noise)).cumsum(axis=1)
+
+
+def test_betainc_matches_closed_forms() -> None:
+    x = np.array([0.0, 0.1, 0.3, 0.7, 1.0])
+    assert betainc(1.0, 1.0, x) == pytest.approx(x)
+    assert betainc(2.0, 3.0, 0.4) == pytest.approx(0.5248)
+    arcsine = 2 / np.pi * np.arcsin(np.sqrt(x))
+    assert betainc(0.5, 0.5, x) == pytest.approx(arcsine)
+    assert np.isnan(betainc(-1.0, 1.0, 0.5))
+
+
+def test_chi2_pvalue_approximation() -> None:
+    assert chi2_pvalue(np.array([36.0, 70.0]), 36) == pytest.approx(
+        [0.4679, 0.000587], rel=0.05
+    )
+
+
+def test_changes_skip_missing_rows() -> None:
+    values = np.array([[1.0, np.nan, 4.0, 6.0]])
+    assert np.allclose(changes(values), [[np.nan, np.nan, 3.0, 2.0]], equal_nan=True)
+
+
+def test_granger_detects_direction_and_lag() -> None:
+    values = _leader_follower()
+    pairs = np.array([[0, 1], [1, 0], [0, 2]])
+    f, p_value, lag, beta = granger_tests(values, pairs, order=4)
+    assert p_value[0] < 1e-10
+    assert p_value[1] > 0.01 and p_value[2] > 0.01
+    assert lag[0] == 2
+    assert beta[0] > 0.8
+
+
+def test_transfer_entropy_detects_direction() -> None:
+    values = _leader_follower()
+    pairs = np.array([[0, 1], [1, 0]])
+    te, lag, corr, p_value = transfer_entropy(values, pairs, max_lag=4)
+    assert te[0] > 5 * te[1]
+    assert lag[0] == 2 and corr[0] > 0.8
+    assert p_value[0] < 1e-10
+
+
+def test_parallel_matches_serial() -> None:
+    values = _leader_follower()
+    pairs = np.array([[i, j] for i in range(3) for j in range(3) if i != j])
+    for serial, parallel in zip(
+        granger_tests(values, pairs, 3) + transfer_entropy(values, pairs, 3),
+        granger_tests(values, pairs, 3, workers=2)
+        + transfer_entropy(values, pairs, 3, workers=2),
+    ):
+        assert np.array_equal(serial, parallel, equal_nan=True)
+
+
+def test_infer_edges_methods() -> None:
+    values = _leader_follower()
+    index = pd.date_range("2020-01-01", periods=values.shape[1])
+    data = {10 + k: pd.Series(row, index=index) for k, row in enumerate(values)}
+
+    granger = infer_edges(data, 4, method="granger", alpha=0.001)
+    assert [(e["src_factor"], e["dst_factor"], e["lag_days"]) for e in granger] == [
+        (10, 11, 2)
+    ]
+    assert granger[0]["confidence"] == pytest.approx(1 - granger[0]["p_value"])
+
+    te = infer_edges(data, 4, method="te", alpha=0.001)
+    assert [(e["src_factor"], e["dst_factor"]) for e in te] == [(10, 11)]
+    assert 0 < te[0]["confidence"] < 1 and te[0]["transfer_entropy"] > 0
+
+    with pytest.raises(ValueError):
+        infer_edges(data, method="spline")
+
+
+def test_business_day_lags_are_calendar_days() -> None:
+    values = _leader_follower(lag=5)
+    index = pd.bdate_range("2020-01-01", periods=values.shape[1])
+    data = {10 + k: pd.Series(row, index=index) for k, row in enumerate(values)}
+
+    for method in ("granger", "te"):
+        (edge,) = infer_edges(data, 6, method=method, alpha=0.001)
+        assert (edge["src_factor"], edge["dst_factor"]) == (10, 11)
+        assert edge["lag_days"] == 7
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from risk_engine.dtw import dtw_distances, envelope, lb_keogh, lb_kim, znormalize
+from risk_engine.edges import infer_edges
+
+
+def _naive_dtw(a: np.ndarray, b: np.ndarray, band: int) -> float:
+    n = len(a)
+    cost = np.full((n + 1, n + 1), np.inf)
+    cost[0, 0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(max(1, i - band), min(n, i + band) + 1):
+            cost[i, j] = (a[i - 1] - b[j - 1]) ** 2 + min(
+                cost[i - 1, j - 1], cost[i - 1, j], cost[i, j - 1]
+            )
+    return float(cost[n, n])
+
+
+def _walks(n_series: int = 6, n: int = 60) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return znormalize(rng.standard_normal((n_series, n)).cumsum(axis=1))
+
+
+def test_dtw_matches_naive_dynamic_program() -> None:
+    values = _walks()
+    pairs = np.array(
+        [(i, j, s) for i in range(6) for j in range(i + 1, 6) for s in (1, -1)]
+    )
+    dist, _ = dtw_distances(values, pairs, band=5)
+    ref = [_naive_dtw(values[i], s * values[j], 5) for i, j, s in pairs]
+    assert dist == pytest.approx(ref)
+
+
+def test_lower_bounds_never_exceed_dtw() -> None:
+    values = _walks()
+    upper, lower = envelope(values, 5)
+    for i in range(6):
+        for j in range(6):
+            exact = _naive_dtw(values[i], values[j], 5)
+            assert lb_kim(values[[i]], values[[j]])[0] <= exact + 1e-9
+            assert lb_keogh(values[[i]], upper[[j]], lower[[j]])[0] <= exact + 1e-9
+
+
+def test_pruning_keeps_every_pair_within_threshold() -> None:
+    values = _walks()
+    pairs = np.array(
+        [(i, j, s) for i in range(6) for j in range(i + 1, 6) for s in (1, -1)]
+    )
+    exact, _ = dtw_distances(values, pairs, band=5)
+    threshold = float(np.median(exact))
+    pruned, _ = dtw_distances(values, pairs, band=5, threshold=threshold, workers=2)
+    within = exact <= threshold
+    assert pruned[within] == pytest.approx(exact[within])
+    assert np.isinf(pruned[~within]).all()
+
+
+def test_infer_edges_dtw_orients_by_warping_offset() -> None:
+    rng = np.random.default_rng(1)
+    walk = rng.standard_normal(320).cumsum()
+    idx = pd.date_range("2024-01-01", periods=300)
+    data = {
+        1: pd.Series(walk[20:], index=idx),
+        2: pd.Series(walk[16:316], index=idx),  # trails factor 1 by 4 days
+        3: pd.Series(-walk[20:] + 0.01 * rng.standard_normal(300), index=idx),
+        4: pd.Series(rng.standard_normal(300), index=idx),
+    }
+    edges = infer_edges(data, 10, method="dtw", window=200, min_similarity=0.8)
+    found = {(e["src_factor"], e["dst_factor"]): e for e in edges}
+    assert set(found) == {(1, 2), (1, 3), (3, 2)}
+    # Warping paths cut corners, so the mean offset understates the shift.
+    assert 2 <= found[(1, 2)]["lag_days"] <= 4 and found[(1, 2)]["beta"] > 0.8
+    assert found[(1, 3)]["beta"] < -0.8
+    assert found[(1, 2)]["sample_start"] == idx[100].date()
+    assert found[(1, 2)]["sample_end"] == idx[-1].date()
+
+
+def test_infer_edges_dtw_lags_are_calendar_days() -> None:
+    rng = np.random.default_rng(1)
+    walk = rng.standard_normal(320).cumsum()
+    lags = []
+    for idx in (
+        pd.date_range("2024-01-01", periods=300),
+        pd.bdate_range("2024-01-01", periods=300),
+    ):
+        data = {
+            1: pd.Series(walk[20:], index=idx),
+            2: pd.Series(walk[15:315], index=idx),
+        }
+        (edge,) = infer_edges(data, 10, method="dtw", window=200, min_similarity=0.8)
+        lags.append(edge["lag_days"])
+    # The same offset in rows spans a weekend on business days.
+    assert lags == [3, 5]
@@ -2,10 +2,12 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
 import pytest
 
-from risk_engine.edges import infer_edges
+from risk_engine.causality import changes, standardize
+from risk_engine.edges import infer_edges, rolling_elastic_net
 
 
 def test_infer_edges_basic() -> None:
@@ -21,3 +23,87 @@ def test_infer_edges_basic() -> None:
     assert edge["lag_days"] == 0
     assert pytest.approx(edge["beta"], rel=1e-6) == 1.0
     assert pytest.approx(edge["confidence"], rel=1e-6) == 1.0
+
+
+def test_infer_edges_detects_lead_and_sign() -> None:
+    """A lagged, inverted copy is found with the right lag and sign."""
+    rng = np.random.default_rng(0)
+    idx = pd.date_range("2024-01-01", periods=200)
+    walk = rng.standard_normal(210).cumsum()
+    src = pd.Series(walk[10:], index=idx)
+    dst = pd.Series(-2.0 * walk[6:206], index=idx)  # dst[t + 4] == -2 src[t]
+    (edge,) = infer_edges({1: src, 2: dst}, max_lag_days=20)
+    assert edge["lag_days"] == 4
+    assert pytest.approx(edge["beta"], rel=1e-6) == -1.0
+
+
+def test_infer_edges_skips_pairs_without_overlap() -> None:
+    a = pd.Series([1.0, 2.0, 4.0], index=pd.date_range("2024-01-01", periods=3))
+    b = pd.Series([3.0, 1.0, 2.0], index=pd.date_range("2025-01-01", periods=3))
+    assert infer_edges({1: a, 2: b}, max_lag_days=0) == []
+
+
+def test_infer_edges_parallel_matches_serial() -> None:
+    rng = np.random.default_rng(1)
+    idx = pd.date_range("2024-01-01", periods=120)
+    data = {
+        k: pd.Series(rng.standard_normal(120).cumsum(), index=idx) for k in range(6)
+    }
+    data[3] = data[3].iloc[20:]
+    seen: list[tuple[int, int]] = []
+    parallel = infer_edges(
+        data, max_lag_days=15, workers=2, progress=lambda d, n: seen.append((d, n))
+    )
+    assert parallel == infer_edges(data, max_lag_days=15)
+    assert seen[-1] == (15, 15)
+
+
+def test_rolling_elastic_net_satisfies_kkt() -> None:
+    """A single window solves the Elastic Net optimality conditions."""
+    rng = np.random.default_rng(3)
+    d = rng.standard_normal((3, 300))
+    d[1, 1:] += 0.8 * d[0, :-1]
+    penalty, l1_ratio = 0.1, 0.5
+    beta, lag, _, _ = rolling_elastic_net(
+        d.cumsum(axis=1), 1, penalty, l1_ratio, window=1000, tol=1e-12
+    )
+
+    z = np.nan_to_num(standardize(changes(d.cumsum(axis=1))))
+    x, y = z[:, :-1].T, z[:, 1:].T
+    grad = x.T @ (y - x @ beta) / len(y) - penalty * (1 - l1_ratio) * beta
+    l1 = penalty * l1_ratio
+    off = ~np.eye(3, dtype=bool)
+    nonzero = off & (beta != 0)
+    assert np.allclose(grad[nonzero], l1 * np.sign(beta[nonzero]), atol=1e-8)
+    assert np.all(np.abs(grad[off & (beta == 0)]) <= l1 + 1e-8)
+    assert lag[0, 1] == 1 and beta[0, 1] > 0.5
+
+
+def test_infer_edges_enet_rolling_windows() -> None:
+    rng = np.random.default_rng(0)
+    d = rng.standard_normal((4, 800))
+    d[1, 2:] += 0.7 * d[0, :-2]
+    d[3, 1:] -= 0.6 * d[2, :-1]
+    idx = pd.date_range("2020-01-01", periods=800)
+    data = {k: pd.Series(row, index=idx) for k, row in enumerate(d.cumsum(axis=1))}
+
+    edges = infer_edges(data, 5, method="enet", window=250, step=50)
+    found = {(e["src_factor"], e["dst_factor"]): e for e in edges}
+    assert set(found) == {(0, 1), (2, 3)}
+    assert found[(0, 1)]["lag_days"] == 2 and found[(0, 1)]["beta"] > 0
+    assert found[(2, 3)]["lag_days"] == 1 and found[(2, 3)]["beta"] < 0
+    assert found[(0, 1)]["confidence"] == 1.0
+    assert found[(0, 1)]["sample_start"] == idx[550].date()
+    assert found[(0, 1)]["sample_end"] == idx[799].date()
+
+
+def test_infer_edges_enet_business_day_lags() -> None:
+    rng = np.random.default_rng(1)
+    d = rng.standard_normal((2, 600))
+    d[1, 5:] += 0.8 * d[0, :-5]
+    idx = pd.bdate_range("2020-01-01", periods=600)
+    data = {k: pd.Series(row, index=idx) for k, row in enumerate(d.cumsum(axis=1))}
+
+    (edge,) = infer_edges(data, 6, method="enet", window=250, step=50)
+    assert (edge["src_factor"], edge["dst_factor"]) == (0, 1)
+    assert edge["lag_days"] == 7
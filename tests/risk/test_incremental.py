@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from risk_engine.edges import infer_edges
+from risk_engine.incremental import PairStatistics
+
+
+def _series(seed: int, days: int = 120) -> dict[int, pd.Series]:
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2024-01-01", periods=days, freq="D")
+    base = rng.standard_normal(days + 5).cumsum()
+    return {
+        1: pd.Series(base[5:], index=idx),
+        2: pd.Series(base[:-5] + 0.1 * rng.standard_normal(days), index=idx),
+        3: pd.Series(rng.standard_normal(days), index=idx),
+    }
+
+
+def _key(edges: list[dict]) -> dict[tuple[int, int], tuple[int, float]]:
+    return {
+        (e["src_factor"], e["dst_factor"]): (e["lag_days"], e["beta"]) for e in edges
+    }
+
+
+def _assert_same(a: list[dict], b: list[dict]) -> None:
+    ka, kb = _key(a), _key(b)
+    assert ka.keys() == kb.keys()
+    for pair, (lag, beta) in ka.items():
+        assert kb[pair][0] == lag
+        assert abs(kb[pair][1] - beta) < 1e-9
+
+
+def test_update_matches_full_estimate() -> None:
+    data = _series(0)
+    stats = PairStatistics.rebuild({k: s.iloc[:80] for k, s in data.items()}, 10)
+    since = pd.Timestamp(stats.context_start([1, 2, 3]))
+    changed = stats.update({k: s[s.index >= since] for k, s in data.items()})
+
+    assert len(changed) == 3
+    _assert_same(stats.estimates(), infer_edges(data, 10))
+    _assert_same(stats.estimates(), PairStatistics.rebuild(data, 10).estimates())
+
+
+def test_update_adds_new_factor_and_late_data() -> None:
+    data = _series(1)
+    stats = PairStatistics.rebuild({1: data[1].iloc[:100], 2: data[2].iloc[:60]}, 7)
+    assert stats.context_start([1, 2, 3]) is None
+    stats.update(data)
+
+    _assert_same(stats.estimates(), infer_edges(data, 7))
+    edge = next(e for e in stats.estimates() if e["dst_factor"] == 3)
+    assert edge["sample_end"].isoformat() == "2024-04-29"
+
+
+def test_business_days_use_calendar_lags() -> None:
+    rng = np.random.default_rng(4)
+    idx = pd.bdate_range("2024-01-01", periods=160)
+    walk = rng.standard_normal(165).cumsum()
+    # 2 repeats 1 five business days, i.e. one calendar week, later.
+    data = {1: pd.Series(walk[5:], index=idx), 2: pd.Series(walk[:-5], index=idx)}
+    stats = PairStatistics.rebuild({k: s.iloc[:100] for k, s in data.items()}, 10)
+    since = pd.Timestamp(stats.context_start([1, 2]))
+    stats.update({k: s[s.index >= since] for k, s in data.items()})
+
+    full = infer_edges(data, 10)
+    _assert_same(stats.estimates(), full)
+    assert full[0]["lag_days"] == 7
+
+
+def test_update_without_new_points_changes_nothing() -> None:
+    data = _series(2)
+    stats = PairStatistics.rebuild(data, 5)
+    assert stats.update(data).size == 0
+
+
+def test_save_load_roundtrip(tmp_path) -> None:
+    stats = PairStatistics.rebuild(_series(3), 5)
+    path = str(tmp_path / "stats.npz")
+    stats.save(path)
+    loaded = PairStatistics.load(path)
+
+    assert loaded.factor_ids == stats.factor_ids
+    np.testing.assert_array_equal(loaded.sums, stats.sums)
+    _assert_same(loaded.estimates(), stats.estimates())
+
+
+def test_sums_grow_and_update_in_place(tmp_path) -> None:
+    data = _series(5)
+    path = str(tmp_path / "stats.npz")
+    early = {k: data[k].iloc[:90] for k in (1, 2)}
+    PairStatistics.rebuild(early, 5, path).save(path)
+    stats = PairStatistics.load(path)
+    assert isinstance(stats.sums, np.memmap) and stats.sums.shape[0] == 1
+
+    stats.update(data)
+    assert not os.path.exists(path)  # nothing to trust until saved
+    stats.save(path)
+    loaded = PairStatistics.load(path)
+
+    assert loaded.sums.shape[0] == 3
+    _assert_same(loaded.estimates(), infer_edges(data, 5))
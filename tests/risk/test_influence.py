@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from risk_engine.cascade import propagate_shock
+from risk_engine.graph import compile_graph
+from risk_engine.influence import InfluenceMatrix
+
+EDGES = [
+    {"src_factor": 1, "dst_factor": 2, "beta": 0.5, "confidence": 0.9},
+    {"src_factor": 2, "dst_factor": 3, "beta": -0.4, "confidence": 0.8},
+    {"src_factor": 1, "dst_factor": 3, "beta": 0.2, "confidence": 1.0},
+    {"src_factor": 3, "dst_factor": 4, "beta": 0.001, "confidence": 1.0},
+    {"src_factor": 4, "dst_factor": 1, "beta": 0.3, "confidence": 0.5},
+]
+
+
+def test_rows_match_propagate_shock() -> None:
+    graph = compile_graph(EDGES)
+    matrix = InfluenceMatrix.build(graph, chunk_size=2)
+    for factor_id in (1, 2, 3, 4):
+        expected = propagate_shock(graph, factor_id, 2.0)
+        got = matrix.impacts(factor_id, 2.0)
+        assert list(got) == list(expected)
+        for k, v in expected.items():
+            assert abs(got[k] - v) < 1e-6
+    assert matrix.impacts(99, 1.5) == {99: 1.5}
+
+
+def test_threshold_drops_small_impacts() -> None:
+    graph = compile_graph(EDGES)
+    matrix = InfluenceMatrix.build(graph, threshold=0.01)
+    assert list(matrix.impacts(3, 1.0)) == [3]
+    assert 4 not in matrix.impacts(1, 1.0)
+
+
+def test_save_load_roundtrip(tmp_path) -> None:
+    graph = compile_graph(EDGES)
+    graph.version = 7
+    matrix = InfluenceMatrix.build(graph)
+    path = str(tmp_path / "influence.npz")
+    matrix.save(path)
+    loaded = InfluenceMatrix.load(path)
+    assert loaded.version == 7
+    assert (loaded.horizon, loaded.decay) == (3, 0.7)
+    assert loaded.impacts(1, 1.0) == matrix.impacts(1, 1.0)
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from risk_engine import montecarlo
+from risk_engine.cascade import propagate_shock
+from risk_engine.graph import compile_graph
+from risk_engine.montecarlo import simulate_shock_distribution
+
+EDGES = [
+    {"src_factor": 1, "dst_factor": 2, "beta": 0.5, "confidence": 1.0},
+    {"src_factor": 2, "dst_factor": 3, "beta": 0.8, "confidence": 0.4},
+]
+
+
+def test_confident_edges_have_degenerate_bands() -> None:
+    bands = simulate_shock_distribution(EDGES, 1, 1.0, draws=50, seed=1)
+    exact = propagate_shock(EDGES, 1, 1.0)
+    assert set(bands) == set(exact)
+    for label in ("p5", "p50", "p95"):
+        assert bands[2][label] == pytest.approx(exact[2])
+
+
+def test_uncertain_edges_widen_bands() -> None:
+    bands = simulate_shock_distribution(EDGES, 1, 1.0, draws=2000, seed=1)
+    exact = propagate_shock(EDGES, 1, 1.0)
+    assert bands[3]["p5"] < exact[3] < bands[3]["p95"]
+    assert bands[3]["p50"] == pytest.approx(exact[3], rel=0.1)
+
+
+def test_chunking_and_executor_do_not_change_results() -> None:
+    base = simulate_shock_distribution(EDGES, 1, 1.0, draws=300, seed=7)
+    # 64 and 100 (rounded to 128) draws per chunk leave an uneven last chunk.
+    for chunk_size in (64, 100):
+        assert base == simulate_shock_distribution(
+            EDGES, 1, 1.0, draws=300, seed=7, chunk_size=chunk_size
+        )
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        pooled = simulate_shock_distribution(
+            EDGES, 1, 1.0, draws=300, seed=7, chunk_size=64, executor=pool
+        )
+    assert pooled == base
+
+
+def test_process_pool_receives_the_graph_once() -> None:
+    graph = compile_graph(EDGES)
+    base = simulate_shock_distribution(graph, 1, 1.0, draws=300, seed=7)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        for _ in range(2):
+            pooled = simulate_shock_distribution(
+                graph, 1, 1.0, draws=300, seed=7, chunk_size=64, executor=pool
+            )
+            assert pooled == base
+    assert graph in montecarlo._exported
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from risk_engine.graph import compile_graph
+from risk_engine.systemic import downstream_impact, systemic_contributions
+
+
+def _graph(seed: int = 0, n: int = 40, m: int = 120):
+    rng = np.random.default_rng(seed)
+    pairs = rng.integers(0, n, (m, 2))
+    return compile_graph(
+        {
+            "src_factor": int(a),
+            "dst_factor": int(b),
+            "beta": float(rng.uniform(-0.3, 0.3)),
+            "confidence": 0.8,
+        }
+        for a, b in pairs
+        if a != b
+    )
+
+
+def _dense(graph) -> np.ndarray:
+    w = np.zeros((graph.n_nodes, graph.n_nodes))
+    np.add.at(w, (graph.dst, graph.src), np.abs(graph.weight))
+    return w
+
+
+def test_downstream_impact_matches_leontief_inverse() -> None:
+    graph = _graph()
+    eye = np.eye(graph.n_nodes)
+    expected = (np.linalg.inv(eye - 0.7 * _dense(graph)) - eye).sum(axis=0)
+    np.testing.assert_allclose(downstream_impact(graph, 0.7), expected, atol=1e-8)
+
+
+def test_downstream_impact_with_horizon() -> None:
+    graph = _graph(1)
+    w = 0.5 * _dense(graph)
+    expected = (w + w @ w).sum(axis=0)
+    np.testing.assert_allclose(downstream_impact(graph, 0.5, horizon=2), expected)
+
+
+def test_divergent_graph_raises() -> None:
+    graph = compile_graph(
+        [
+            {"src_factor": 1, "dst_factor": 2, "beta": 1.0},
+            {"src_factor": 2, "dst_factor": 1, "beta": 1.0},
+        ]
+    )
+    with pytest.raises(ValueError):
+        downstream_impact(graph, 1.0, max_iter=50)
+
+
+def test_systemic_contributions_are_shares() -> None:
+    graph = _graph(2)
+    shocks = np.linspace(0.1, 1.0, graph.n_nodes)
+    impact_pct, contrib = systemic_contributions(graph, shocks, 0.7)
+    assert abs(contrib.sum() - 1.0) < 1e-12
+    weighted = shocks * impact_pct
+    np.testing.assert_allclose(contrib, weighted / weighted.sum())
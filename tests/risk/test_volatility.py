@@ -1,11 +1,39 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
-from risk_engine.volatility import ewma_volatility
+from risk_engine.volatility import ewma_volatility, ewma_volatility_panel
 
 
 def test_ewma_volatility() -> None:
     series = pd.Series([100.0, 101.0, 102.0, 101.0, 103.0])
     vol = ewma_volatility(series, span=2)
     assert vol >= 0
+
+
+def test_ewma_volatility_matches_pandas() -> None:
+    series = pd.Series([100.0, 101.0, 102.0, 101.0, 103.0])
+    expected = np.log(series).diff().ewm(span=2).std().iloc[-1]
+    assert abs(ewma_volatility(series, span=2) - expected) < 1e-12
+    assert ewma_volatility([100.0]) == 0.0
+
+
+def test_panel_volatility_with_mask() -> None:
+    rng = np.random.default_rng(0)
+    values = 100 * np.exp(0.01 * rng.standard_normal((4, 60)).cumsum(axis=1))
+    mask = rng.random(values.shape) > 0.3
+    mask[3] = False
+    mask[3, 5] = True
+
+    latest, path = ewma_volatility_panel(values, mask, span=10, path=True)
+
+    assert path is not None and path.shape == values.shape
+    for row in range(3):
+        observed = pd.Series(values[row][mask[row]])
+        expected = np.log(observed).diff().ewm(span=10).std()
+        assert abs(latest[row] - expected.iloc[-1]) < 1e-12
+        last_obs = np.flatnonzero(mask[row])[-1]
+        assert abs(path[row, last_obs] - expected.iloc[-1]) < 1e-12
+    assert latest[3] == 0.0
+    assert np.isnan(path[3]).all()
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from app.scheduler.jobs import edge_inference
+
+
+def _obs(series_id: str, values: list[float]) -> list[dict]:
+    start = datetime(2024, 1, 1)
+    return [
+        {"series_id": series_id, "ts": start + timedelta(days=i), "value": v}
+        for i, v in enumerate(values)
+    ]
+
+
+@patch("app.scheduler.jobs.edge_inference.record_graph_update")
+@patch("app.scheduler.jobs.edge_inference.execute_values")
+@patch("app.scheduler.jobs.edge_inference.db.transaction")
+@patch("app.scheduler.jobs.edge_inference.db.fetch_all", new_callable=MagicMock)
+async def test_edge_inference_replaces_corr_edges(
+    fetch_all: MagicMock,
+    transaction: MagicMock,
+    execute_values: MagicMock,
+    record_graph_update: MagicMock,
+) -> None:
+    values = [1.0, 3.0, 2.0, 5.0, 4.0, 6.0]
+    fetch_all.side_effect = [
+        [{"factor_id": 1, "series_id": "a"}, {"factor_id": 2, "series_id": "b"}],
+        _obs("a", values) + _obs("b", [2 * v for v in values]),
+    ]
+    cur = transaction.return_value.__enter__.return_value
+
+    await edge_inference.run()
+
+    assert fetch_all.call_count == 2
+    cur.execute.assert_called_once()
+    assert cur.execute.call_args.args[1] == {"m": "corr"}
+    rows = execute_values.call_args.args[2]
+    assert len(rows) == 1
+    src, dst, sign, lag, beta, method, conf, start, end, p, te = rows[0]
+    assert (src, dst, sign, lag, method) == (1, 2, 1, 0, "corr")
+    assert abs(beta - 1.0) < 1e-9
+    assert start.isoformat() == "2024-01-01"
+    assert end.isoformat() == "2024-01-06"
+    assert p is None and te is None
+    record_graph_update.assert_called_once()
+    assert edge_inference.EDGE_INFERENCE_PAIRS_DONE._value.get() == 1
+
+
+@patch("app.scheduler.jobs.edge_inference.record_graph_update")
+@patch("app.scheduler.jobs.edge_inference.execute_values")
+@patch("app.scheduler.jobs.edge_inference.db.transaction")
+@patch("app.scheduler.jobs.edge_inference.db.fetch_all", new_callable=MagicMock)
+async def test_edge_refresh_updates_changed_pairs(
+    fetch_all: MagicMock,
+    transaction: MagicMock,
+    execute_values: MagicMock,
+    record_graph_update: MagicMock,
+    tmp_path,
+) -> None:
+    factors = [{"factor_id": 1, "series_id": "a"}, {"factor_id": 2, "series_id": "b"}]
+    values = [1.0, 3.0, 2.0, 5.0, 4.0, 6.0, 5.0, 8.0]
+    cur = transaction.return_value.__enter__.return_value
+    path = str(tmp_path / "state" / "edges.npz")
+
+    with patch.object(edge_inference.settings, "edge_stats_path", path):
+        fetch_all.side_effect = [
+            factors,
+            _obs("a", values[:6]) + _obs("b", [2 * v for v in values[:6]]),
+        ]
+        await edge_inference.refresh()
+        assert cur.execute.call_args.args[1] == {"m": "corr"}
+
+        fetch_all.side_effect = [
+            factors,
+            _obs("a", values) + _obs("b", [2 * v for v in values]),
+        ]
+        await edge_inference.refresh()
+
+    since = fetch_all.call_args.args[1]["since"]
+    assert since.isoformat() == "2023-07-10"
+    params = cur.execute.call_args.args[1]
+    assert (params["src"], params["dst"]) == ([1], [2])
+    rows = execute_values.call_args.args[2]
+    assert len(rows) == 1
+    assert rows[0][7].isoformat() == "2024-01-01"
+    assert rows[0][8].isoformat() == "2024-01-08"
+    assert record_graph_update.call_count == 2
+
+
+@patch("app.scheduler.jobs.edge_inference.record_graph_update")
+@patch("app.scheduler.jobs.edge_inference.execute_values")
+@patch("app.scheduler.jobs.edge_inference.db.transaction")
+@patch("app.scheduler.jobs.edge_inference.db.fetch_all", new_callable=MagicMock)
+async def test_edge_inference_granger_writes_p_values(
+    fetch_all: MagicMock,
+    transaction: MagicMock,
+    execute_values: MagicMock,
+    record_graph_update: MagicMock,
+) -> None:
+    rng = np.random.default_rng(1)
+    lead = rng.normal(size=200)
+    follow = np.concatenate(([0.0], lead[:-1])) + 0.1 * rng.normal(size=200)
+    fetch_all.side_effect = [
+        [{"factor_id": 1, "series_id": "a"}, {"factor_id": 2, "series_id": "b"}],
+        _obs("a", list(lead.cumsum())) + _obs("b", list(follow.cumsum())),
+    ]
+    cur = transaction.return_value.__enter__.return_value
+
+    await edge_inference.run("granger")
+
+    assert cur.execute.call_args.args[1] == {"m": "granger"}
+    rows = execute_values.call_args.args[2]
+    assert [(r[0], r[1], r[3], r[5]) for r in rows] == [(1, 2, 1, "granger")]
+    assert rows[0][9] < 1e-6 and rows[0][10] is None
+
+
+@patch("app.scheduler.jobs.edge_inference.record_graph_update")
+@patch("app.scheduler.jobs.edge_inference.execute_values")
+@patch("app.scheduler.jobs.edge_inference.db.transaction")
+@patch("app.scheduler.jobs.edge_inference.db.fetch_all", new_callable=MagicMock)
+async def test_edge_inference_enet_writes_last_window(
+    fetch_all: MagicMock,
+    transaction: MagicMock,
+    execute_values: MagicMock,
+    record_graph_update: MagicMock,
+) -> None:
+    rng = np.random.default_rng(1)
+    lead = rng.normal(size=300)
+    follow = np.concatenate(([0.0], lead[:-1])) + 0.1 * rng.normal(size=300)
+    fetch_all.side_effect = [
+        [{"factor_id": 1, "series_id": "a"}, {"factor_id": 2, "series_id": "b"}],
+        _obs("a", list(lead.cumsum())) + _obs("b", list(follow.cumsum())),
+    ]
+
+    with patch.object(edge_inference.settings, "enet_window", 100):
+        await edge_inference.run("enet")
+
+    (row,) = [r for r in execute_values.call_args.args[2] if r[:2] == (1, 2)]
+    assert (row[2], row[3], row[5]) == (1, 1, "enet")
+    start, end = row[7], row[8]
+    assert (end - start).days == 99
+    assert end.isoformat() == "2024-10-26"
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, patch
+
+from app.scheduler.jobs import influence_matrix
+from app.services import influence_service
+from app.services.influence_service import InfluenceCache
+from risk_engine.graph import compile_graph
+
+
+async def test_influence_matrix_job_installs_versioned_matrix(tmp_path) -> None:
+    graph = compile_graph([{"src_factor": 1, "dst_factor": 2, "beta": 0.5}])
+    graph.version = 5
+    cache = InfluenceCache(str(tmp_path / "m.npz"), check_interval=3600)
+    with (
+        patch.object(influence_service, "_cache", cache),
+        patch.object(
+            influence_matrix.graph_service,
+            "get_graph",
+            new_callable=AsyncMock,
+            return_value=graph,
+        ),
+    ):
+        await influence_matrix.run()
+        matrix = await influence_service.get_matrix(graph, 3)
+
+    assert matrix is not None and matrix.version == 5
+    impacts = matrix.impacts(1, 2.0)
+    assert impacts[1] == 2.0 and abs(impacts[2] - 0.7) < 1e-6
+    assert (tmp_path / "m.npz").exists()
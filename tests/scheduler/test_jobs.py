@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+from apscheduler.util import obj_to_ref, ref_to_obj
 from fastapi.testclient import TestClient
 
 from app.main import app
 from app.scheduler import scheduler as scheduler_module
+from app.services import job_service
 
 client = TestClient(app)
 
@@ -33,3 +35,10 @@ def test_job_crud_and_run() -> None:
 
     list_resp2 = client.get("/jobs")
     assert "heartbeat" not in [j["id"] for j in list_resp2.json()]
+
+
+def test_registered_jobs_can_be_persisted() -> None:
+    # The SQLAlchemy job store saves jobs by reference, which rules out
+    # partials and lambdas.
+    for func in job_service.REGISTRY.values():
+        assert ref_to_obj(obj_to_ref(func)) is func
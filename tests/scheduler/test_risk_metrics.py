@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pandas as pd
+
+from app.scheduler.jobs import risk_metrics
+from risk_engine.graph import compile_graph
+
+
+def _obs(series_id: str, values: list[float], start: int = 0) -> list[dict]:
+    base = datetime(2024, 1, 1)
+    return [
+        {"series_id": series_id, "ts": base + timedelta(days=start + i), "value": v}
+        for i, v in enumerate(values)
+    ]
+
+
+def _expected(values: list[float]) -> float:
+    return float(np.log(pd.Series(values)).diff().ewm(span=30).std().iloc[-1])
+
+
+def _state_row(row: tuple) -> dict:
+    sid, span, last_ts, *fields, _ = row
+    return {
+        "series_id": sid,
+        "last_ts": last_ts,
+        **dict(zip(risk_metrics.STATE_FIELDS, fields)),
+    }
+
+
+FACTORS = [
+    {"factor_id": 1, "series_id": "a"},
+    {"factor_id": 2, "series_id": "a"},
+    {"factor_id": 3, "series_id": "b"},
+    {"factor_id": 4, "series_id": "c"},
+]
+GRAPH = compile_graph([{"src_factor": 1, "dst_factor": 3, "beta": 0.5}])
+A = [100.0, 101.0, 99.0, 102.0, 103.0, 101.0, 104.0]
+B = [50.0, 51.0, 52.5, 51.5, 53.0]
+
+
+@patch(
+    "app.scheduler.jobs.risk_metrics.graph_service.get_graph",
+    new_callable=AsyncMock,
+    return_value=GRAPH,
+)
+@patch("app.scheduler.jobs.risk_metrics.execute_values")
+@patch("app.scheduler.jobs.risk_metrics.db.transaction")
+async def test_risk_metrics_resumes_from_state(
+    transaction: MagicMock, execute_values: MagicMock, get_graph: AsyncMock
+) -> None:
+    cur = transaction.return_value.__enter__.return_value
+    cur.fetchall.side_effect = [FACTORS, [], _obs("a", A[:4]) + _obs("b", B)]
+
+    await risk_metrics.run()
+
+    states, snapshots = (c.args[2] for c in execute_values.call_args_list)
+    assert [(r[0], r[2]) for r in states] == [
+        ("a", datetime(2024, 1, 4)),
+        ("b", datetime(2024, 1, 5)),
+    ]
+    assert [r[0] for r in snapshots] == [1, 2, 3]
+    assert abs(snapshots[2][2] - _expected(B)) < 1e-12
+    # 1 -> 3 with weight 0.5 and decay 0.7: factor 1 moves 35% downstream
+    # and owns the whole systemic impact, factor 3 has no outgoing edges.
+    assert abs(snapshots[0][4] - 35.0) < 1e-9 and snapshots[0][5] == 1.0
+    assert snapshots[1][4:] == (0.0, 0.0)
+    assert snapshots[2][4:] == (0.0, 0.0)
+
+    execute_values.reset_mock()
+    cur.fetchall.side_effect = [
+        FACTORS,
+        [_state_row(r) for r in states],
+        _obs("a", A[4:], 4),
+    ]
+    await risk_metrics.run()
+
+    obs_sql, params = cur.execute.call_args_list[-2].args
+    assert "o.ts > s.last_ts" in obs_sql
+    assert params["sids"] == ["a", "b", "c"] and params["rebuild"] is False
+    states, snapshots = (c.args[2] for c in execute_values.call_args_list)
+    assert [r[0] for r in states] == ["a"]
+    assert abs(snapshots[0][2] - _expected(A)) < 1e-12
+    assert abs(snapshots[2][2] - _expected(B)) < 1e-12
+    avg = cur.execute.call_args.args[1]["val"]
+    assert abs(avg - sum(s[2] for s in snapshots) / 3) < 1e-12
+    assert cur.execute.call_count == 3 + 3 + 1 + 1
+
+
+@patch(
+    "app.scheduler.jobs.risk_metrics.graph_service.get_graph",
+    new_callable=AsyncMock,
+    return_value=GRAPH,
+)
+@patch("app.scheduler.jobs.risk_metrics.execute_values")
+@patch("app.scheduler.jobs.risk_metrics.db.transaction")
+async def test_risk_metrics_rebuild_ignores_state(
+    transaction: MagicMock, execute_values: MagicMock, get_graph: AsyncMock
+) -> None:
+    cur = transaction.return_value.__enter__.return_value
+    cur.fetchall.side_effect = [FACTORS[:1], _obs("a", A)]
+
+    await risk_metrics.rebuild()
+
+    assert cur.execute.call_args_list[1].args[1]["rebuild"] is True
+    states, snapshots = (c.args[2] for c in execute_values.call_args_list)
+    assert len(states) == 1
+    assert abs(snapshots[0][2] - _expected(A)) < 1e-12
+    phases = risk_metrics.RISK_METRICS_PHASE_SECONDS.labels("write")
+    assert phases._sum.get() > 0
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.telemetry import record_graph_update
+from app.services.graph_service import GraphCache
+from risk_engine.cascade import propagate_shock
+
+EDGE = {"src_factor": 1, "dst_factor": 2, "beta": 0.5, "confidence": 1.0}
+
+
+@patch("app.services.graph_service.db.fetch_one", new_callable=MagicMock)
+@patch("app.services.graph_service.db.fetch_all", new_callable=MagicMock)
+def test_graph_reloaded_only_on_version_change(
+    fetch_all: MagicMock, fetch_one: MagicMock
+) -> None:
+    cache = GraphCache(check_interval=0)
+    fetch_all.return_value = [EDGE]
+    fetch_one.return_value = {"version": 1}
+
+    graph = cache.refresh()
+    assert graph.n_edges == 1
+    assert cache.version == 1
+    assert cache.refresh() is graph
+    assert fetch_all.call_count == 1
+
+    fetch_one.return_value = {"version": 2}
+    assert cache.refresh() is not graph
+    assert cache.version == 2
+    assert fetch_all.call_count == 2
+
+
+@patch("app.services.graph_service.db.fetch_one", new_callable=MagicMock)
+@patch("app.services.graph_service.db.fetch_all", new_callable=MagicMock)
+def test_graph_served_from_memory_within_interval(
+    fetch_all: MagicMock, fetch_one: MagicMock
+) -> None:
+    cache = GraphCache(check_interval=3600)
+    fetch_all.return_value = [EDGE]
+    fetch_one.return_value = {"version": 1}
+
+    graph = cache.refresh()
+    assert cache.fresh() is graph
+    cache.invalidate()
+    assert cache.fresh() is None
+
+
+def test_record_graph_update_invalidates_shared_graph() -> None:
+    from app.services import graph_service
+
+    graph_service._cache._stale = False
+    record_graph_update()
+    assert graph_service._cache._stale
+
+
+@patch("app.services.graph_service.db.fetch_one", new_callable=MagicMock)
+@patch("app.services.graph_service.db.fetch_all", new_callable=MagicMock)
+def test_regime_graphs_loaded_side_by_side(
+    fetch_all: MagicMock, fetch_one: MagicMock
+) -> None:
+    cache = GraphCache(check_interval=3600)
+    fetch_all.return_value = [
+        EDGE,
+        {**EDGE, "beta": -0.9, "regime": "crisis"},
+        {"src_factor": 2, "dst_factor": 3, "beta": 0.4, "regime": "risk_on"},
+    ]
+    fetch_one.return_value = {"version": 1, "regime": "crisis"}
+
+    crisis = cache.refresh()
+    assert crisis.regime == "crisis"
+    assert list(crisis.beta) == [-0.9]
+    assert cache.select("risk_on").n_edges == 2
+    assert cache.fresh(None) is crisis
+    assert cache.graph is not None and list(cache.graph.beta) == [0.5]
+    assert fetch_all.call_count == 1
+
+    cache.current_regime = "unknown"
+    assert cache.select() is cache.graph
+    with pytest.raises(KeyError):
+        cache.select("unknown")
+
+
+@patch("app.services.graph_service.db.fetch_one", new_callable=MagicMock)
+@patch("app.services.graph_service.db.fetch_all", new_callable=MagicMock)
+def test_graph_uses_one_edge_method(fetch_all: MagicMock, fetch_one: MagicMock) -> None:
+    cache = GraphCache(check_interval=3600)
+    fetch_all.return_value = [
+        {**EDGE, "method": "corr"},
+        {**EDGE, "beta": 0.8, "method": "granger"},
+        {**EDGE, "beta": -0.9, "regime": "crisis", "method": "granger"},
+    ]
+    fetch_one.return_value = {"version": 1}
+
+    graph = cache.refresh()
+    assert list(graph.beta) == [0.5]
+    assert list(cache.graphs) == [None]
+    assert propagate_shock(graph, 1, 1.0, 1) == {1: 1.0, 2: pytest.approx(0.35)}
+    assert fetch_all.call_args[0][1] == {"method": "corr"}
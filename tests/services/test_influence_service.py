@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import os
+from unittest.mock import patch
+
+from app.services import influence_service
+from app.services.influence_service import InfluenceCache
+from risk_engine.graph import compile_graph
+from risk_engine.influence import InfluenceMatrix
+
+EDGE = {"src_factor": 1, "dst_factor": 2, "beta": 0.5, "confidence": 1.0}
+
+
+def _graph(version: int | None):
+    graph = compile_graph([EDGE])
+    graph.version = version
+    return graph
+
+
+def test_cache_reloads_when_file_changes(tmp_path) -> None:
+    path = str(tmp_path / "m.npz")
+    writer = InfluenceCache(path, check_interval=0)
+    reader = InfluenceCache(path, check_interval=0)
+    assert reader.refresh() is None
+
+    writer.install(InfluenceMatrix.build(_graph(1)))
+    first = reader.refresh()
+    assert first is not None and first.version == 1
+    assert reader.refresh() is first
+
+    writer.install(InfluenceMatrix.build(_graph(2)))
+    os.utime(path, (0, os.path.getmtime(path) + 1))
+    assert reader.refresh().version == 2
+
+
+async def test_get_matrix_requires_matching_version_and_params(tmp_path) -> None:
+    cache = InfluenceCache(str(tmp_path / "m.npz"), check_interval=3600)
+    cache.install(InfluenceMatrix.build(_graph(3)))
+    with patch.object(influence_service, "_cache", cache):
+        assert await influence_service.get_matrix(_graph(3), 3) is cache.matrix
+        assert await influence_service.get_matrix(_graph(4), 3) is None
+        assert await influence_service.get_matrix(_graph(None), 3) is None
+        assert await influence_service.get_matrix(_graph(3), 2) is None
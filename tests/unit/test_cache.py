@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Dict
+from unittest.mock import patch
+
+from app.core import cache
+from app.core.cache import LocalCache
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: Dict[str, Any] = {}
+        self.pttls: Dict[str, int] = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    async def setex(self, key: str, ttl: int, value: Any) -> None:
+        self.round_trips += 1
+        self.store[key] = value
+        self.pttls[key] = ttl * 1000
+
+    async def set(self, key: str, value: Any, nx: bool, px: int) -> bool:
+        if nx and key in self.store:
+            return False
+        self.store[key] = value
+        return True
+
+    async def eval(self, script: str, numkeys: int, key: str, token: str) -> int:
+        if self.store.get(key) != token:
+            return 0
+        del self.store[key]
+        return 1
+
+
+class FakePipeline:
+    def __init__(self, client: FakeRedis) -> None:
+        self.client = client
+        self.ops: list[tuple[str, str]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+    def get(self, key: str) -> None:
+        self.ops.append(("get", key))
+
+    def pttl(self, key: str) -> None:
+        self.ops.append(("pttl", key))
+
+    async def execute(self) -> list[Any]:
+        self.client.round_trips += 1
+        return [
+            self.client.store.get(k) if op == "get" else self.client.pttls.get(k, -2)
+            for op, k in self.ops
+        ]
+
+
+def test_lru_evicts_least_recently_used() -> None:
+    local = LocalCache(max_entries=2)
+    local.set("a:1", "x", 60)
+    local.set("a:2", "y", 60)
+    assert local.get("a:1") == "x"
+    local.set("a:3", "z", 60)
+    assert local.get("a:2") is None
+    assert local.get("a:1") == "x"
+    assert len(local) == 2
+
+
+def test_byte_budget_bounds_total_size() -> None:
+    local = LocalCache(max_bytes=10)
+    local.set("a:1", b"12345", 60)
+    local.set("a:2", b"12345", 60)
+    local.set("a:3", b"123", 60)
+    assert local.get("a:1") is None
+    assert local.nbytes == 8
+    local.set("a:4", b"x" * 11, 60)
+    assert local.get("a:4") is None
+    assert local.nbytes == 8
+
+
+def test_prefix_limits() -> None:
+    local = LocalCache(prefix_limits={"*": 1, "risk": 2, "edges": 0})
+    for i in range(3):
+        local.set(f"risk:{i}", i, 60)
+        local.set(f"fx:{i}", i, 60)
+        local.set(f"edges:{i}", i, 60)
+    assert [local.get(f"risk:{i}") for i in range(3)] == [None, 1, 2]
+    assert [local.get(f"fx:{i}") for i in range(3)] == [None, None, 2]
+    assert local.get("edges:2") is None
+    assert len(local) == 3
+
+
+def test_expired_entries_are_swept() -> None:
+    local = LocalCache(sweep_interval=10)
+    with patch("app.core.cache.time.monotonic", return_value=100.0):
+        local._swept_at = 100.0
+        local.set("a:1", "x", 5)
+        local.set("a:2", "y", 50)
+    with patch("app.core.cache.time.monotonic", return_value=106.0):
+        assert len(local) == 2  # not swept yet
+        assert local.get("a:1") is None
+    with patch("app.core.cache.time.monotonic", return_value=100.0):
+        local.set("a:3", "z", 5)
+    with patch("app.core.cache.time.monotonic", return_value=111.0):
+        assert local.get("a:2") == "y"
+    assert len(local) == 1
+
+
+def test_redis_hits_fill_local_tier() -> None:
+    fake = FakeRedis()
+    fake.store["risk:USA"] = b"{}"
+    fake.pttls["risk:USA"] = 20_000
+    local = LocalCache()
+    with patch.object(cache, "_client", fake), patch.object(
+        cache, "_local_cache", local
+    ):
+        assert asyncio.run(cache.cache_get("risk:USA")) == b"{}"
+        assert asyncio.run(cache.cache_get("risk:USA")) == b"{}"
+        assert fake.round_trips == 1
+        assert local._store["risk:USA"][0] - cache.time.monotonic() <= 20
+
+        assert asyncio.run(cache.cache_get("risk:GBR")) is None
+        asyncio.run(cache.cache_set("risk:GBR", b"[]", 30))
+        assert fake.store["risk:GBR"] == b"[]"
+        assert local.get("risk:GBR") == b"[]"
+
+
+def test_concurrent_misses_share_one_computation() -> None:
+    calls = 0
+
+    async def compute() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def main() -> list[Any]:
+        return await asyncio.gather(
+            *(cache.cache_get_or_set("factors:100:0", compute) for _ in range(5))
+        )
+
+    with patch.object(cache, "_local_cache", LocalCache()):
+        assert asyncio.run(main()) == ["value"] * 5
+        assert calls == 1
+        assert asyncio.run(cache.cache_get_or_set("factors:100:0", compute)) == "value"
+        assert calls == 1
+    assert not cache._inflight
+
+
+def test_failed_computation_is_not_cached() -> None:
+    async def fail() -> str:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    async def main() -> list[Any]:
+        return await asyncio.gather(
+            cache.cache_get_or_set("factor:1", fail),
+            cache.cache_get_or_set("factor:1", fail),
+            return_exceptions=True,
+        )
+
+    async def ok() -> str:
+        return "1"
+
+    with patch.object(cache, "_local_cache", LocalCache()):
+        assert all(isinstance(r, RuntimeError) for r in asyncio.run(main()))
+        assert asyncio.run(cache.cache_get_or_set("factor:1", ok)) == "1"
+
+
+def test_waits_for_the_worker_holding_the_lock() -> None:
+    fake = FakeRedis()
+    fake.store["lock:edges:100:0"] = "other-worker"
+
+    async def leader() -> None:
+        await asyncio.sleep(0.03)
+        fake.store["edges:100:0"] = b"{}"
+        fake.pttls["edges:100:0"] = 30_000
+        del fake.store["lock:edges:100:0"]
+
+    async def compute() -> bytes:
+        raise AssertionError("follower must not compute")
+
+    async def main() -> Any:
+        task = asyncio.ensure_future(leader())
+        value = await cache.cache_get_or_set("edges:100:0", compute)
+        await task
+        return value
+
+    with patch.object(cache, "_client", fake), patch.object(
+        cache, "_local_cache", LocalCache()
+    ), patch.object(cache.settings, "cache_lock_poll_seconds", 0.005):
+        assert asyncio.run(main()) == b"{}"
+
+
+def test_lock_is_released_after_computing() -> None:
+    fake = FakeRedis()
+
+    async def compute() -> bytes:
+        assert "lock:risk:USA" in fake.store
+        return b"{}"
+
+    with patch.object(cache, "_client", fake), patch.object(
+        cache, "_local_cache", LocalCache()
+    ):
+        assert asyncio.run(cache.cache_get_or_set("risk:USA", compute)) == b"{}"
+    assert fake.store == {"risk:USA": b"{}"}
+
+
+def test_stale_value_served_while_refreshing() -> None:
+    versions = iter(["v1", "v2", "v3"])
+
+    async def compute() -> str:
+        await asyncio.sleep(0.01)
+        return next(versions)
+
+    async def main() -> list[Any]:
+        # ``ttl=0`` makes every stored value stale straight away.
+        first = await cache.cache_get_or_set("macro:USA", compute, ttl=0, stale=60)
+        second = await cache.cache_get_or_set("macro:USA", compute, ttl=0, stale=60)
+        assert "macro:USA" in cache._inflight
+        await cache._inflight["macro:USA"]
+        third = await cache.cache_get_or_set("macro:USA", compute, ttl=0, stale=60)
+        await asyncio.gather(*cache._inflight.values())
+        return [first, second, third]
+
+    local = LocalCache()
+    with patch.object(cache, "_local_cache", local):
+        assert asyncio.run(main()) == ["v1", "v1", "v2"]
+        assert local.get("macro:USA") == "v3"
+        remaining = local.lookup("macro:USA")[1]
+        assert 59 < remaining <= 60
+
+
+def test_stale_refresh_left_to_the_lock_holder() -> None:
+    fake = FakeRedis()
+    fake.store["geo_events:any"] = b"old"
+    fake.pttls["geo_events:any"] = 10_000
+    fake.store["lock:geo_events:any"] = "other-worker"
+
+    async def compute() -> bytes:
+        raise AssertionError("refresh must be left to the lock holder")
+
+    async def main() -> Any:
+        value = await cache.cache_get_or_set("geo_events:any", compute, stale=30)
+        await asyncio.gather(*cache._inflight.values())
+        return value
+
+    with patch.object(cache, "_client", fake), patch.object(
+        cache, "_local_cache", LocalCache()
+    ):
+        assert asyncio.run(main()) == b"old"
+
+
+class SyncPipeline:
+    def __init__(self, client: "SyncRedis") -> None:
+        self.client = client
+        self.ops: list[str] = []
+
+    def hincrby(self, name: str, field: str, amount: int) -> None:
+        self.ops.append(field)
+
+    def execute(self) -> list[int]:
+        versions = self.client.versions
+        for field in self.ops:
+            versions[field] = versions.get(field, 0) + 1
+        return [versions[f] for f in self.ops]
+
+
+class SyncRedis:
+    def __init__(self) -> None:
+        self.versions: Dict[str, int] = {}
+        self.published: list[tuple[str, str]] = []
+
+    def pipeline(self) -> SyncPipeline:
+        return SyncPipeline(self)
+
+    def publish(self, channel: str, message: str) -> None:
+        self.published.append((channel, message))
+
+
+def test_published_versions_change_tagged_keys() -> None:
+    client = SyncRedis()
+    with patch.dict(cache._versions, clear=True):
+        before = cache.tag_versions(["metrics_ts:metric=CPI", "geo_events"])
+        assert before == "0.0.0"
+        tags = [cache.tag("metrics_ts", "metric", "CPI"), cache.tag("geo_events")]
+        assert cache.publish_invalidation(client, tags) == {
+            "geo_events": 1,
+            "metrics_ts:metric=cpi": 1,
+        }
+        assert cache.publish_invalidation(client, []) == {}
+        channel, message = client.published[0]
+        assert channel == cache.settings.cache_invalidation_channel
+        cache._apply_versions(json.loads(message))
+        assert cache.tag_versions(["metrics_ts:metric=CPI", "geo_events"]) == "0.1.1"
+        # Versions never move backwards on a late or replayed announcement.
+        cache._apply_versions({b"geo_events": b"0"})
+        assert cache._versions["geo_events"] == 1
+
+
+class FakePubSub:
+    def __init__(self, messages: list[dict[str, Any]]) -> None:
+        self.messages = messages
+        self.channels: list[str] = []
+
+    async def subscribe(self, channel: str) -> None:
+        self.channels.append(channel)
+
+    async def listen(self) -> Any:
+        self.live = cache.invalidation_live()
+        for message in self.messages:
+            yield message
+        raise asyncio.CancelledError
+
+
+def test_follows_invalidation_feed() -> None:
+    pubsub = FakePubSub(
+        [
+            {"type": "subscribe", "data": 1},
+            {"type": "message", "data": b'{"fx_ts": 4}'},
+        ]
+    )
+    client = FakeRedis()
+
+    async def hgetall(name: str) -> Dict[bytes, bytes]:
+        return {b"macro": b"2"}
+
+    client.pubsub = lambda: pubsub  # type: ignore[attr-defined]
+    client.hgetall = hgetall  # type: ignore[attr-defined]
+
+    with patch.dict(cache._versions, clear=True):
+        try:
+            asyncio.run(cache._follow_invalidations(client))
+        except asyncio.CancelledError:
+            pass
+        assert cache._versions == {"macro": 2, "fx_ts": 4}
+    assert pubsub.channels == [cache.settings.cache_invalidation_channel]
+    assert pubsub.live and not cache.invalidation_live()